@@ -1,15 +1,32 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import strava
-from database import init_db
+# First, so .env is loaded before any module reads its settings
+from database import check_db
+from routers import analytics, athletes, coverage, metrics, strava, stats, tiles, webhook
+from services.instrumentation import instrument_request
+from services.strava_client import get_client, close_client
+from services.sync_jobs import fail_interrupted_jobs
+from services.sync_scheduler import start_scheduler, stop_scheduler
+from services.webhook_worker import start_worker, stop_worker
 
 app = FastAPI(title="Straviz API")
 
 @app.on_event("startup")
 async def on_startup():
-    await init_db()
+    # Migrations run as a separate step (scripts/migrate.py), startup only checks them
+    await check_db()
+    await fail_interrupted_jobs()
+    get_client()
+    start_scheduler()
+    start_worker()
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await stop_scheduler()
+    await stop_worker()
+    await close_client()
 
+app.middleware("http")(instrument_request)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -18,7 +35,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(analytics.router)
+app.include_router(athletes.router)
+app.include_router(coverage.router)
+app.include_router(metrics.router)
 app.include_router(strava.router)
+app.include_router(stats.router)
+app.include_router(tiles.router)
+app.include_router(webhook.router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,203 @@
+-- Baseline: the schema create_all used to build on startup. IF NOT EXISTS lets
+-- databases created that way adopt it as version 1 unchanged. Timestamps are
+-- naive UTC throughout the code, hence WITHOUT TIME ZONE.
+
+CREATE TABLE IF NOT EXISTS athlete (
+	id BIGSERIAL NOT NULL,
+	firstname VARCHAR,
+	lastname VARCHAR,
+	access_token VARCHAR NOT NULL,
+	refresh_token VARCHAR NOT NULL,
+	expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS dailyrollup (
+	day DATE NOT NULL,
+	sport_type VARCHAR NOT NULL,
+	count INTEGER NOT NULL,
+	distance FLOAT NOT NULL,
+	moving_time BIGINT,
+	elevation FLOAT NOT NULL,
+	heartrate_sum FLOAT NOT NULL,
+	heartrate_count INTEGER NOT NULL,
+	PRIMARY KEY (day, sport_type)
+);
+
+CREATE TABLE IF NOT EXISTS routearea (
+	id SERIAL NOT NULL,
+	lat FLOAT NOT NULL,
+	lng FLOAT NOT NULL,
+	visit_count INTEGER NOT NULL,
+	first_activity_id BIGINT,
+	PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS syncjob (
+	id SERIAL NOT NULL,
+	athlete_id BIGINT NOT NULL,
+	status VARCHAR NOT NULL,
+	"full" BOOLEAN NOT NULL,
+	streams BOOLEAN NOT NULL,
+	pages INTEGER NOT NULL,
+	fetched INTEGER NOT NULL,
+	inserted INTEGER NOT NULL,
+	updated INTEGER NOT NULL,
+	unchanged INTEGER NOT NULL,
+	streams_stored INTEGER,
+	error VARCHAR,
+	created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	started_at TIMESTAMP WITHOUT TIME ZONE,
+	finished_at TIMESTAMP WITHOUT TIME ZONE,
+	PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_syncjob_athlete_id ON syncjob (athlete_id);
+
+CREATE TABLE IF NOT EXISTS syncstate (
+	athlete_id BIGSERIAL NOT NULL,
+	last_start_date TIMESTAMP WITHOUT TIME ZONE,
+	last_synced_at TIMESTAMP WITHOUT TIME ZONE,
+	data_updated_at TIMESTAMP WITHOUT TIME ZONE,
+	resume_after BIGINT,
+	resume_page INTEGER,
+	PRIMARY KEY (athlete_id)
+);
+
+CREATE TABLE IF NOT EXISTS webhookevent (
+	id SERIAL NOT NULL,
+	object_type VARCHAR NOT NULL,
+	object_id BIGINT NOT NULL,
+	aspect_type VARCHAR NOT NULL,
+	owner_id BIGINT NOT NULL,
+	event_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	payload VARCHAR NOT NULL,
+	received_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	processed_at TIMESTAMP WITHOUT TIME ZONE,
+	attempts INTEGER NOT NULL,
+	error VARCHAR,
+	PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_webhookevent_processed_at_id ON webhookevent (processed_at, id);
+
+CREATE TABLE IF NOT EXISTS weeklyrollup (
+	week_start DATE NOT NULL,
+	sport_type VARCHAR NOT NULL,
+	count INTEGER NOT NULL,
+	distance FLOAT NOT NULL,
+	moving_time BIGINT,
+	elevation FLOAT NOT NULL,
+	heartrate_sum FLOAT NOT NULL,
+	heartrate_count INTEGER NOT NULL,
+	PRIMARY KEY (week_start, sport_type)
+);
+
+CREATE TABLE IF NOT EXISTS activity (
+	id BIGSERIAL NOT NULL,
+	athlete_id BIGINT,
+	name VARCHAR NOT NULL,
+	distance FLOAT NOT NULL,
+	moving_time BIGINT,
+	elapsed_time BIGINT,
+	total_elevation_gain FLOAT NOT NULL,
+	type VARCHAR NOT NULL,
+	sport_type VARCHAR NOT NULL,
+	start_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	start_date_local TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	timezone VARCHAR NOT NULL,
+	utc_offset FLOAT NOT NULL,
+	map_polyline VARCHAR,
+	map_summary_polyline VARCHAR,
+	average_speed FLOAT,
+	max_speed FLOAT,
+	average_heartrate FLOAT,
+	max_heartrate FLOAT,
+	elev_high FLOAT,
+	elev_low FLOAT,
+	PRIMARY KEY (id),
+	FOREIGN KEY(athlete_id) REFERENCES athlete (id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS ix_activity_athlete_id ON activity (athlete_id);
+
+CREATE INDEX IF NOT EXISTS ix_activity_sport_type_start_date ON activity (sport_type, start_date);
+
+CREATE INDEX IF NOT EXISTS ix_activity_start_date_id ON activity (start_date, id);
+
+CREATE TABLE IF NOT EXISTS activitygeometry (
+	activity_id BIGINT NOT NULL,
+	point_count INTEGER NOT NULL,
+	min_lat INTEGER NOT NULL,
+	min_lng INTEGER NOT NULL,
+	max_lat INTEGER NOT NULL,
+	max_lng INTEGER NOT NULL,
+	centroid_lat FLOAT NOT NULL,
+	centroid_lng FLOAT NOT NULL,
+	deltas BYTEA NOT NULL,
+	PRIMARY KEY (activity_id),
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS activitystream (
+	activity_id BIGINT NOT NULL,
+	sample_count INTEGER NOT NULL,
+	time BYTEA,
+	latlng BYTEA,
+	distance BYTEA,
+	altitude BYTEA,
+	heartrate BYTEA,
+	velocity_smooth BYTEA,
+	cadence BYTEA,
+	PRIMARY KEY (activity_id),
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS besteffort (
+	activity_id BIGINT NOT NULL,
+	kind VARCHAR NOT NULL,
+	target FLOAT NOT NULL,
+	value FLOAT NOT NULL,
+	start_offset INTEGER NOT NULL,
+	PRIMARY KEY (activity_id, kind, target),
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS geometrylevel (
+	activity_id BIGINT NOT NULL,
+	level INTEGER NOT NULL,
+	point_count INTEGER NOT NULL,
+	deltas BYTEA NOT NULL,
+	PRIMARY KEY (activity_id, level),
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS personalrecord (
+	sport_type VARCHAR NOT NULL,
+	year INTEGER NOT NULL,
+	kind VARCHAR NOT NULL,
+	target FLOAT NOT NULL,
+	activity_id BIGINT NOT NULL,
+	value FLOAT NOT NULL,
+	start_offset INTEGER NOT NULL,
+	start_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (sport_type, year, kind, target),
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS routevisit (
+	activity_id BIGINT NOT NULL,
+	area_id INTEGER,
+	is_new BOOLEAN NOT NULL,
+	visit_number INTEGER NOT NULL,
+	start_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (activity_id),
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE,
+	FOREIGN KEY(area_id) REFERENCES routearea (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_routevisit_area_id ON routevisit (area_id);
+
+CREATE INDEX IF NOT EXISTS ix_routevisit_start_date ON routevisit (start_date);
+
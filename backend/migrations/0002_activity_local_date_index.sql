@@ -0,0 +1,3 @@
+-- Year filters moved to start_date_local, the day the rollups are keyed by.
+
+CREATE INDEX IF NOT EXISTS ix_activity_start_date_local ON activity (start_date_local);
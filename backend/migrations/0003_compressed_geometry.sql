@@ -0,0 +1,8 @@
+-- Track blobs are now zlib-compressed byte planes of the int32 deltas (services/geometry.py).
+-- The raw blobs written before cannot be told apart from them, so they are dropped:
+-- run scripts/rebuild_geometry.py after migrating to decode them again from the polyline
+-- text, which it then clears now that ActivityGeometry holds the route.
+
+DELETE FROM geometrylevel;
+
+DELETE FROM activitygeometry;
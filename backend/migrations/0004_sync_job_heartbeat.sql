@@ -0,0 +1,13 @@
+-- Sync jobs record the process running them and a heartbeat, so a starting replica
+-- only fails jobs nobody is running any more, and at most one job per athlete is
+-- unfinished across replicas. Jobs left unfinished before this have no heartbeat
+-- and would be failed as stale anyway; failing them now lets the index be built.
+
+ALTER TABLE syncjob ADD COLUMN IF NOT EXISTS owner VARCHAR;
+
+ALTER TABLE syncjob ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITHOUT TIME ZONE;
+
+UPDATE syncjob SET status = 'failed', error = 'Interrupted by a restart', finished_at = now() AT TIME ZONE 'utc'
+WHERE status IN ('queued', 'running');
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_syncjob_active_athlete ON syncjob (athlete_id) WHERE status IN ('queued', 'running');
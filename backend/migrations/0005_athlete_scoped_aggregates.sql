@@ -0,0 +1,114 @@
+-- Rollups, personal records and route areas are per athlete: the tables gain an
+-- athlete_id (part of their keys, cascading when the athlete is removed) and are
+-- recreated. Rollups and records are refilled from the stored activities and best
+-- efforts below; route areas are left empty, the next sync of each athlete or
+-- scripts/rebuild_route_frequency.py recomputes them.
+
+DROP TABLE IF EXISTS routevisit;
+
+DROP TABLE IF EXISTS routearea;
+
+DROP TABLE IF EXISTS personalrecord;
+
+DROP TABLE IF EXISTS weeklyrollup;
+
+DROP TABLE IF EXISTS dailyrollup;
+
+CREATE TABLE IF NOT EXISTS dailyrollup (
+	athlete_id BIGINT NOT NULL,
+	day DATE NOT NULL,
+	sport_type VARCHAR NOT NULL,
+	count INTEGER NOT NULL,
+	distance FLOAT NOT NULL,
+	moving_time BIGINT,
+	elevation FLOAT NOT NULL,
+	heartrate_sum FLOAT NOT NULL,
+	heartrate_count INTEGER NOT NULL,
+	PRIMARY KEY (athlete_id, day, sport_type),
+	FOREIGN KEY(athlete_id) REFERENCES athlete (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS weeklyrollup (
+	athlete_id BIGINT NOT NULL,
+	week_start DATE NOT NULL,
+	sport_type VARCHAR NOT NULL,
+	count INTEGER NOT NULL,
+	distance FLOAT NOT NULL,
+	moving_time BIGINT,
+	elevation FLOAT NOT NULL,
+	heartrate_sum FLOAT NOT NULL,
+	heartrate_count INTEGER NOT NULL,
+	PRIMARY KEY (athlete_id, week_start, sport_type),
+	FOREIGN KEY(athlete_id) REFERENCES athlete (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS personalrecord (
+	athlete_id BIGINT NOT NULL,
+	sport_type VARCHAR NOT NULL,
+	year INTEGER NOT NULL,
+	kind VARCHAR NOT NULL,
+	target FLOAT NOT NULL,
+	activity_id BIGINT NOT NULL,
+	value FLOAT NOT NULL,
+	start_offset INTEGER NOT NULL,
+	start_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (athlete_id, sport_type, year, kind, target),
+	FOREIGN KEY(athlete_id) REFERENCES athlete (id) ON DELETE CASCADE,
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS routearea (
+	athlete_id BIGINT NOT NULL,
+	id INTEGER NOT NULL,
+	lat FLOAT NOT NULL,
+	lng FLOAT NOT NULL,
+	visit_count INTEGER NOT NULL,
+	first_activity_id BIGINT,
+	PRIMARY KEY (athlete_id, id),
+	FOREIGN KEY(athlete_id) REFERENCES athlete (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS routevisit (
+	activity_id BIGINT NOT NULL,
+	athlete_id BIGINT NOT NULL,
+	area_id INTEGER,
+	is_new BOOLEAN NOT NULL,
+	visit_number INTEGER NOT NULL,
+	start_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+	PRIMARY KEY (activity_id),
+	FOREIGN KEY(athlete_id, area_id) REFERENCES routearea (athlete_id, id),
+	FOREIGN KEY(activity_id) REFERENCES activity (id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS ix_routevisit_area_id ON routevisit (area_id);
+
+CREATE INDEX IF NOT EXISTS ix_routevisit_start_date ON routevisit (start_date);
+
+CREATE INDEX IF NOT EXISTS ix_activity_athlete_start_date_local ON activity (athlete_id, start_date_local);
+
+INSERT INTO dailyrollup (athlete_id, day, sport_type, count, distance, moving_time, elevation, heartrate_sum, heartrate_count)
+SELECT athlete_id, CAST(start_date_local AS DATE), sport_type,
+	count(*), sum(distance), sum(moving_time), coalesce(sum(total_elevation_gain), 0),
+	coalesce(sum(average_heartrate), 0), count(average_heartrate)
+FROM activity WHERE athlete_id IS NOT NULL
+GROUP BY athlete_id, CAST(start_date_local AS DATE), sport_type;
+
+INSERT INTO weeklyrollup (athlete_id, week_start, sport_type, count, distance, moving_time, elevation, heartrate_sum, heartrate_count)
+SELECT athlete_id, day - (CAST(extract(isodow FROM day) AS INTEGER) - 1), sport_type,
+	sum(count), sum(distance), sum(moving_time), sum(elevation), sum(heartrate_sum), sum(heartrate_count)
+FROM dailyrollup
+GROUP BY athlete_id, day - (CAST(extract(isodow FROM day) AS INTEGER) - 1), sport_type;
+
+-- Best stored effort per slot, all time (year 0) and per local year, like services/records.py
+INSERT INTO personalrecord (athlete_id, sport_type, year, kind, target, activity_id, value, start_offset, start_date)
+SELECT DISTINCT ON (athlete_id, sport_type, year, kind, target)
+	athlete_id, sport_type, year, kind, target, activity_id, value, start_offset, start_date
+FROM (
+	SELECT a.athlete_id, a.sport_type, 0 AS year, e.kind, e.target, e.activity_id, e.value, e.start_offset, a.start_date
+	FROM besteffort e JOIN activity a ON a.id = e.activity_id WHERE a.athlete_id IS NOT NULL
+	UNION ALL
+	SELECT a.athlete_id, a.sport_type, CAST(extract(year FROM a.start_date_local) AS INTEGER), e.kind, e.target,
+		e.activity_id, e.value, e.start_offset, a.start_date
+	FROM besteffort e JOIN activity a ON a.id = e.activity_id WHERE a.athlete_id IS NOT NULL
+) candidates
+ORDER BY athlete_id, sport_type, year, kind, target, CASE WHEN kind = 'distance' THEN value ELSE -value END;
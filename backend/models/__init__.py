@@ -0,0 +1,4 @@
+# Tables by area; everything is importable from `models` directly
+from models.activities import Activity, ActivityGeometry, ActivityStream, Athlete, GeometryLevel, SyncState
+from models.aggregates import BestEffort, DailyRollup, PersonalRecord, RouteArea, RouteVisit, WeeklyRollup
+from models.jobs import SyncJob, WebhookEvent
@@ -0,0 +1,114 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, LargeBinary
+from datetime import datetime
+
+class Athlete(SQLModel, table=True):
+    """A connected Strava athlete. Tokens are Fernet-encrypted, see services/token_store.py."""
+    id: int = Field(default=None, sa_column=Column(BigInteger(), primary_key=True))
+    firstname: Optional[str] = None
+    lastname: Optional[str] = None
+    access_token: str
+    refresh_token: str
+    expires_at: datetime
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class Activity(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pagination walks (start_date, id)
+        Index("ix_activity_start_date_id", "start_date", "id"),
+        Index("ix_activity_sport_type_start_date", "sport_type", "start_date"),
+        # Year filters are on the local date, see services/query_filters.py
+        Index("ix_activity_start_date_local", "start_date_local"),
+        # Read endpoints are per athlete and year
+        Index("ix_activity_athlete_start_date_local", "athlete_id", "start_date_local"),
+    )
+
+    id: int = Field(default=None, sa_column=Column(BigInteger(), primary_key=True))
+    athlete_id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger(), ForeignKey("athlete.id", ondelete="CASCADE"), index=True),
+    )
+    name: str
+    distance: float
+    moving_time: int = Field(sa_column=Column(BigInteger()))
+    elapsed_time: int = Field(sa_column=Column(BigInteger()))
+    total_elevation_gain: float
+    type: str
+    sport_type: str
+    start_date: datetime
+    start_date_local: datetime
+    timezone: str
+    utc_offset: float
+    # Empty once the route is stored in ActivityGeometry, which replaces the text
+    map_polyline: Optional[str] = None
+    map_summary_polyline: Optional[str] = None
+    
+    # Optional fields that might be useful
+    average_speed: Optional[float] = None
+    max_speed: Optional[float] = None
+    average_heartrate: Optional[float] = None
+    max_heartrate: Optional[float] = None
+    elev_high: Optional[float] = None
+    elev_low: Optional[float] = None
+
+
+class SyncState(SQLModel, table=True):
+    """High-water mark of the last sync, one row per athlete."""
+    athlete_id: int = Field(default=None, sa_column=Column(BigInteger(), primary_key=True))
+    last_start_date: Optional[datetime] = None
+    last_synced_at: Optional[datetime] = None
+    # Bumped whenever a sync writes new or changed rows, used as the API data version
+    data_updated_at: Optional[datetime] = None
+    # Set while a sync is in progress so an interrupted run can pick up where it stopped
+    resume_after: Optional[int] = Field(default=None, sa_column=Column(BigInteger()))
+    resume_page: Optional[int] = None
+
+
+class ActivityGeometry(SQLModel, table=True):
+    """Decoded route of an activity, stored as compressed int32 lat/lng deltas (1e-5 degrees), see services/geometry.py."""
+    activity_id: int = Field(
+        default=None,
+        sa_column=Column(BigInteger(), ForeignKey("activity.id", ondelete="CASCADE"), primary_key=True),
+    )
+    point_count: int
+    min_lat: int
+    min_lng: int
+    max_lat: int
+    max_lng: int
+    centroid_lat: float
+    centroid_lng: float
+    deltas: bytes = Field(sa_column=Column(LargeBinary(), nullable=False))
+
+
+class GeometryLevel(SQLModel, table=True):
+    """Douglas-Peucker simplified copy of an ActivityGeometry track for one level of detail."""
+    activity_id: int = Field(
+        default=None,
+        sa_column=Column(BigInteger(), ForeignKey("activity.id", ondelete="CASCADE"), primary_key=True),
+    )
+    level: int = Field(primary_key=True)
+    point_count: int
+    deltas: bytes = Field(sa_column=Column(LargeBinary(), nullable=False))
+
+
+class ActivityStream(SQLModel, table=True):
+    """
+    Per-second samples of an activity, one row per activity and one packed column per stream.
+
+    Each column is a zlib-compressed array of integer deltas, see services/streams.py;
+    a NULL column means Strava has no such stream for the activity.
+    """
+    activity_id: int = Field(
+        default=None,
+        sa_column=Column(BigInteger(), ForeignKey("activity.id", ondelete="CASCADE"), primary_key=True),
+    )
+    sample_count: int
+    time: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary()))
+    latlng: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary()))
+    distance: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary()))
+    altitude: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary()))
+    heartrate: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary()))
+    velocity_smooth: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary()))
+    cadence: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary()))
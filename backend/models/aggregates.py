@@ -0,0 +1,94 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, ForeignKey, ForeignKeyConstraint
+from datetime import date, datetime
+
+class DailyRollup(SQLModel, table=True):
+    """Per athlete, local day and sport_type totals, maintained during sync."""
+    athlete_id: int = Field(
+        sa_column=Column(BigInteger(), ForeignKey("athlete.id", ondelete="CASCADE"), primary_key=True),
+    )
+    day: date = Field(primary_key=True)
+    sport_type: str = Field(primary_key=True)
+    count: int
+    distance: float
+    moving_time: int = Field(sa_column=Column(BigInteger()))
+    elevation: float
+    heartrate_sum: float
+    heartrate_count: int
+
+
+class WeeklyRollup(SQLModel, table=True):
+    """Per athlete, ISO week (keyed by its Monday) and sport_type totals, built from DailyRollup."""
+    athlete_id: int = Field(
+        sa_column=Column(BigInteger(), ForeignKey("athlete.id", ondelete="CASCADE"), primary_key=True),
+    )
+    week_start: date = Field(primary_key=True)
+    sport_type: str = Field(primary_key=True)
+    count: int
+    distance: float
+    moving_time: int = Field(sa_column=Column(BigInteger()))
+    elevation: float
+    heartrate_sum: float
+    heartrate_count: int
+
+
+class RouteArea(SQLModel, table=True):
+    """An area first visited by some route of an athlete, grouping their later routes whose centre is within ~100 m."""
+    athlete_id: int = Field(
+        sa_column=Column(BigInteger(), ForeignKey("athlete.id", ondelete="CASCADE"), primary_key=True),
+    )
+    id: int = Field(primary_key=True)
+    lat: float
+    lng: float
+    visit_count: int
+    first_activity_id: int = Field(sa_column=Column(BigInteger()))
+
+
+class RouteVisit(SQLModel, table=True):
+    """Per-activity result of the route frequency analysis."""
+    __table_args__ = (
+        ForeignKeyConstraint(["athlete_id", "area_id"], ["routearea.athlete_id", "routearea.id"]),
+    )
+
+    activity_id: int = Field(
+        default=None,
+        sa_column=Column(BigInteger(), ForeignKey("activity.id", ondelete="CASCADE"), primary_key=True),
+    )
+    athlete_id: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    area_id: Optional[int] = Field(default=None, index=True)
+    is_new: bool
+    visit_number: int
+    start_date: datetime = Field(index=True)
+
+
+class BestEffort(SQLModel, table=True):
+    """
+    Best effort of one activity: fastest time over a distance ("distance" kind, seconds)
+    or highest mean over a duration ("speed" m/s, "heartrate" bpm), see services/best_efforts.py.
+    """
+    activity_id: int = Field(
+        default=None,
+        sa_column=Column(BigInteger(), ForeignKey("activity.id", ondelete="CASCADE"), primary_key=True),
+    )
+    kind: str = Field(primary_key=True)
+    target: float = Field(primary_key=True)
+    value: float
+    start_offset: int
+
+
+class PersonalRecord(SQLModel, table=True):
+    """Running best of a BestEffort per athlete and sport type, all time (year 0) and per year."""
+    athlete_id: int = Field(
+        sa_column=Column(BigInteger(), ForeignKey("athlete.id", ondelete="CASCADE"), primary_key=True),
+    )
+    sport_type: str = Field(primary_key=True)
+    year: int = Field(primary_key=True)
+    kind: str = Field(primary_key=True)
+    target: float = Field(primary_key=True)
+    activity_id: int = Field(
+        sa_column=Column(BigInteger(), ForeignKey("activity.id", ondelete="CASCADE"), nullable=False),
+    )
+    value: float
+    start_offset: int
+    start_date: datetime
@@ -0,0 +1,49 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, Index, text
+from datetime import datetime
+
+class WebhookEvent(SQLModel, table=True):
+    """A Strava push event, queued until the webhook worker has applied it. `payload` is the raw JSON."""
+    __table_args__ = (
+        # The worker scans unprocessed events in arrival order
+        Index("ix_webhookevent_processed_at_id", "processed_at", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    object_type: str
+    object_id: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    aspect_type: str
+    owner_id: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    event_time: datetime
+    payload: str
+    received_at: datetime = Field(default_factory=datetime.utcnow)
+    processed_at: Optional[datetime] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+class SyncJob(SQLModel, table=True):
+    """A background sync of one athlete and its progress, see services/sync_jobs.py."""
+    __table_args__ = (
+        # At most one unfinished job per athlete, whichever replica started it
+        Index("ux_syncjob_active_athlete", "athlete_id", unique=True, postgresql_where=text("status IN ('queued', 'running')")),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    athlete_id: int = Field(sa_column=Column(BigInteger(), nullable=False, index=True))
+    status: str = "queued"  # queued, running, succeeded or failed
+    full: bool = False
+    streams: bool = False
+    pages: int = 0
+    fetched: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    streams_stored: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    owner: Optional[str] = None  # host:pid of the process running the job
+    heartbeat_at: Optional[datetime] = None
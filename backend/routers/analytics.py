@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+import asyncio
+from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_session
+from services import analytics
+from services.athlete_scope import get_athlete_id
+from services.response_cache import cached_json_response
+
+router = APIRouter(
+    prefix="/strava/analytics",
+    tags=["analytics"]
+)
+
+# Served from the per-year Parquet export (services/columnar_export.py), not the ORM.
+# `years` is "all", a list like "2023,2024" or a range like "2020-2024". The export
+# lands shortly after the sync commits, so its version is part of the cache key.
+
+@router.get("/summary")
+async def read_summary(
+    request: Request,
+    years: Optional[str] = "all",
+    sport_type: Optional[str] = None,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    try:
+        return await cached_json_response(
+            request, session, ("analytics", "summary", athlete_id, years, sport_type, analytics.export_version()),
+            lambda: asyncio.to_thread(analytics.summary, analytics.parse_years(years), sport_type, athlete_id),
+            athlete_id=athlete_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get("/compare")
+async def read_comparison(
+    request: Request,
+    years: Optional[str] = "all",
+    metric: str = "distance",
+    by: str = "month",
+    cumulative: bool = False,
+    sport_type: Optional[str] = None,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    One series per year of a metric per month, week or day of year, for multi-year comparisons.
+    """
+    try:
+        return await cached_json_response(
+            request, session,
+            ("analytics", "compare", athlete_id, years, metric, by, cumulative, sport_type, analytics.export_version()),
+            lambda: asyncio.to_thread(
+                analytics.compare_years, analytics.parse_years(years), metric, by, cumulative, sport_type, athlete_id
+            ),
+            athlete_id=athlete_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
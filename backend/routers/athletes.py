@@ -0,0 +1,79 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import RedirectResponse
+from typing import Optional
+from urllib.parse import urlencode
+import os
+import secrets
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_session
+from models import Athlete, SyncState
+from services.token_store import exchange_code
+
+router = APIRouter(
+    prefix="/strava/athletes",
+    tags=["athletes"]
+)
+
+STRAVA_AUTHORIZE_URL = "https://www.strava.com/oauth/authorize"
+DEFAULT_REDIRECT_URI = "http://localhost:8000/strava/athletes/callback"
+# Cookie holding the `state` sent to Strava, checked on the callback; the browser has this long to come back.
+STATE_COOKIE = "strava_oauth_state"
+STATE_MAX_AGE = 600
+
+@router.get("")
+async def read_athletes(session: AsyncSession = Depends(get_session)):
+    """
+    Connected athletes with their token expiry and last sync, never the tokens.
+    """
+    query = select(Athlete, SyncState.last_synced_at).outerjoin(SyncState, SyncState.athlete_id == Athlete.id)
+    return [
+        {
+            "id": athlete.id, "firstname": athlete.firstname, "lastname": athlete.lastname,
+            "expires_at": athlete.expires_at, "last_synced_at": last_synced_at,
+        }
+        for athlete, last_synced_at in (await session.exec(query.order_by(Athlete.id))).all()
+    ]
+
+@router.get("/authorize")
+async def authorize():
+    """
+    Send the browser to Strava to connect an athlete; Strava redirects back to /callback.
+
+    A random `state` is sent along and kept in a short-lived cookie so the
+    callback only accepts the authorization this browser started.
+    """
+    state = secrets.token_urlsafe(32)
+    params = {
+        "client_id": os.getenv("STRAVA_CLIENT_ID"),
+        "response_type": "code",
+        "redirect_uri": os.getenv("STRAVA_REDIRECT_URI", DEFAULT_REDIRECT_URI),
+        "approval_prompt": "auto",
+        "scope": "activity:read_all",
+        "state": state,
+    }
+    response = RedirectResponse(f"{STRAVA_AUTHORIZE_URL}?{urlencode(params)}")
+    response.set_cookie(STATE_COOKIE, state, max_age=STATE_MAX_AGE, httponly=True, samesite="lax")
+    return response
+
+@router.get("/callback")
+async def authorize_callback(
+    request: Request,
+    response: Response,
+    code: Optional[str] = None,
+    error: Optional[str] = None,
+    state: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    expected = request.cookies.get(STATE_COOKIE)
+    response.delete_cookie(STATE_COOKIE)
+    if not state or not expected or not secrets.compare_digest(state, expected):
+        raise HTTPException(status_code=400, detail="Authorization failed: state does not match")
+    if error or not code:
+        raise HTTPException(status_code=400, detail=f"Authorization failed: {error or 'no code received'}")
+    try:
+        athlete = await exchange_code(session, code)
+        await session.commit()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Token exchange failed: {str(e)}")
+    return {"message": f"Connected athlete {athlete.id}", "id": athlete.id}
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_session
+from services.athlete_scope import get_athlete_id
+from services.coverage_store import get_coverage
+from services.response_cache import cached_json_response
+
+router = APIRouter(
+    prefix="/strava/coverage",
+    tags=["coverage"]
+)
+
+# Served from the athlete's in-memory grid index (services/coverage.py), kept in step with
+# their stored routes. Cells are [lat, lng, value] rows: activities, or meters for /unvisited.
+MAX_LIMIT = 50_000
+
+def check_limit(limit: int):
+    if not 0 < limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+@router.get("/hotspots")
+async def read_hotspots(
+    request: Request,
+    min_visits: int = 5,
+    limit: int = 20,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Clusters of cells crossed by at least `min_visits` activities, busiest first.
+    """
+    async def build():
+        return (await get_coverage(session, athlete_id)).hotspots(min_visits, limit)
+
+    try:
+        check_limit(limit)
+        return await cached_json_response(
+            request, session, ("coverage", "hotspots", athlete_id, min_visits, limit), build, athlete_id=athlete_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get("/unvisited")
+async def read_unvisited(
+    lat: float,
+    lng: float,
+    radius: float = 5000,
+    limit: int = 1000,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Cells within `radius` meters of a point that no route crossed yet, nearest first.
+    """
+    try:
+        check_limit(limit)
+        if not -85 <= lat <= 85 or not -180 <= lng <= 180:
+            raise ValueError("lat must be within [-85, 85] and lng within [-180, 180]")
+        return (await get_coverage(session, athlete_id)).unvisited(lat, lng, radius, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get("/cells")
+async def read_cells(
+    min_lat: float,
+    min_lng: float,
+    max_lat: float,
+    max_lng: float,
+    limit: int = 10_000,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Visited cells inside a bounding box with their activity counts, most visited first.
+    """
+    try:
+        check_limit(limit)
+        if min_lat > max_lat or min_lng > max_lng:
+            raise ValueError("min_lat/min_lng must not exceed max_lat/max_lng")
+        return (await get_coverage(session, athlete_id)).cells_in((min_lat, min_lng, max_lat, max_lng), limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
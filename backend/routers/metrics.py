@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics():
+    """
+    All metrics in the Prometheus text format, for scraping.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
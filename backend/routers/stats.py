@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_session
+from services import stats_service
+from services.athlete_scope import get_athlete_id
+from services.route_frequency import get_route_frequency
+from services.response_cache import cached_json_response
+
+router = APIRouter(
+    prefix="/strava/stats",
+    tags=["stats"]
+)
+
+# Each endpoint returns a chart-sized aggregate computed in SQL,
+# for one athlete, with the same `year` semantics as GET /strava/data
+AGGREGATES = {
+    "types": stats_service.get_type_breakdown,
+    "weekly": stats_service.get_weekly_volume,
+    "cumulative": stats_service.get_cumulative,
+    "heatmap": stats_service.get_heatmap,
+    "time-of-day": stats_service.get_time_of_day,
+    "summary": stats_service.get_summary,
+    "routes": get_route_frequency,
+}
+
+@router.get("/{name}")
+async def read_stats(
+    request: Request,
+    name: str,
+    year: Optional[str] = "last_year",
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    aggregate = AGGREGATES.get(name)
+    if not aggregate:
+        raise HTTPException(status_code=404, detail=f"Unknown stats aggregate: {name}")
+    try:
+        return await cached_json_response(
+            request, session, ("stats", name, athlete_id, year), lambda: aggregate(session, athlete_id, year),
+            athlete_id=athlete_id,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -1,69 +1,195 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
-import os
-from sqlmodel import select
+from datetime import date
 from sqlmodel.ext.asyncio.session import AsyncSession
-from database import get_session
-from models import Activity
-from services.strava_service import sync_activities
-from datetime import datetime
+from database import get_session, pool_stats
+from services.sync_job_events import job_events
+from services.sync_jobs import get_job, start_all_jobs, start_job
+from services.strava_client import rate_limiter
+from services.activity_listing import list_activities
+from services.athlete_scope import get_athlete_id
+from services.activity_payload import FORMATS, stream_activities
+from services.response_cache import cached_response, cached_json_response, cached_stream_response, response_cache
+from services.query_metrics import query_metrics
+from services.geometry_store import load_geometry_payload
+from services.map_render import STYLES, render_year_map
+from services.records import get_records
+from services.simplify import level_for_tolerance, level_for_zoom
 
 router = APIRouter(
     prefix="/strava",
     tags=["strava"]
 )
 
-@router.post("/sync")
+@router.post("/sync", status_code=202)
 async def sync_strava_data(
-    session: AsyncSession = Depends(get_session)
+    athlete_id: Optional[int] = None,
+    full: bool = False,
+    streams: bool = False,
 ):
-    token = os.getenv("STRAVA_ACCESS_TOKEN")
-    if not token:
-        raise HTTPException(status_code=401, detail="STRAVA_ACCESS_TOKEN not set")
-    
+    """
+    Start a background sync job for one connected athlete, or one per athlete
+    when `athlete_id` is omitted. Follow it at /strava/sync/{job_id}.
+    """
     try:
-        count = await sync_activities(session, token)
-        return {"message": f"Synced {count} activities"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
+        if athlete_id is None:
+            return {"jobs": await start_all_jobs(full=full, streams=streams)}
+        return await start_job(athlete_id, full=full, streams=streams)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/sync/{job_id}")
+async def read_sync_job(job_id: int):
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Unknown sync job: {job_id}")
+    return job
+
+@router.get("/sync/{job_id}/events")
+async def stream_sync_job(job_id: int):
+    """
+    Live progress of a sync job as server-sent events.
+    """
+    if not await get_job(job_id):
+        raise HTTPException(status_code=404, detail=f"Unknown sync job: {job_id}")
+    return StreamingResponse(job_events(job_id), media_type="text/event-stream")
+
+@router.get("/rate-limit")
+async def read_rate_limit():
+    return rate_limiter.budget()
+
+@router.get("/cache")
+async def read_cache_stats():
+    return response_cache.stats()
+
+@router.get("/db")
+async def read_db_stats(limit: int = 20):
+    """
+    Connection pool usage and per-statement timings, slowest cumulative first.
+    """
+    return {"pool": pool_stats(), **query_metrics.stats(limit)}
 
 @router.get("/data")
 async def read_strava_data(
+    request: Request,
+    year: Optional[str] = "last_year",
+    format: str = "json",
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    All activities of an athlete for a year with their polylines under a nested map object,
+    streamed as a JSON array, or one object per line with `format=ndjson`.
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    try:
+        return await cached_stream_response(
+            request, session, ("data", athlete_id, year, format),
+            lambda: stream_activities(athlete_id, year, format), FORMATS[format],
+            athlete_id=athlete_id,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get("/geometry")
+async def read_geometry(
+    request: Request,
+    year: Optional[str] = "last_year",
+    zoom: Optional[int] = None,
+    tolerance: Optional[float] = None,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    All routes of an athlete for a year as one binary payload of int32 deltas, see services/geometry.py,
+    gzip-encoded on the wire.
+
+    `zoom` (web-map zoom) or `tolerance` (meters) selects a simplified level of detail.
+    """
+    if zoom is not None:
+        level = level_for_zoom(zoom)
+    elif tolerance is not None:
+        level = level_for_tolerance(tolerance)
+    else:
+        level = 0
+    try:
+        return await cached_response(
+            request, session, ("geometry", athlete_id, year, level),
+            lambda: load_geometry_payload(session, athlete_id, year, level),
+            "application/octet-stream", compress=True, athlete_id=athlete_id,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@router.get("/map.png")
+async def read_year_map(
+    request: Request,
     year: Optional[str] = "last_year",
+    width: int = 1024,
+    height: int = 1024,
+    style: str = "dark",
+    athlete_id: int = Depends(get_athlete_id),
     session: AsyncSession = Depends(get_session)
 ):
+    """
+    All routes of an athlete for a year drawn server-side as a PNG, cached per size, style and data version.
+    """
+    if not (64 <= width <= 4096 and 64 <= height <= 4096):
+        raise HTTPException(status_code=400, detail="width and height must be between 64 and 4096")
+    if style not in STYLES:
+        raise HTTPException(status_code=400, detail=f"style must be one of {', '.join(STYLES)}")
     try:
-        query = select(Activity)
-        
-        if year:
-            try:
-                if year == "last_year":
-                     target_year = datetime.now().year - 1
-                else:
-                     target_year = int(year)
-                
-                start_date = datetime(target_year, 1, 1)
-                end_date = datetime(target_year, 12, 31, 23, 59, 59)
-                
-                query = query.where(Activity.start_date >= start_date, Activity.start_date <= end_date)
-            except ValueError:
-                pass
+        return await cached_response(
+            request, session, ("map.png", athlete_id, year, width, height, style),
+            lambda: render_year_map(session, athlete_id, year, width, height, style), "image/png",
+            athlete_id=athlete_id,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
-        result = await session.exec(query)
-        activities = result.all()
-        
-        # Transform to match frontend expectations (nested map object)
-        transformed = []
-        for activity in activities:
-            activity_dict = activity.dict()
-            # Restructure map data to nested format
-            activity_dict["map"] = {
-                "polyline": activity_dict.pop("map_polyline"),
-                "summary_polyline": activity_dict.pop("map_summary_polyline")
-            }
-            transformed.append(activity_dict)
-        
-        return transformed
+@router.get("/records")
+async def read_records(
+    request: Request,
+    year: Optional[str] = "all",
+    sport_type: Optional[str] = None,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Best efforts per sport type: fastest times over standard distances and
+    mean-max speed and heart rate curves. `year=all` gives all-time records.
+    """
+    try:
+        return await cached_json_response(
+            request, session, ("records", athlete_id, year, sport_type),
+            lambda: get_records(session, athlete_id, year, sport_type),
+            athlete_id=athlete_id,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+@router.get("/activities")
+async def read_activities(
+    fields: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    year: Optional[str] = None,
+    sport_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    min_distance: Optional[float] = None,
+    max_distance: Optional[float] = None,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    try:
+        return await list_activities(
+            session, athlete_id, fields=fields, limit=limit, cursor=cursor, year=year, sport_type=sport_type,
+            start=start, end=end, min_distance=min_distance, max_distance=max_distance,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_session
+from services.athlete_scope import get_athlete_id
+from services.tiles import render_tile, tile_cache
+
+router = APIRouter(
+    prefix="/strava/tiles",
+    tags=["tiles"]
+)
+
+@router.get("/cache")
+async def read_tile_cache_stats():
+    return tile_cache.stats()
+
+@router.get("/{z}/{x}/{y}.mvt")
+async def read_tile(
+    z: int,
+    x: int,
+    y: int,
+    year: Optional[str] = None,
+    sport_type: Optional[str] = None,
+    athlete_id: int = Depends(get_athlete_id),
+    session: AsyncSession = Depends(get_session)
+):
+    if not (0 <= z <= 22 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    try:
+        body = await render_tile(session, z, x, y, athlete_id, year, sport_type)
+        return Response(content=body, media_type="application/vnd.mapbox-vector-tile")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+import os
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_session
+from services.webhook_events import enqueue_event, is_our_subscription
+from services.webhook_worker import wake_worker
+
+router = APIRouter(
+    prefix="/strava/webhook",
+    tags=["webhook"]
+)
+
+@router.get("")
+async def validate_subscription(
+    mode: str = Query(alias="hub.mode"),
+    challenge: str = Query(alias="hub.challenge"),
+    verify_token: str = Query(alias="hub.verify_token"),
+):
+    """
+    Strava's subscription handshake: echo the challenge if the verify token matches ours.
+    """
+    if mode != "subscribe" or verify_token != os.getenv("STRAVA_WEBHOOK_VERIFY_TOKEN"):
+        raise HTTPException(status_code=403, detail="Invalid verify token")
+    return {"hub.challenge": challenge}
+
+@router.post("")
+async def receive_event(payload: dict, session: AsyncSession = Depends(get_session)):
+    """
+    Queue a push event and return at once; Strava expects a 200 within two seconds.
+    The webhook worker checks it with Strava, then fetches and applies the affected activity.
+    """
+    if not is_our_subscription(payload):
+        raise HTTPException(status_code=403, detail="Unknown subscription")
+    try:
+        await enqueue_event(session, payload)
+        await session.commit()
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing event field: {e}")
+    wake_worker()
+    return {"status": "queued"}
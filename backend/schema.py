@@ -0,0 +1,78 @@
+import os
+
+from sqlalchemy import text
+
+# Versioned SQL files, applied in order: 0001_initial.sql, 0002_<change>.sql, ...
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+# Postgres advisory lock held while migrating, so replicas starting together apply each file once
+LOCK_KEY = 72_024
+
+def list_migrations() -> list:
+    """
+    (version, name, path) of every migration file, by version.
+    """
+    names = sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql"))
+    return [(int(name.split("_", 1)[0]), name[:-4], os.path.join(MIGRATIONS_DIR, name)) for name in names]
+
+def read_statements(path: str) -> list:
+    """
+    The statements of a migration file. They end with a semicolon at the end of
+    a line and are sent one at a time, asyncpg prepares each statement.
+    """
+    with open(path) as f:
+        sql = "\n".join(line for line in f.read().splitlines() if not line.lstrip().startswith("--"))
+    return [statement.strip() for statement in (sql + "\n").split(";\n") if statement.strip()]
+
+async def current_version(conn) -> int:
+    if not (await conn.execute(text("SELECT to_regclass('schema_migrations')"))).scalar():
+        return 0
+    return (await conn.execute(text("SELECT coalesce(max(version), 0) FROM schema_migrations"))).scalar()
+
+async def apply_migrations(engine) -> list:
+    """
+    Apply the migrations newer than the database, each in its own transaction,
+    and record them in schema_migrations.
+
+    Returns:
+        list: Versions applied.
+    """
+    applied = []
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+        try:
+            await conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations "
+                "(version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL DEFAULT now())"
+            ))
+            await conn.commit()
+            version = await current_version(conn)
+            for number, name, path in list_migrations():
+                if number <= version:
+                    continue
+                for statement in read_statements(path):
+                    await conn.exec_driver_sql(statement)
+                await conn.execute(
+                    text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                    {"version": number, "name": name},
+                )
+                await conn.commit()
+                applied.append(number)
+        finally:
+            await conn.rollback()
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+            await conn.commit()
+    return applied
+
+async def check_schema(engine):
+    """
+    Fail fast when the database is behind the code. A newer schema is accepted,
+    so replicas of the previous release keep running during a rollout.
+
+    Raises:
+        RuntimeError: Migrations are pending.
+    """
+    latest = list_migrations()[-1][0]
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+    if version < latest:
+        raise RuntimeError(f"Database schema is at version {version}, expected {latest}: run scripts/migrate.py")
@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import time
+import warnings
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Write the synthetic export to a scratch directory, never over the real one
+os.environ["ANALYTICS_DIR"] = tempfile.mkdtemp(prefix="straviz-analytics-")
+
+from models import Activity
+from services import analytics
+from services.columnar_export import ANALYTICS_DIR, COLUMNS, write_year
+
+SIZES = [int(size) for size in os.getenv("BENCH_SIZES", "10000,100000").split(",")]
+SPORTS = ["Run", "Ride", "Walk", "Hike", "Swim"]
+YEARS = list(range(2015, 2025))
+
+def synthetic_rows(count: int, rng: np.random.Generator) -> list:
+    """Activities spread evenly over ten years, with the exported columns in COLUMNS order."""
+    start = datetime(YEARS[0], 1, 1)
+    seconds = np.sort(rng.integers(0, (datetime(YEARS[-1] + 1, 1, 1) - start).total_seconds(), count))
+    rows = []
+    for i, offset in enumerate(seconds.tolist()):
+        date = start + timedelta(seconds=offset)
+        distance = float(rng.uniform(2_000, 60_000))
+        moving_time = int(distance / rng.uniform(2.5, 8.0))
+        rows.append((
+            i + 1, 1, SPORTS[i % len(SPORTS)], date, date + timedelta(hours=1), distance, moving_time,
+            moving_time + 60, float(rng.uniform(0, 800)), distance / moving_time, 140.0, 175.0,
+        ))
+    return rows
+
+def orm_summary(rows: list) -> dict:
+    """The ORM path: one Activity object per row, serialized with .dict() and summed in Python."""
+    totals = defaultdict(lambda: {"count": 0, "distance": 0.0, "moving_time": 0.0, "elevation": 0.0})
+    for row in rows:
+        activity = Activity(**dict(zip(COLUMNS, row)), name="", type="", timezone="", utc_offset=0.0).dict()
+        year = totals[activity["start_date_local"].year]
+        year["count"] += 1
+        year["distance"] += activity["distance"] / 1000
+        year["moving_time"] += activity["moving_time"] / 3600
+        year["elevation"] += activity["total_elevation_gain"]
+    return totals
+
+def export(rows: list):
+    by_year = defaultdict(list)
+    for row in rows:
+        # Split by local year (start_date_local), like export_changed_years
+        by_year[row[4].year].append(row)
+    for year in YEARS:
+        write_year(year, by_year[year])
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def run_benchmark():
+    # .dict() mirrors the activities endpoint, its deprecation notice is noise here
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    rng = np.random.default_rng(21)
+    print(f"Scratch export directory: {ANALYTICS_DIR}")
+    print(f"{'activities':>10} {'ORM':>9} {'export':>9} {'cold':>9} {'warm':>9} {'compare':>9} {'speedup':>8}")
+    for count in SIZES:
+        rows = synthetic_rows(count, rng)
+        expected, orm_time = timed(orm_summary, rows)
+        _, export_time = timed(export, rows)
+        analytics._tables.clear()
+        result, cold_time = timed(analytics.summary, YEARS)
+        _, warm_time = timed(analytics.summary, YEARS)
+        _, compare_time = timed(analytics.compare_years, YEARS, "distance", "week", True)
+        for year in YEARS:
+            assert result[year]["count"] == expected[year]["count"], "summary and ORM path disagree"
+            assert abs(result[year]["distance"] - expected[year]["distance"]) < 0.01 * count
+        print(
+            f"{count:>10} {orm_time:>8.3f}s {export_time:>8.3f}s {cold_time:>8.3f}s {warm_time:>8.4f}s "
+            f"{compare_time:>8.4f}s {orm_time / warm_time:>7.0f}x"
+        )
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.best_efforts import best_distance_time, compute_efforts
+from services.streams import pack_stream, unpack_stream
+
+ACTIVITIES = int(os.getenv("BENCH_ACTIVITIES", "300"))
+# The pairwise scan is slow, it only runs on the first few activities
+NAIVE_ACTIVITIES = 3
+
+def synthetic_streams(rng: np.random.Generator) -> dict:
+    """A 30 min to 2 h run at 1 Hz with pace changes, a few pauses and a drifting heart rate."""
+    n = int(rng.integers(1800, 7200))
+    time = np.cumsum(np.where(rng.random(n) < 0.002, rng.integers(10, 120, n), 1)) - 1
+    speed = np.clip(3.0 + np.cumsum(rng.normal(0, 0.02, n)) + rng.normal(0, 0.2, n), 0.5, 7.0)
+    distance = np.concatenate([[0.0], np.cumsum(speed[:-1])])
+    heartrate = np.clip(np.rint(130 + 25 * speed / 7 + np.linspace(0, 15, n)), 60, 200)
+    return {"time": time, "distance": distance, "velocity_smooth": speed, "heartrate": heartrate}
+
+def check_null_round_trip(streams: dict, rng: np.random.Generator):
+    """Samples set to null come back as NaN, every other sample as it was packed."""
+    streams = {**streams, "latlng": np.stack([45 + streams["distance"] / 1e6, 6 + streams["distance"] / 1e6], axis=1)}
+    for name, values in streams.items():
+        gaps = rng.random(len(values)) < 0.05
+        gaps[0] = gaps[-1] = True
+        samples = [None if gap else value for gap, value in zip(gaps, values.tolist())]
+        unpacked = unpack_stream(name, pack_stream(name, samples))
+        expected = unpack_stream(name, pack_stream(name, values.tolist()))
+        assert np.isnan(unpacked[gaps]).all(), f"{name}: nulls not restored"
+        assert np.array_equal(unpacked[~gaps], expected[~gaps]), f"{name}: samples around nulls changed"
+
+def naive_distance_time(time: np.ndarray, distance: np.ndarray, target: float):
+    """Every start sample walks forward until `target` meters are covered."""
+    best = None
+    for i in range(len(distance)):
+        for j in range(i + 1, len(distance)):
+            if distance[j] - distance[i] >= target:
+                if best is None or time[j] - time[i] < best:
+                    best = time[j] - time[i]
+                break
+    return best
+
+def run_benchmark():
+    rng = np.random.default_rng(11)
+    activities = [synthetic_streams(rng) for _ in range(ACTIVITIES)]
+    samples = sum(len(a["time"]) for a in activities)
+    print(f"{ACTIVITIES} activities, {samples:,} samples")
+    check_null_round_trip(activities[0], rng)
+
+    start = time.perf_counter()
+    packed = [{name: pack_stream(name, a[name].tolist()) for name in a} for a in activities]
+    pack_time = time.perf_counter() - start
+    size = sum(len(blob) for row in packed for blob in row.values())
+    print(f"pack      {pack_time:>7.2f}s  {size:,} bytes ({size / samples:.1f} bytes/sample)")
+
+    start = time.perf_counter()
+    decoded = [{name: unpack_stream(name, blob) for name, blob in row.items()} for row in packed]
+    print(f"unpack    {time.perf_counter() - start:>7.2f}s")
+
+    start = time.perf_counter()
+    efforts = sum(len(compute_efforts(streams)) for streams in decoded)
+    elapsed = time.perf_counter() - start
+    print(f"efforts   {elapsed:>7.2f}s  {efforts:,} efforts, {elapsed / ACTIVITIES * 1000:.1f} ms/activity")
+
+    start = time.perf_counter()
+    for a in activities[:NAIVE_ACTIVITIES]:
+        expected = naive_distance_time(a["time"], a["distance"], 5000.0)
+        assert best_distance_time(a["time"], a["distance"], 5000.0)[0] == expected, "scans disagree"
+    naive = (time.perf_counter() - start) / NAIVE_ACTIVITIES
+    start = time.perf_counter()
+    for a in activities[:NAIVE_ACTIVITIES]:
+        best_distance_time(a["time"], a["distance"], 5000.0)
+    vectorized = (time.perf_counter() - start) / NAIVE_ACTIVITIES
+    print(f"best 5k   naive {naive * 1000:.0f} ms/activity, vectorized {vectorized * 1000:.2f} ms ({naive / vectorized:.0f}x)")
+
+if __name__ == "__main__":
+    run_benchmark()
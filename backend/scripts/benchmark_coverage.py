@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.synthetic_strava import POLYLINE_INTERVAL, SUMMARY_STEP, build_track
+from services.coverage import CoverageIndex
+from services.coverage_grid import cell_centers, track_cells
+
+ACTIVITIES = int(os.getenv("BENCH_ACTIVITIES", "5000"))
+# Activities added after the initial build, like a sync
+INCREMENT = int(os.getenv("BENCH_INCREMENT", "200"))
+RADII = [2_000, 10_000, 50_000]
+REPEATS = 20
+ATHLETE_ID = 900_000_001
+
+def synthetic_tracks(count: int) -> list:
+    """Tracks at the resolution of a stored summary polyline."""
+    return [build_track(ATHLETE_ID, i)["latlng"][::POLYLINE_INTERVAL * SUMMARY_STEP] for i in range(count)]
+
+def timed(fn, *args, repeats: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / repeats
+
+def build(tracks: list) -> CoverageIndex:
+    index = CoverageIndex()
+    for activity_id, points in enumerate(tracks):
+        index.add(activity_id, (len(points), 0, 0, 0, 0), track_cells(points))
+    return index
+
+def brute_force_unvisited(index: CoverageIndex, lat: float, lng: float, radius: float) -> int:
+    """Unvisited cells counted by checking every visited cell's distance, as a cross-check."""
+    keys, _ = index.visited()
+    cell_lat, cell_lng = cell_centers(keys, index.cell_size)
+    distance = np.hypot(cell_lat - lat, (cell_lng - lng) * np.cos(np.radians(lat))) * 111_320.0
+    return int((distance <= radius).sum())
+
+def run_benchmark():
+    tracks, generate_time = timed(synthetic_tracks, ACTIVITIES + INCREMENT)
+    print(f"Generated {len(tracks)} tracks ({sum(map(len, tracks))} points) in {generate_time:.1f}s")
+
+    index, build_time = timed(build, tracks[:ACTIVITIES])
+    print(f"Build     {ACTIVITIES} activities, {len(index.counts)} cells in {build_time:.3f}s")
+    start = time.perf_counter()
+    for activity_id in range(ACTIVITIES, ACTIVITIES + INCREMENT):
+        index.add(activity_id, (len(tracks[activity_id]), 0, 0, 0, 0), track_cells(tracks[activity_id]))
+    print(f"Increment {INCREMENT} activities in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    # Off to the side of the athlete's home, where part of the area is still unexplored
+    lat, lng = tracks[0][0] + [0.0, 0.1]
+    for radius in RADII:
+        result, seconds = timed(index.unvisited, lat, lng, radius, 1000, repeats=REPEATS)
+        assert result["visited"] == brute_force_unvisited(index, lat, lng, radius), "unvisited cells disagree"
+        print(f"Unvisited {radius / 1000:>4.0f} km: {result['cells']:>7} cells, {result['coverage']:.1%} covered in {seconds * 1000:.2f}ms")
+
+    hotspots, seconds = timed(index.hotspots, 5, 20)
+    print(f"Hotspots  {len(hotspots)} clusters in {seconds * 1000:.1f}ms, busiest crossed by {hotspots[0]['activities']} activities")
+
+    path = os.path.join(tempfile.mkdtemp(prefix="straviz-coverage-"), "coverage.npz")
+    _, save_time = timed(index.save, path)
+    loaded, load_time = timed(CoverageIndex.load, path)
+    assert loaded.counts == index.counts, "reloaded index differs"
+    print(f"Save {save_time * 1000:.0f}ms, load {load_time * 1000:.0f}ms, {os.path.getsize(path) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    run_benchmark()
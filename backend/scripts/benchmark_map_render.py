@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_simplify import synthetic_track
+from services.geometry import SCALE
+from services.map_render import draw_map
+from services.simplify import level_for_tolerance, simplify_tiers
+
+ACTIVITIES = int(os.getenv("BENCH_ACTIVITIES", "2000"))
+
+def run_benchmark():
+    rng = np.random.default_rng(7)
+    tracks = [synthetic_track(rng) for _ in range(ACTIVITIES)]
+    points = np.concatenate(tracks)
+    bounds = (*(points.min(axis=0) / SCALE), *(points.max(axis=0) / SCALE))
+
+    print(f"{'size':>6} {'level':>5} {'vertices':>10} {'render':>8} {'png':>10}")
+    for size in (512, 1024, 2048):
+        # Same tier choice as render_year_map: bounds span ~60 km here
+        level = level_for_tolerance(60_000 / size)
+        tiered = tracks if level == 0 else [simplify_tiers(t)[level] for t in tracks]
+        start = time.perf_counter()
+        png = draw_map(tiered, bounds, size, size, "dark")
+        elapsed = time.perf_counter() - start
+        print(f"{size:>6} {level:>5} {sum(len(t) for t in tiered):>10} {elapsed:>7.2f}s {len(png):>10,}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.route_grid import RouteGrid, haversine
+
+# The linear scan is quadratic, above this size it is skipped
+NAIVE_LIMIT = 10_000
+
+def synthetic_centers(count: int, rng: random.Random) -> list:
+    """Route centres clustered around a few home bases, like a real athlete's history."""
+    bases = [(48.85 + rng.uniform(-0.3, 0.3), 2.35 + rng.uniform(-0.5, 0.5)) for _ in range(20)]
+    centers = []
+    for _ in range(count):
+        lat, lng = rng.choice(bases)
+        spread = rng.choice([0.002, 0.02, 0.2])
+        centers.append((lat + rng.gauss(0, spread), lng + rng.gauss(0, spread)))
+    return centers
+
+def naive_scan(centers: list, radius: float = 100.0) -> list:
+    """The frontend's analyzeRouteFrequency: compare against every visited area."""
+    areas, flags = [], []
+    for lat, lng in centers:
+        area = next((a for a in areas if haversine(lat, lng, a[0], a[1]) < radius), None)
+        if area:
+            area[2] += 1
+            flags.append(False)
+        else:
+            areas.append([lat, lng, 1])
+            flags.append(True)
+    return flags
+
+def grid_scan(centers: list) -> list:
+    grid = RouteGrid()
+    return [grid.visit(lat, lng)[1] for lat, lng in centers]
+
+def run_benchmark():
+    rng = random.Random(42)
+    print(f"{'activities':>10} {'grid':>10} {'linear scan':>12} {'speedup':>8}")
+    for count in (5_000, 50_000):
+        centers = synthetic_centers(count, rng)
+        start = time.perf_counter()
+        grid_flags = grid_scan(centers)
+        grid_time = time.perf_counter() - start
+
+        if count > NAIVE_LIMIT:
+            print(f"{count:>10} {grid_time:>9.3f}s {'skipped':>12} {'-':>8}")
+            continue
+        start = time.perf_counter()
+        naive_flags = naive_scan(centers)
+        naive_time = time.perf_counter() - start
+        assert grid_flags == naive_flags, "grid and linear scan disagree"
+        print(f"{count:>10} {grid_time:>9.3f}s {naive_time:>11.3f}s {naive_time / grid_time:>7.0f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,100 @@
+import json
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timedelta
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from models import Activity
+from services.activity_payload import COLUMNS, STREAM_BATCH, encode_batch
+
+ACTIVITIES = int(os.getenv("BENCH_ACTIVITIES", "5000"))
+# Encoded polyline lengths of a typical hour-long activity
+POLYLINE_CHARS = 12_000
+SUMMARY_CHARS = 600
+
+def synthetic_row(i: int, rng: random.Random, polylines: list) -> tuple:
+    """An activity row in activity_payload.COLUMNS order, polylines drawn from a shared pool and no stored track."""
+    start = datetime(2024, 1, 1) + timedelta(hours=i * 1.7)
+    values = {
+        "id": i + 1, "athlete_id": 1, "name": f"Morning Run {i}", "distance": rng.uniform(2e3, 6e4),
+        "moving_time": rng.randint(600, 14_400), "elapsed_time": rng.randint(600, 15_000),
+        "total_elevation_gain": rng.uniform(0, 900), "type": "Run", "sport_type": "Run",
+        "start_date": start, "start_date_local": start + timedelta(hours=1), "timezone": "Europe/Paris",
+        "utc_offset": 3600.0, "average_speed": rng.uniform(2, 8), "max_speed": rng.uniform(8, 15),
+        "average_heartrate": rng.uniform(120, 170), "max_heartrate": rng.uniform(170, 195),
+        "elev_high": rng.uniform(100, 900), "elev_low": rng.uniform(0, 100),
+        "map_polyline": polylines[i % len(polylines)],
+        "map_summary_polyline": polylines[i % len(polylines)][:SUMMARY_CHARS], "deltas": None,
+    }
+    return tuple(values[column.name] for column in COLUMNS)
+
+def row_batches(count: int):
+    """Rows as the server-side cursor hands them out, STREAM_BATCH at a time."""
+    rng = random.Random(22)
+    polylines = ["".join(rng.choices(string.ascii_letters, k=POLYLINE_CHARS)) for _ in range(64)]
+    for start in range(0, count, STREAM_BATCH):
+        yield [synthetic_row(i, rng, polylines) for i in range(start, min(start + STREAM_BATCH, count))]
+
+def model_path(count: int) -> list:
+    """The previous /strava/data: load every Activity, .dict() and re-nest each, then encode it all."""
+    activities = [Activity(**dict(zip([c.name for c in COLUMNS[:-1]], row))) for batch in row_batches(count) for row in batch]
+    transformed = []
+    for activity in activities:
+        activity_dict = activity.dict()
+        activity_dict["map"] = {
+            "polyline": activity_dict.pop("map_polyline"),
+            "summary_polyline": activity_dict.pop("map_summary_polyline")
+        }
+        transformed.append(activity_dict)
+    return [json.dumps(jsonable_encoder(transformed)).encode()]
+
+def stream_path(count: int, ndjson: bool) -> tuple:
+    """The streamed /strava/data, with chunks kept like cached_stream_response does."""
+    chunks = [] if ndjson else [b"["]
+    for i, rows in enumerate(row_batches(count)):
+        chunks.append(encode_batch(rows, ndjson, i == 0))
+        if i == 0:
+            first_chunk = time.perf_counter()
+    if not ndjson:
+        chunks.append(b"]")
+    return chunks, first_chunk
+
+def measure(fn, *args):
+    """Time a run, then repeat it under tracemalloc for the peak, which slows it down."""
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, start, elapsed, peak
+
+def run_benchmark():
+    # .dict() is what the previous endpoint called, its deprecation notice is noise here
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    print(f"{ACTIVITIES} activities with {POLYLINE_CHARS}-character polylines")
+    print(f"{'path':>14} {'total':>9} {'first chunk':>12} {'peak memory':>12} {'body':>10}")
+
+    chunks, _, elapsed, peak = measure(model_path, ACTIVITIES)
+    expected = json.loads(chunks[0])
+    print(f"{'model dicts':>14} {elapsed:>8.2f}s {elapsed:>11.2f}s {peak / 2**20:>10.0f}MB {len(chunks[0]) / 2**20:>8.0f}MB")
+
+    for ndjson in (False, True):
+        (chunks, first_chunk), start, elapsed, peak = measure(stream_path, ACTIVITIES, ndjson)
+        body = b"".join(chunks)
+        items = [json.loads(line) for line in body.splitlines()] if ndjson else json.loads(body)
+        assert items == expected, "streamed body differs from the model path"
+        name = "orjson ndjson" if ndjson else "orjson array"
+        print(f"{name:>14} {elapsed:>8.2f}s {first_chunk - start:>11.3f}s {peak / 2**20:>10.0f}MB {len(body) / 2**20:>8.0f}MB")
+
+if __name__ == "__main__":
+    run_benchmark()
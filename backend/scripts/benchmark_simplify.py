@@ -0,0 +1,53 @@
+import gzip
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geometry import SCALE, build_geometry, encode_polyline, pack_deltas, pack_payload
+from services.simplify import TIER_TOLERANCES, simplify_tiers
+
+TRACKS = int(os.getenv("BENCH_TRACKS", "500"))
+
+def synthetic_track(rng: np.random.Generator) -> np.ndarray:
+    """A wandering route around Paris, one point roughly every 10 meters."""
+    n = int(rng.integers(300, 3000))
+    heading = np.cumsum(rng.normal(0, 0.15, n))
+    step = 10 / 111_320 * SCALE
+    lat = 48.85 * SCALE + rng.normal(0, 2000) + np.cumsum(np.cos(heading) * step)
+    lng = 2.35 * SCALE + rng.normal(0, 2000) + np.cumsum(np.sin(heading) * step * 1.5)
+    return np.stack([lat, lng], axis=1).astype(np.int32)
+
+def run_benchmark():
+    rng = np.random.default_rng(42)
+    tracks = [synthetic_track(rng) for _ in range(TRACKS)]
+
+    start = time.perf_counter()
+    tiers = [simplify_tiers(points) for points in tracks]
+    elapsed = time.perf_counter() - start
+    print(f"Simplified {TRACKS} tracks into {len(TIER_TOLERANCES)} tiers in {elapsed:.2f}s")
+
+    # Bytes per level: polyline text, stored compressed tracks, binary payload and what goes on the wire
+    print(f"{'level':>5} {'tolerance':>10} {'vertices':>10} {'polyline':>12} {'stored':>12} {'payload':>12} {'gzipped':>12}")
+    for level in [0, *TIER_TOLERANCES]:
+        rows = []
+        for i, points in enumerate(tracks):
+            simplified = points if level == 0 else tiers[i][level]
+            row = build_geometry(i, points)
+            row.update(point_count=len(simplified), deltas=pack_deltas(simplified))
+            rows.append(SimpleNamespace(**row))
+        payload = pack_payload(rows)
+        vertices = sum(row.point_count for row in rows)
+        polylines = sum(len(encode_polyline(points if level == 0 else tiers[i][level])) for i, points in enumerate(tracks))
+        stored = sum(len(row.deltas) for row in rows)
+        tolerance = f"{TIER_TOLERANCES.get(level, 0):.0f} m"
+        print(f"{level:>5} {tolerance:>10} {vertices:>10} {polylines:>12,} {stored:>12,} {len(payload):>12,} "
+              f"{len(gzip.compress(payload, compresslevel=6)):>12,}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Add the parent directory to sys.path
+sys.path.append(BACKEND_DIR)
+
+MOCK_URL = os.getenv("MOCK_URL", "http://127.0.0.1:8765")
+REPEATS = int(os.getenv("BENCH_REPEATS", "20"))
+# Activities whose streams are fetched in the streams scenario
+STREAM_LIMIT = int(os.getenv("BENCH_STREAMS", "200"))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "data", "benchmarks")
+CONFIG_VARS = [
+    "MOCK_ATHLETES", "MOCK_ACTIVITIES", "MOCK_SEED", "MOCK_LATENCY_MS", "MOCK_JITTER_MS",
+    "MOCK_RATE_LIMIT", "MOCK_429_RATE", "SYNC_CONCURRENCY", "DB_POOL_SIZE",
+]
+
+def configure():
+    """
+    Point the backend at the scratch database and the mock server; must run
+    before anything imports `database`.
+    """
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        sys.exit("Set BENCH_DATABASE_URL to a scratch database: the suite drops and recreates its public schema.")
+    os.environ["DATABASE_URL"] = url
+    os.environ["STRAVA_API_URL"] = f"{MOCK_URL}/api/v3"
+    os.environ["STRAVA_OAUTH_URL"] = f"{MOCK_URL}/oauth/token"
+    os.environ["ANALYTICS_DIR"] = tempfile.mkdtemp(prefix="straviz-bench-")
+    if not os.getenv("TOKEN_ENCRYPTION_KEY"):
+        from cryptography.fernet import Fernet
+        os.environ["TOKEN_ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+
+async def start_mock() -> tuple:
+    """
+    Run scripts/mock_strava.py in its own process, so its CPU time does not
+    count against the backend, and wait until it has generated its athletes.
+    """
+    env = {**os.environ, "MOCK_PORT": MOCK_URL.rsplit(":", 1)[1]}
+    process = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, "scripts", "mock_strava.py")], env=env)
+    async with httpx.AsyncClient() as client:
+        while process.poll() is None:
+            try:
+                return process, (await client.get(f"{MOCK_URL}/mock/athletes")).json()
+            except httpx.TransportError:
+                await asyncio.sleep(0.5)
+    raise RuntimeError("The mock Strava server exited")
+
+async def reset_database(profiles: list):
+    """
+    Empty schema plus the mock's athletes, with expired access tokens so the
+    first sync goes through the token refresh endpoint.
+    """
+    from sqlalchemy import text
+    from database import async_session, get_engine, init_db
+    from models import Athlete
+    from services.token_store import encrypt_token
+
+    async with get_engine().begin() as conn:
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+    await init_db()
+    async with async_session() as session:
+        for profile in profiles:
+            session.add(Athlete(
+                id=profile["id"], firstname=profile["firstname"], lastname=profile["lastname"],
+                access_token=encrypt_token("expired"), refresh_token=encrypt_token(profile["refresh_token"]),
+                expires_at=datetime(1970, 1, 1),
+            ))
+        await session.commit()
+
+def record(results: list, name: str, value: float, unit: str):
+    results.append({"name": name, "value": round(value, 4), "unit": unit})
+    print(f"  {name:<56} {value:>12.3f} {unit}")
+
+async def bench_sync(results: list, athlete_id: int):
+    from database import async_session
+    from models import Athlete
+    from services.stream_store import sync_streams
+    from services.sync_scheduler import sync_all
+    from services.token_store import get_access_token
+
+    for name, full in (("sync.full", True), ("sync.incremental", False)):
+        start = time.perf_counter()
+        counts = await sync_all(full=full)
+        seconds = time.perf_counter() - start
+        failed = {key: value["error"] for key, value in counts.items() if "error" in value}
+        if failed:
+            raise RuntimeError(f"Sync failed: {failed}")
+        fetched = sum(value["fetched"] for value in counts.values())
+        record(results, f"{name}.seconds", seconds, "s")
+        record(results, f"{name}.activities", fetched, "activities")
+        if fetched:
+            record(results, f"{name}.throughput", fetched / seconds, "activities/s")
+
+    async with async_session() as session:
+        token = await get_access_token(session, await session.get(Athlete, athlete_id))
+        start = time.perf_counter()
+        stored = await sync_streams(session, token, athlete_id, limit=STREAM_LIMIT)
+        seconds = time.perf_counter() - start
+    record(results, "sync.streams.seconds", seconds, "s")
+    record(results, "sync.streams.throughput", stored / seconds, "activities/s")
+
+async def bench_api(results: list, athlete_id: int):
+    """Cold (empty response cache) and warm latency of the read endpoints for one athlete, in process."""
+    from main import app
+    from routers.stats import AGGREGATES
+    from services.response_cache import response_cache
+
+    paths = [
+        "/strava/data?year=last_year", "/strava/data?year=last_year&format=ndjson",
+        *(f"/strava/stats/{name}?year=last_year" for name in AGGREGATES), "/strava/analytics/summary",
+    ]
+    transport = httpx.ASGITransport(app=app)
+    params = {"athlete_id": athlete_id}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", params=params, timeout=120) as client:
+
+        async def get(path: str) -> float:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            return (time.perf_counter() - start) * 1000
+
+        for path in paths:
+            response_cache.clear()
+            cold = await get(path)
+            warm = sorted([await get(path) for _ in range(REPEATS)])
+            record(results, f"api.{path}.cold", cold, "ms")
+            record(results, f"api.{path}.p50", warm[len(warm) // 2], "ms")
+            record(results, f"api.{path}.p95", warm[min(int(len(warm) * 0.95), len(warm) - 1)], "ms")
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BACKEND_DIR).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {entry["name"]: entry["value"] for entry in json.load(f)["results"]}
+    print(f"\nChange against {baseline_path}:")
+    for entry in results:
+        before = baseline.get(entry["name"])
+        if before:
+            print(f"  {entry['name']:<56} {before:>10.3f} -> {entry['value']:>10.3f} {entry['unit']:<12} {(entry['value'] / before - 1) * 100:>+7.1f}%")
+
+async def run_suite(output: str, baseline: str):
+    """
+    Sync synthetic athletes from the mock Strava server into a scratch
+    database, then time the read endpoints, and write the results as JSON.
+    """
+    configure()
+    process, profiles = await start_mock()
+    results = []
+    try:
+        await reset_database(profiles)
+        print(f"Synced {len(profiles)} synthetic athletes from {MOCK_URL}:")
+        await bench_sync(results, profiles[0]["id"])
+        print("Read endpoints:")
+        await bench_api(results, profiles[0]["id"])
+        async with httpx.AsyncClient() as client:
+            strava_requests = (await client.get(f"{MOCK_URL}/mock/stats")).json()["requests"]
+    finally:
+        from services.strava_client import close_client
+        await close_client()
+        process.terminate()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {name: os.getenv(name) for name in CONFIG_VARS},
+        "results": results,
+        "strava_requests": strava_requests,
+    }
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"results-{report['timestamp'].replace(':', '')}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    if baseline:
+        compare(results, baseline)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync and API benchmarks against a mock Strava server.")
+    parser.add_argument("--output", help="Results file (default data/benchmarks/results-<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    asyncio.run(run_suite(args.output, args.baseline))
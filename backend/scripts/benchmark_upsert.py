@@ -0,0 +1,82 @@
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import init_db, engine, async_session
+from models import Activity
+from services.activity_upsert import parse_activity, upsert_activities
+
+# Synthetic ids live far above real Strava ids so the benchmark can clean up after itself
+BASE_ID = 9_000_000_000_000
+COUNT = int(os.getenv("BENCH_ACTIVITIES", "10000"))
+
+def synthetic_activity(i: int) -> dict:
+    start = datetime(2024, 1, 1) + timedelta(hours=7 * i)
+    return {
+        "id": BASE_ID + i,
+        "name": f"Synthetic run {i}",
+        "distance": random.uniform(3000, 20000),
+        "moving_time": random.randint(900, 7200),
+        "elapsed_time": random.randint(900, 7800),
+        "total_elevation_gain": random.uniform(0, 400),
+        "type": "Run",
+        "sport_type": "Run",
+        "start_date": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "start_date_local": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "timezone": "(GMT+01:00) Europe/Paris",
+        "utc_offset": 3600.0,
+        "map": {"polyline": None, "summary_polyline": "_p~iF~ps|U_ulLnnqC_mqNvxq`@"},
+        "average_speed": random.uniform(2.5, 4.0),
+    }
+
+async def legacy_upsert(session: AsyncSession, rows: list):
+    """The previous per-activity SELECT + setattr path, kept for comparison."""
+    for row in rows:
+        result = await session.exec(select(Activity).where(Activity.id == row["id"]))
+        existing = result.first()
+        if existing:
+            for key, value in row.items():
+                setattr(existing, key, value)
+            session.add(existing)
+        else:
+            session.add(Activity(**row))
+
+async def timed(label: str, coro_factory):
+    async with async_session() as session:
+        start = time.perf_counter()
+        result = await coro_factory(session)
+        await session.commit()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s  {COUNT / elapsed:10.0f} activities/s  {result or ''}")
+    return elapsed
+
+async def cleanup():
+    async with engine.begin() as conn:
+        await conn.execute(delete(Activity).where(Activity.id >= BASE_ID))
+
+async def run_benchmark():
+    await init_db()
+    await cleanup()
+    rows = [parse_activity(synthetic_activity(i)) for i in range(COUNT)]
+
+    print(f"Upserting {COUNT} synthetic activities")
+    legacy_insert = await timed("legacy insert", lambda s: legacy_upsert(s, rows))
+    legacy_update = await timed("legacy re-sync", lambda s: legacy_upsert(s, rows))
+    await cleanup()
+    bulk_insert = await timed("bulk insert", lambda s: upsert_activities(s, rows))
+    bulk_update = await timed("bulk re-sync (unchanged)", lambda s: upsert_activities(s, rows))
+    await cleanup()
+
+    print(f"Speedup insert: {legacy_insert / bulk_insert:.1f}x, re-sync: {legacy_update / bulk_update:.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
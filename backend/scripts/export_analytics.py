@@ -0,0 +1,21 @@
+import asyncio
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, async_session
+from services.columnar_export import export_changed_years
+
+async def run_export():
+    print("🔄 Initializing database...")
+    await init_db()
+
+    print("📦 Exporting changed years to Parquet...")
+    async with async_session() as session:
+        years = await export_changed_years(session)
+    print(f"✅ Exported {len(years)} years: {', '.join(map(str, years)) or 'none changed'}.")
+
+if __name__ == "__main__":
+    asyncio.run(run_export())
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+BASE_URL = os.getenv("LOAD_TEST_URL", "http://localhost:8000")
+CONCURRENCY = int(os.getenv("LOAD_TEST_CONCURRENCY", "32"))
+DURATION = float(os.getenv("LOAD_TEST_DURATION", "15"))
+# /strava/data is served from the response cache once warm; the listing hits Postgres on every request
+DEFAULT_PATHS = ["/strava/data?year=last_year", "/strava/activities?limit=50"]
+# Athlete whose data is read, required once several are connected
+ATHLETE_ID = os.getenv("LOAD_TEST_ATHLETE")
+
+async def worker(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+async def run_path(client: httpx.AsyncClient, path: str):
+    await client.get(path)  # warm the caches and the pool
+    latencies, errors = [], []
+    deadline = time.perf_counter() + DURATION
+    await asyncio.gather(*(worker(client, path, deadline, latencies, errors) for _ in range(CONCURRENCY)))
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else 0.0
+
+    print(f"{path:<36} {len(latencies) / DURATION:>9.1f} req/s  p50 {percentile(0.5):>7.1f} ms  "
+          f"p95 {percentile(0.95):>7.1f} ms  p99 {percentile(0.99):>7.1f} ms  errors {len(errors)}")
+
+async def run_load_test(paths: list):
+    """
+    Hammer a running API and report throughput and latency per path.
+
+    To compare configurations, run it once against the API started with the old
+    behaviour (DB_ECHO=true, DB_POOL_SIZE=5, DB_MAX_OVERFLOW=10) and once with the
+    defaults, both against the same local Postgres.
+    """
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+    params = {"athlete_id": ATHLETE_ID} if ATHLETE_ID else None
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, params=params, timeout=30) as client:
+        print(f"{CONCURRENCY} concurrent clients, {DURATION:.0f}s per path against {BASE_URL}")
+        for path in paths:
+            await run_path(client, path)
+        db = (await client.get("/strava/db", params={"limit": 5})).json()
+        print(f"pool {db['pool']}, {db['statements']} statements in {db['total_seconds']:.2f}s")
+        for entry in db["slowest"]:
+            print(f"  {entry['count']:>7} x {entry['mean_ms']:>8.3f} ms  {entry['sql'][:90]}")
+
+if __name__ == "__main__":
+    asyncio.run(run_load_test(sys.argv[1:] or DEFAULT_PATHS))
@@ -0,0 +1,63 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = int(os.getenv("STARTUP_PORT", "8123"))
+RUNS = int(os.getenv("STARTUP_RUNS", "5"))
+TIMEOUT = float(os.getenv("STARTUP_TIMEOUT", "60"))
+# Answered without touching the database, so it times the boot and not a query
+PATH = os.getenv("STARTUP_PATH", "/")
+
+def import_time() -> float:
+    """Seconds to import the app in a fresh interpreter."""
+    code = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def first_request_time() -> float:
+    """
+    Seconds from spawning uvicorn to the first successful response. uvicorn
+    only accepts connections once the startup hook returned, so this covers
+    interpreter start, imports, the readiness check and the first request.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        with httpx.Client() as client:
+            while time.perf_counter() - start < TIMEOUT:
+                if process.poll() is not None:
+                    raise RuntimeError("The app exited during startup, is the database migrated (scripts/migrate.py)?")
+                try:
+                    if client.get(f"http://127.0.0.1:{PORT}{PATH}").status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    time.sleep(0.01)
+        raise RuntimeError(f"No response within {TIMEOUT:.0f}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+def summarize(name: str, samples: list) -> dict:
+    print(f"{name:<20} median {statistics.median(samples):.3f}s  min {min(samples):.3f}s  max {max(samples):.3f}s")
+    return {"name": name, "value": round(statistics.median(samples), 4), "unit": "s"}
+
+if __name__ == "__main__":
+    # Pass --output <file> to also write the medians as JSON, in the format of benchmark_suite.py
+    args = sys.argv[1:]
+    print(f"{RUNS} runs against the database configured in the environment")
+    results = [
+        summarize("startup.import", [import_time() for _ in range(RUNS)]),
+        summarize("startup.first_request", [first_request_time() for _ in range(RUNS)]),
+    ]
+    if "--output" in args:
+        with open(args[args.index("--output") + 1], "w") as f:
+            json.dump({"results": results}, f, indent=2)
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_engine, init_db
+from schema import current_version, list_migrations
+
+def models_sql() -> str:
+    """
+    CREATE statements for the current models, as a starting point when writing
+    the migration of a new table or index. Recent SQLModel releases render
+    datetime fields WITH TIME ZONE; timestamps are naive UTC here, write them
+    WITHOUT TIME ZONE as in 0001_initial.sql.
+    """
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateIndex, CreateTable
+    from sqlmodel import SQLModel
+    import models  # noqa: F401, registers the tables
+
+    dialect = postgresql.dialect()
+    statements = []
+    for table in SQLModel.metadata.sorted_tables:
+        statements.append(str(CreateTable(table, if_not_exists=True).compile(dialect=dialect)).strip())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect)).strip())
+    return "".join("\n".join(line.rstrip() for line in statement.splitlines()) + ";\n\n" for statement in statements)
+
+async def show_status():
+    async with get_engine().connect() as conn:
+        version = await current_version(conn)
+    print(f"📦 Database schema at version {version}.")
+    for number, name, _ in list_migrations():
+        print(f"  {'✅' if number <= version else '⏳'} {name}")
+
+if __name__ == "__main__":
+    # Applies pending migrations by default; run it before starting the app.
+    # --status lists applied and pending migrations, --sql prints the models' CREATE statements
+    args = sys.argv[1:]
+    if "--sql" in args:
+        print(models_sql(), end="")
+    elif "--status" in args:
+        asyncio.run(show_status())
+    else:
+        print("🔄 Migrating database...")
+        asyncio.run(init_db())
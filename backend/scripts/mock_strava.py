@@ -0,0 +1,164 @@
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.synthetic_strava import activity_id, build_activity, build_streams, start_times
+
+# Point the backend at it with STRAVA_API_URL=http://127.0.0.1:8765/api/v3
+# and STRAVA_OAUTH_URL=http://127.0.0.1:8765/oauth/token
+PORT = int(os.getenv("MOCK_PORT", "8765"))
+ATHLETES = int(os.getenv("MOCK_ATHLETES", "3"))
+ACTIVITIES = int(os.getenv("MOCK_ACTIVITIES", "2000"))
+SEED = int(os.getenv("MOCK_SEED", "7"))
+# Injected latency per API request, mean and standard deviation in milliseconds
+LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "0"))
+JITTER_MS = float(os.getenv("MOCK_JITTER_MS", "0"))
+# "15-minute,daily" quotas like Strava's headers; high by default so benchmarks measure the backend
+RATE_LIMIT = os.getenv("MOCK_RATE_LIMIT", "100000,1000000")
+# Share of requests answered with a 429 regardless of the quota
+RANDOM_429 = float(os.getenv("MOCK_429_RATE", "0"))
+TOKEN_TTL = int(os.getenv("MOCK_TOKEN_TTL", "21600"))
+FIRST_ATHLETE_ID = 900_000_001
+WINDOWS = (15 * 60, 24 * 60 * 60)
+
+app = FastAPI(title="Mock Strava")
+state = {"athletes": {}, "tokens": {}, "usage": [0, 0], "window_ids": [None, None], "requests": Counter()}
+
+def generate():
+    """Build every athlete's history up front, so requests measure the client and not the generator."""
+    start = time.perf_counter()
+    for athlete_id in range(FIRST_ATHLETE_ID, FIRST_ATHLETE_ID + ATHLETES):
+        starts = start_times(athlete_id, ACTIVITIES, SEED)
+        activities = [build_activity(athlete_id, i, int(s), SEED) for i, s in enumerate(starts)]
+        state["athletes"][athlete_id] = {"starts": starts, "activities": activities}
+    print(f"Generated {ATHLETES} athletes x {ACTIVITIES} activities in {time.perf_counter() - start:.1f}s")
+
+def issue_tokens(athlete_id: int) -> dict:
+    access_token = f"mock-access-{athlete_id}-{random.getrandbits(48):x}"
+    expires_at = int(time.time()) + TOKEN_TTL
+    state["tokens"][access_token] = (athlete_id, expires_at)
+    return {
+        "token_type": "Bearer", "access_token": access_token, "expires_at": expires_at,
+        "expires_in": TOKEN_TTL, "refresh_token": f"mock-refresh-{athlete_id}",
+    }
+
+def athlete_profile(athlete_id: int) -> dict:
+    return {"id": athlete_id, "firstname": "Synthetic", "lastname": f"Athlete {athlete_id - FIRST_ATHLETE_ID + 1}"}
+
+def rate_limit_headers() -> dict:
+    return {"X-RateLimit-Limit": RATE_LIMIT, "X-RateLimit-Usage": ",".join(map(str, state["usage"]))}
+
+def take_quota() -> bool:
+    """Count a request against both windows; False once either quota is spent."""
+    now = time.time()
+    for i, length in enumerate(WINDOWS):
+        if state["window_ids"][i] != int(now // length):
+            state["window_ids"][i], state["usage"][i] = int(now // length), 0
+    limits = [int(value) for value in RATE_LIMIT.split(",")]
+    if any(used >= limit for used, limit in zip(state["usage"], limits)):
+        return False
+    state["usage"] = [used + 1 for used in state["usage"]]
+    return True
+
+def endpoint(request: Request) -> str:
+    return re.sub(r"/\d+", "/{id}", request.url.path.removeprefix("/api/v3"))
+
+@app.middleware("http")
+async def strava_behaviour(request: Request, call_next):
+    """Latency, quotas and rate-limit headers on every API request."""
+    if not request.url.path.startswith("/api/v3"):
+        return await call_next(request)
+    if LATENCY_MS or JITTER_MS:
+        await asyncio.sleep(max(0.0, random.gauss(LATENCY_MS, JITTER_MS)) / 1000)
+    if not take_quota() or random.random() < RANDOM_429:
+        state["requests"][(endpoint(request), 429)] += 1
+        return JSONResponse({"message": "Rate Limit Exceeded"}, status_code=429, headers=rate_limit_headers())
+    response = await call_next(request)
+    response.headers.update(rate_limit_headers())
+    state["requests"][(endpoint(request), response.status_code)] += 1
+    return response
+
+def authorize(request: Request) -> int:
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    athlete_id, expires_at = state["tokens"].get(token, (None, 0))
+    if athlete_id is None or expires_at < time.time():
+        raise HTTPException(status_code=401, detail="Authorization Error")
+    return athlete_id
+
+@app.post("/oauth/token")
+async def oauth_token(request: Request):
+    form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+    grant = form.get("grant_type")
+    secret = form.get("refresh_token") if grant == "refresh_token" else form.get("code")
+    prefix = "mock-refresh-" if grant == "refresh_token" else "mock-code-"
+    athlete_id = int(secret[len(prefix):]) if secret and secret.startswith(prefix) and secret[len(prefix):].isdigit() else None
+    if athlete_id not in state["athletes"]:
+        raise HTTPException(status_code=400, detail="Bad Request")
+    tokens = issue_tokens(athlete_id)
+    return tokens if grant == "refresh_token" else {**tokens, "athlete": athlete_profile(athlete_id)}
+
+@app.get("/api/v3/athlete")
+async def read_athlete(request: Request):
+    return athlete_profile(authorize(request))
+
+@app.get("/api/v3/athlete/activities")
+async def list_activities(request: Request, page: int = 1, per_page: int = 30, before: int = None, after: int = None):
+    """Newest first, or oldest first when `after` is given, like Strava."""
+    athlete = state["athletes"][authorize(request)]
+    starts = athlete["starts"]
+    indexes = np.arange(len(starts))
+    if before is not None:
+        indexes = indexes[starts < before]
+    if after is not None:
+        indexes = indexes[starts[indexes] > after]
+    else:
+        indexes = indexes[::-1]
+    per_page = max(1, min(per_page, 200))
+    return [athlete["activities"][i] for i in indexes[(page - 1) * per_page:page * per_page]]
+
+def find_activity(request: Request, activity: int) -> tuple:
+    """(athlete id, index) of one of the caller's activities."""
+    athlete_id = authorize(request)
+    index = activity - activity_id(athlete_id, 0)
+    if not 0 <= index < len(state["athletes"][athlete_id]["activities"]):
+        raise HTTPException(status_code=404, detail="Record Not Found")
+    return athlete_id, index
+
+@app.get("/api/v3/activities/{activity}")
+async def read_activity(request: Request, activity: int):
+    athlete_id, index = find_activity(request, activity)
+    return state["athletes"][athlete_id]["activities"][index]
+
+@app.get("/api/v3/activities/{activity}/streams")
+async def read_streams(request: Request, activity: int, keys: str = "time", key_by_type: bool = True):
+    athlete_id, index = find_activity(request, activity)
+    return build_streams(athlete_id, index, keys.split(","), SEED)
+
+@app.get("/mock/athletes")
+async def read_mock_athletes():
+    """Connected athletes, with the refresh token to seed the backend's athlete table."""
+    return [{**athlete_profile(athlete_id), "refresh_token": f"mock-refresh-{athlete_id}"} for athlete_id in state["athletes"]]
+
+@app.get("/mock/stats")
+async def read_mock_stats():
+    return {
+        "usage": state["usage"],
+        "requests": [{"endpoint": path, "status": status, "count": count} for (path, status), count in state["requests"].items()],
+    }
+
+if __name__ == "__main__":
+    generate()
+    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="warning")
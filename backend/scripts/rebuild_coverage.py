@@ -0,0 +1,30 @@
+import asyncio
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import select
+from database import init_db, async_session
+from models import Athlete
+from services.coverage import CoverageIndex
+from services.coverage_store import COVERAGE_DIR, coverage_path, update_index
+
+async def run_rebuild():
+    print("🔄 Initializing database...")
+    await init_db()
+
+    print("🗺️ Rebuilding the coverage indexes from stored routes...")
+    os.makedirs(COVERAGE_DIR, exist_ok=True)
+    async with async_session() as session:
+        athlete_ids = (await session.exec(select(Athlete.id))).all()
+        for athlete_id in athlete_ids:
+            index = CoverageIndex()
+            count = await update_index(session, athlete_id, index)
+            index.save(coverage_path(athlete_id))
+            print(f"✅ Athlete {athlete_id}: indexed {count} activities over {len(index.counts)} cells.")
+    print(f"✅ Saved {len(athlete_ids)} indexes into {COVERAGE_DIR}.")
+
+if __name__ == "__main__":
+    asyncio.run(run_rebuild())
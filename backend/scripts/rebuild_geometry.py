@@ -0,0 +1,22 @@
+import asyncio
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, async_session
+from services.geometry_store import rebuild_geometries
+
+async def run_rebuild():
+    print("🔄 Initializing database...")
+    await init_db()
+
+    print("🗺️ Decoding and storing route geometries...")
+    async with async_session() as session:
+        count = await rebuild_geometries(session)
+        await session.commit()
+    print(f"✅ Stored geometries for {count} activities and cleared their summary polyline text.")
+
+if __name__ == "__main__":
+    asyncio.run(run_rebuild())
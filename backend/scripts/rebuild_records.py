@@ -0,0 +1,22 @@
+import asyncio
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, async_session
+from services.records import rebuild_records
+
+async def run_rebuild():
+    print("🔄 Initializing database...")
+    await init_db()
+
+    print("🏅 Computing best efforts and records from stored streams...")
+    async with async_session() as session:
+        count = await rebuild_records(session)
+        await session.commit()
+    print(f"✅ Computed best efforts for {count} activities.")
+
+if __name__ == "__main__":
+    asyncio.run(run_rebuild())
@@ -0,0 +1,22 @@
+import asyncio
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, async_session
+from services.rollups import rebuild_rollups
+
+async def run_rebuild():
+    print("🔄 Initializing database...")
+    await init_db()
+
+    print("🧮 Rebuilding daily and weekly rollups...")
+    async with async_session() as session:
+        await rebuild_rollups(session)
+        await session.commit()
+    print("✅ Rollups rebuilt.")
+
+if __name__ == "__main__":
+    asyncio.run(run_rebuild())
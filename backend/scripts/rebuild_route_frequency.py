@@ -0,0 +1,25 @@
+import asyncio
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import select
+from database import init_db, async_session
+from models import Athlete
+from services.route_frequency import update_route_frequency
+
+async def run_rebuild():
+    print("🔄 Initializing database...")
+    await init_db()
+
+    print("🧭 Recomputing route frequency analysis...")
+    async with async_session() as session:
+        for athlete_id in (await session.exec(select(Athlete.id))).all():
+            count = await update_route_frequency(session, athlete_id, rebuild=True)
+            print(f"✅ Athlete {athlete_id}: analysed {count} activities.")
+        await session.commit()
+
+if __name__ == "__main__":
+    asyncio.run(run_rebuild())
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, async_session
+from sqlmodel import select
+from models import WebhookEvent
+from services.strava_client import close_client
+from services.webhook_events import enqueue_event, process_pending
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webhook_samples.jsonl")
+DEFAULT_URL = "http://localhost:8000/strava/webhook"
+
+def read_payloads(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+async def post_payloads(payloads: list, url: str):
+    """Send the events to a running API, exactly like Strava would."""
+    async with httpx.AsyncClient() as client:
+        for payload in payloads:
+            response = await client.post(url, json=payload)
+            print(f"{payload['aspect_type']:>6} {payload['object_type']} {payload['object_id']}: {response.status_code}")
+
+async def apply_payloads(payloads: list):
+    """Queue the events and run the worker once in this process, no API needed."""
+    await init_db()
+    try:
+        async with async_session() as session:
+            for payload in payloads:
+                await enqueue_event(session, payload)
+            await session.commit()
+            print(f"✅ Applied {await process_pending(session)} events.")
+    finally:
+        await close_client()
+
+async def record_payloads(path: str):
+    """Dump every received event from the queue table, to replay later."""
+    async with async_session() as session:
+        events = (await session.exec(select(WebhookEvent).order_by(WebhookEvent.id))).all()
+    with open(path, "w") as f:
+        f.writelines(event.payload + "\n" for event in events)
+    print(f"✅ Recorded {len(events)} events to {path}.")
+
+if __name__ == "__main__":
+    # replay_webhooks.py [file] [--url URL]   POST recorded events to the API
+    # replay_webhooks.py [file] --direct      apply them without the API running
+    # replay_webhooks.py file --record        save the received events to a file
+    args = sys.argv[1:]
+    url = args[args.index("--url") + 1] if "--url" in args else DEFAULT_URL
+    files = [arg for arg in args if not arg.startswith("--") and arg != url]
+    path = files[0] if files else SAMPLES
+    if "--record" in args:
+        asyncio.run(record_payloads(path))
+    elif "--direct" in args:
+        asyncio.run(apply_payloads(read_payloads(path)))
+    else:
+        asyncio.run(post_payloads(read_payloads(path), url))
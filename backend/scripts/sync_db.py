@@ -1,112 +1,49 @@
 import asyncio
 import os
 import sys
-import httpx
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import init_db, engine
-from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
-from services.strava_service import sync_activities
-from dotenv import load_dotenv
+from database import init_db
+from services.sync_scheduler import sync_all, sync_athlete
+from services.strava_client import close_client, rate_limiter
 
-# Path to the mounted .env file in Docker
-ENV_PATH = "/app/.env"
-
-async def refresh_token():
-    """Refreshes the Strava access token and updates .env"""
-    print("🔄 Checking token status...")
-    load_dotenv(ENV_PATH)
-    
-    client_id = os.getenv("STRAVA_CLIENT_ID")
-    client_secret = os.getenv("STRAVA_CLIENT_SECRET")
-    refresh_token = os.getenv("STRAVA_REFRESH_TOKEN")
-
-    if not all([client_id, client_secret, refresh_token]):
-        print("❌ Missing credentials in .env")
-        return None
-
-    url = "https://www.strava.com/oauth/token"
-    data = {
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "refresh_token": refresh_token,
-        "grant_type": "refresh_token"
-    }
-
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(url, data=data)
-            
-            if resp.status_code == 200:
-                new_tokens = resp.json()
-                access_token = new_tokens.get("access_token")
-                new_refresh = new_tokens.get("refresh_token")
-                
-                print(f"✅ Token refreshed. Access Token: {access_token[:10]}...")
-                
-                # Update various env vars in the file while keeping others intact is hard without a parser
-                # But since we are inside the container and this file is mounted for this purpose, 
-                # we can aggressively rewrite it if we know the structure, or use a safer approach.
-                # For simplicity, we'll read lines and replace specific keys.
-                
-                new_lines = []
-                if os.path.exists(ENV_PATH):
-                    with open(ENV_PATH, "r") as f:
-                        lines = f.readlines()
-                        
-                    for line in lines:
-                        if line.startswith("STRAVA_ACCESS_TOKEN="):
-                            new_lines.append(f"STRAVA_ACCESS_TOKEN={access_token}\n")
-                        elif line.startswith("STRAVA_REFRESH_TOKEN="):
-                            new_lines.append(f"STRAVA_REFRESH_TOKEN={new_refresh}\n")
-                        else:
-                            new_lines.append(line)
-                else:
-                    # If file doesn't exist for some reason (should be mounted)
-                    print("⚠️ .env file not found at /app/.env")
-                    return access_token
-
-                with open(ENV_PATH, "w") as f:
-                    f.writelines(new_lines)
-                
-                # Reload env
-                os.environ["STRAVA_ACCESS_TOKEN"] = access_token
-                return access_token
-            else:
-                print(f"⚠️ Failed to refresh token: {resp.status_code} - {resp.text}")
-                # Fallback to existing token might fail if expired, but we return what we have
-                return os.getenv("STRAVA_ACCESS_TOKEN")
-    except Exception as e:
-        print(f"❌ Error refreshing token: {e}")
-        return os.getenv("STRAVA_ACCESS_TOKEN")
-
-async def run_sync():
-    # 1. Refresh Token
-    token = await refresh_token()
-    
-    if not token:
-        print("❌ Error: No valid access token available.")
+def print_counts(athlete_id: int, counts: dict):
+    if "error" in counts:
+        print(f"❌ Athlete {athlete_id}: sync failed: {counts['error']}")
         return
+    print(f"✅ Athlete {athlete_id}: synced {counts['fetched']} activities "
+          f"({counts['inserted']} new, {counts['updated']} updated, {counts['unchanged']} unchanged).")
+    if "streams" in counts:
+        print(f"✅ Athlete {athlete_id}: stored streams for {counts['streams']} activities.")
 
-    # 2. Init DB
+async def run_sync(full: bool = False, streams: bool = False, athlete_id: int = None):
+    # 1. Init DB
     print("🔄 Initializing database...")
     await init_db()
 
-    # 3. Sync
-    print("🚀 Starting sync with Strava...")
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    
+    # 2. Sync; access tokens are refreshed from the athlete table when they are about to expire
+    print("🚀 Starting full sync with Strava..." if full else "🚀 Starting incremental sync with Strava...")
     try:
-        async with async_session() as session:
-            count = await sync_activities(session, token)
-            print(f"✅ Success! Synced {count} activities.")
+        if athlete_id is not None:
+            print_counts(athlete_id, await sync_athlete(athlete_id, full=full, streams=streams))
+        else:
+            results = await sync_all(full=full, streams=streams)
+            if not results:
+                print("⚠️ No connected athletes, run scripts/auth.py or open /strava/athletes/authorize first.")
+            for key, counts in results.items():
+                print_counts(key, counts)
     except Exception as e:
         print(f"❌ Sync failed: {e}")
+    finally:
+        await close_client()
+        print(f"📊 Strava API budget: {rate_limiter.budget()}")
 
 if __name__ == "__main__":
-    asyncio.run(run_sync())
+    # Pass --full to ignore the stored high-water mark and backfill everything,
+    # --streams to also fetch per-second streams for activities that have none yet,
+    # --athlete <id> to sync a single athlete instead of all of them
+    args = sys.argv[1:]
+    athlete = int(args[args.index("--athlete") + 1]) if "--athlete" in args else None
+    asyncio.run(run_sync(full="--full" in args, streams="--streams" in args, athlete_id=athlete))
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from services.geometry import encode_polyline
+
+# sport_type -> (share of activities, speed range m/s, duration range s, cadence)
+SPORTS = {
+    "Run": (0.5, (2.4, 4.2), (1_200, 7_200), 85),
+    "Ride": (0.3, (5.0, 10.0), (1_800, 14_400), 85),
+    "Walk": (0.15, (1.1, 1.7), (1_200, 5_400), 55),
+    "Hike": (0.05, (0.8, 1.4), (3_600, 18_000), 50),
+}
+METERS_PER_DEGREE = 111_320.0
+# Full polylines keep one point every few seconds, summary polylines one in ten of those
+POLYLINE_INTERVAL = 5
+SUMMARY_STEP = 10
+YEARS = 5
+# Share of activities that follow one of the athlete's usual routes
+REPEAT_SHARE = 0.7
+ROUTES = 12
+UTC_OFFSET = 3600
+
+def history_end() -> datetime:
+    """Histories end on January 1st of the current year, so last_year is always fully covered."""
+    return datetime(datetime.now(timezone.utc).year, 1, 1)
+
+def activity_id(athlete_id: int, index: int) -> int:
+    return 10_000_000_000 + athlete_id % 100_000 * 100_000 + index
+
+def start_times(athlete_id: int, count: int, seed: int = 7) -> np.ndarray:
+    """Ascending epoch seconds of an athlete's activities, spread over the last YEARS years."""
+    rng = np.random.default_rng([seed, athlete_id])
+    end = int(history_end().replace(tzinfo=timezone.utc).timestamp())
+    days = np.sort(rng.integers(0, YEARS * 365, count))
+    hours = rng.uniform(6, 20, count) * 3600
+    return end - YEARS * 365 * 86_400 + days * 86_400 + hours.astype(np.int64) - UTC_OFFSET
+
+def build_track(athlete_id: int, index: int, seed: int = 7) -> dict:
+    """
+    Per-second samples of one activity: most follow one of the athlete's usual
+    routes (same start and headings) so areas repeat, the rest wander off.
+    """
+    rng = np.random.default_rng([seed, athlete_id, index])
+    sport = rng.choice(list(SPORTS), p=[share for share, *_ in SPORTS.values()])
+    _, (low, high), (shortest, longest), cadence = SPORTS[sport]
+    route = int(rng.integers(ROUTES)) if rng.random() < REPEAT_SHARE else ROUTES + index
+    route_rng = np.random.default_rng([seed, athlete_id, route])
+    home = np.random.default_rng([seed, athlete_id]).uniform([43.0, -1.0], [49.0, 7.0])
+
+    n = int(rng.integers(shortest, longest))
+    speed = np.clip(rng.uniform(low, high) + np.cumsum(rng.normal(0, 0.01, n)) + rng.normal(0, 0.1, n), 0.3, high * 1.5)
+    heading = route_rng.uniform(0, 2 * np.pi) + np.cumsum(route_rng.normal(0, 0.02, longest))[:n]
+    distance = np.concatenate([[0.0], np.cumsum(speed[:-1])])
+    north = np.cumsum(speed * np.cos(heading)) / METERS_PER_DEGREE
+    east = np.cumsum(speed * np.sin(heading)) / (METERS_PER_DEGREE * np.cos(np.radians(home[0])))
+    latlng = home + np.stack([north, east], axis=1) + route_rng.normal(0, 0.002, 2)
+    altitude = 200 + 80 * np.sin(distance / route_rng.uniform(800, 3000)) + 40 * route_rng.random()
+    heartrate = np.clip(95 + 45 * speed / high + np.linspace(0, 12, n) + rng.normal(0, 2, n), 60, 198)
+    return {
+        "sport_type": str(sport),
+        "time": np.arange(n),
+        "latlng": np.round(latlng, 6),
+        "distance": np.round(distance, 1),
+        "altitude": np.round(altitude, 1),
+        "heartrate": np.round(heartrate),
+        "velocity_smooth": np.round(speed, 2),
+        "cadence": np.round(np.full(n, cadence) + rng.normal(0, 3, n)),
+    }
+
+def build_activity(athlete_id: int, index: int, start: int, seed: int = 7) -> dict:
+    """A summary activity as returned by GET /athlete/activities."""
+    track = build_track(athlete_id, index, seed)
+    points = np.round(track["latlng"] * 1e5).astype(np.int64)
+    polyline = points[::POLYLINE_INTERVAL]
+    start_date = datetime.fromtimestamp(start, timezone.utc).replace(tzinfo=None)
+    local = start_date + timedelta(seconds=UTC_OFFSET)
+    part_of_day = "Morning" if local.hour < 12 else "Afternoon" if local.hour < 18 else "Evening"
+    climbs = np.diff(track["altitude"])
+    moving_time = len(track["time"])
+    return {
+        "resource_state": 2,
+        "athlete": {"id": athlete_id, "resource_state": 1},
+        "id": activity_id(athlete_id, index),
+        "name": f"{part_of_day} {track['sport_type']}",
+        "distance": float(track["distance"][-1]),
+        "moving_time": moving_time,
+        "elapsed_time": moving_time + index % 7 * 30,
+        "total_elevation_gain": round(float(climbs[climbs > 0].sum()), 1),
+        "type": track["sport_type"],
+        "sport_type": track["sport_type"],
+        "start_date": start_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "start_date_local": local.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "timezone": "(GMT+01:00) Europe/Paris",
+        "utc_offset": float(UTC_OFFSET),
+        "map": {
+            "id": f"a{activity_id(athlete_id, index)}",
+            "polyline": encode_polyline(polyline),
+            "summary_polyline": encode_polyline(polyline[::SUMMARY_STEP]),
+            "resource_state": 2,
+        },
+        "average_speed": round(float(track["velocity_smooth"].mean()), 3),
+        "max_speed": float(track["velocity_smooth"].max()),
+        "has_heartrate": True,
+        "average_heartrate": round(float(track["heartrate"].mean()), 1),
+        "max_heartrate": float(track["heartrate"].max()),
+        "elev_high": float(track["altitude"].max()),
+        "elev_low": float(track["altitude"].min()),
+    }
+
+def build_streams(athlete_id: int, index: int, keys: list, seed: int = 7) -> dict:
+    """The `key_by_type` streams response of one activity."""
+    track = build_track(athlete_id, index, seed)
+    return {
+        key: {"data": track[key].tolist(), "series_type": "time", "original_size": len(track["time"]), "resolution": "high"}
+        for key in keys if key in track and key != "sport_type"
+    }
@@ -1,29 +1,30 @@
-import os
-import httpx
 import asyncio
-from dotenv import load_dotenv
+import os
+import sys
 
-# Load env from parent directory (backend/.env)
-current_dir = os.path.dirname(os.path.abspath(__file__))
-base_dir = os.path.dirname(current_dir)
-env_path = os.path.join(base_dir, ".env")
-load_dotenv(env_path)
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-access_token = os.getenv("STRAVA_ACCESS_TOKEN")
+from database import async_session
+from sqlmodel import select
+from models import Athlete
+from services.strava_client import close_client
+from services.strava_service import get_strava_data
+from services.token_store import get_access_token
 
 async def verify():
-    print(f"Checking token: {access_token[:10]}...")
-    url = "https://www.strava.com/api/v3/athlete/activities?per_page=1"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, headers=headers)
-        if resp.status_code == 200:
-            print("Token is VALID! API returned 200 OK.")
-            print(f"Data sample: {str(resp.json())[:100]}...")
-        else:
-            print(f"Token is INVALID. Status: {resp.status_code}")
-            print(f"Response: {resp.text}")
+    """Check every stored athlete token against the Strava API, refreshing expired ones."""
+    try:
+        async with async_session() as session:
+            for athlete in (await session.exec(select(Athlete))).all():
+                try:
+                    token = await get_access_token(session, athlete)
+                    profile = await get_strava_data(token, endpoint="/athlete")
+                    print(f"✅ Athlete {athlete.id}: token is valid ({profile.get('firstname')}).")
+                except Exception as e:
+                    print(f"❌ Athlete {athlete.id}: token is invalid: {e}")
+    finally:
+        await close_client()
 
 if __name__ == "__main__":
     asyncio.run(verify())
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import httpx
+
+# Push subscriptions are per Strava app: one callback URL receives the events of every athlete
+SUBSCRIPTIONS_URL = "https://www.strava.com/api/v3/push_subscriptions"
+
+def credentials() -> dict:
+    return {"client_id": os.getenv("STRAVA_CLIENT_ID"), "client_secret": os.getenv("STRAVA_CLIENT_SECRET")}
+
+def create(callback_url: str):
+    # Strava calls GET callback_url with the handshake before answering this request
+    data = {**credentials(), "callback_url": callback_url, "verify_token": os.getenv("STRAVA_WEBHOOK_VERIFY_TOKEN")}
+    response = httpx.post(SUBSCRIPTIONS_URL, data=data, timeout=30)
+    print(f"{response.status_code}: {response.text}")
+    if response.is_success:
+        print(f"Set STRAVA_WEBHOOK_SUBSCRIPTION_ID={response.json()['id']} so the API accepts its events")
+
+def show():
+    response = httpx.get(SUBSCRIPTIONS_URL, params=credentials(), timeout=30)
+    print(f"{response.status_code}: {response.text}")
+
+def remove(subscription_id: str):
+    response = httpx.delete(f"{SUBSCRIPTIONS_URL}/{subscription_id}", params=credentials(), timeout=30)
+    print(f"{response.status_code}: {response.text or 'deleted'}")
+
+if __name__ == "__main__":
+    # webhook_subscription.py create https://example.com/strava/webhook | show | delete <id>
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    if command == "create":
+        create(sys.argv[2])
+    elif command == "delete":
+        remove(sys.argv[2])
+    else:
+        show()
@@ -0,0 +1,106 @@
+import base64
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, literal, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, ActivityGeometry
+from services.activity_payload import summary_polyline
+from services.query_filters import filter_by_athlete, filter_by_year
+
+COLUMNS = Activity.__table__.c
+# Full-resolution polylines are only returned when explicitly requested
+DEFAULT_FIELDS = [c.name for c in Activity.__table__.columns if c.name != "map_polyline"]
+MAX_LIMIT = 500
+
+def parse_fields(fields: Optional[str]) -> list:
+    """
+    Resolve a comma-separated `fields=` value into column names.
+
+    id and start_date are always included since the cursor is built from them.
+    """
+    if not fields:
+        return DEFAULT_FIELDS
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id", "start_date", *names]))
+
+def encode_cursor(start_date: datetime, activity_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{start_date.isoformat()}|{activity_id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        start_date, activity_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(start_date), int(activity_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def to_item(row) -> dict:
+    item = dict(row._mapping)
+    if "track" in item:
+        item["map_summary_polyline"] = summary_polyline(item["map_summary_polyline"], item.pop("track"))
+    # Same nested map shape as /strava/data
+    map_data = {key[4:]: item.pop(key) for key in ("map_polyline", "map_summary_polyline") if key in item}
+    if map_data:
+        item["map"] = map_data
+    return item
+
+async def list_activities(
+    session: AsyncSession,
+    athlete_id: int,
+    fields: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    year: Optional[str] = None,
+    sport_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    min_distance: Optional[float] = None,
+    max_distance: Optional[float] = None,
+):
+    """
+    One page of an athlete's activities, newest first, using keyset pagination on (start_date, id).
+
+    Returns:
+        dict: {"items": [...], "next_cursor": str or None}.
+
+    Raises:
+        ValueError: On unknown fields or a malformed cursor.
+    """
+    names = parse_fields(fields)
+    limit = max(1, min(limit, MAX_LIMIT))
+    query = select(*[COLUMNS[name] for name in names])
+    if "map_summary_polyline" in names:
+        query = query.add_columns(ActivityGeometry.deltas.label("track")).outerjoin(
+            ActivityGeometry, ActivityGeometry.activity_id == Activity.id
+        )
+    query = filter_by_year(filter_by_athlete(query, athlete_id), year)
+
+    if sport_type:
+        query = query.where(Activity.sport_type == sport_type)
+    if start:
+        query = query.where(Activity.start_date_local >= datetime.combine(start, datetime.min.time()))
+    if end:
+        query = query.where(Activity.start_date_local < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    if min_distance is not None:
+        query = query.where(Activity.distance >= min_distance)
+    if max_distance is not None:
+        query = query.where(Activity.distance <= max_distance)
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        # Typed literals: Strava ids do not fit the INTEGER cast asyncpg would infer
+        keyset = tuple_(literal(cursor_date, DateTime()), literal(cursor_id, BigInteger()))
+        query = query.where(tuple_(Activity.start_date, Activity.id) < keyset)
+
+    query = query.order_by(Activity.start_date.desc(), Activity.id.desc()).limit(limit + 1)
+    result = await session.exec(query)
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_date, rows[-1].id)
+    return {"items": [to_item(row) for row in rows], "next_cursor": next_cursor}
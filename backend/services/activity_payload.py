@@ -0,0 +1,62 @@
+from typing import Optional
+
+import orjson
+from sqlmodel import select
+from database import async_session
+from models import Activity, ActivityGeometry
+from services.geometry import encode_polyline, unpack_deltas
+from services.query_filters import filter_by_athlete, filter_by_year
+
+MAP_FIELDS = ("map_polyline", "map_summary_polyline")
+# Plain columns first, then the two polylines and the stored track, so a row splits by position
+FIELDS = [c.name for c in Activity.__table__.columns if c.name not in MAP_FIELDS]
+COLUMNS = [*(Activity.__table__.c[name] for name in (*FIELDS, *MAP_FIELDS)), ActivityGeometry.deltas]
+FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+# Rows fetched from the server-side cursor and encoded per chunk
+STREAM_BATCH = 500
+
+def summary_polyline(text: Optional[str], deltas: Optional[bytes]) -> Optional[str]:
+    # Synced activities keep their summary route in ActivityGeometry only, re-encoded here
+    if text or deltas is None:
+        return text
+    return encode_polyline(unpack_deltas(deltas))
+
+def to_payload(row) -> dict:
+    """
+    One activity in the frontend shape (nested map object), straight from a row tuple.
+    """
+    item = dict(zip(FIELDS, row))
+    item["map"] = {"polyline": row[-3], "summary_polyline": summary_polyline(row[-2], row[-1])}
+    return item
+
+def encode_batch(rows, ndjson: bool, first: bool) -> bytes:
+    """
+    One chunk of the body: NDJSON lines, or JSON array items led by a comma
+    unless they are the first ones.
+    """
+    if ndjson:
+        return b"".join(orjson.dumps(to_payload(row), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+    body = orjson.dumps([to_payload(row) for row in rows])[1:-1]
+    return body if first else b"," + body
+
+async def stream_activities(athlete_id: int, year: Optional[str], fmt: str = "json"):
+    """
+    All activities of an athlete for a year as encoded chunks, in start order.
+
+    Rows come from a server-side cursor STREAM_BATCH at a time, so the first
+    chunk is sent before the last row is read. The generator runs after the
+    request's own session is closed, so it opens its own.
+    """
+    ndjson = fmt == "ndjson"
+    if not ndjson:
+        yield b"["
+    first = True
+    async with async_session() as session:
+        query = select(*COLUMNS).outerjoin(ActivityGeometry, ActivityGeometry.activity_id == Activity.id)
+        query = filter_by_year(filter_by_athlete(query, athlete_id), year).order_by(Activity.start_date, Activity.id)
+        result = await session.stream(query.execution_options(yield_per=STREAM_BATCH))
+        async for rows in result.partitions():
+            yield encode_batch(rows, ndjson, first)
+            first = False
+    if not ndjson:
+        yield b"]"
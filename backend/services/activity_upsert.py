@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from sqlalchemy import literal_column, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity
+
+BATCH_SIZE = 200
+
+def parse_activity(activity_data: dict) -> dict:
+    """
+    Convert a Strava activity payload into a row dict matching the Activity table.
+    """
+    # Map is a nested object in the Strava response
+    map_data = activity_data.get("map") or {}
+    return {
+        "id": activity_data.get("id"),
+        "athlete_id": (activity_data.get("athlete") or {}).get("id"),
+        "name": activity_data.get("name"),
+        "distance": activity_data.get("distance"),
+        "moving_time": activity_data.get("moving_time"),
+        "elapsed_time": activity_data.get("elapsed_time"),
+        "total_elevation_gain": activity_data.get("total_elevation_gain"),
+        "type": activity_data.get("type"),
+        "sport_type": activity_data.get("sport_type"),
+        "start_date": datetime.strptime(activity_data.get("start_date"), "%Y-%m-%dT%H:%M:%SZ"),
+        "start_date_local": datetime.strptime(activity_data.get("start_date_local"), "%Y-%m-%dT%H:%M:%SZ"),
+        "timezone": activity_data.get("timezone"),
+        "utc_offset": activity_data.get("utc_offset"),
+        "map_polyline": map_data.get("polyline"),
+        "map_summary_polyline": map_data.get("summary_polyline"),
+        "average_speed": activity_data.get("average_speed"),
+        "max_speed": activity_data.get("max_speed"),
+        "average_heartrate": activity_data.get("average_heartrate"),
+        "max_heartrate": activity_data.get("max_heartrate"),
+        "elev_high": activity_data.get("elev_high"),
+        "elev_low": activity_data.get("elev_low"),
+    }
+
+def build_upsert(rows: list):
+    """
+    Build a single INSERT ... ON CONFLICT (id) DO UPDATE statement for a batch.
+
+    The update only fires when at least one column differs, so unchanged rows
+    are neither rewritten nor returned. `xmax = 0` tells inserts from updates.
+    """
+    table = Activity.__table__
+    stmt = pg_insert(table).values(rows)
+    columns = [c.name for c in table.columns if c.name != "id"]
+    changed = or_(*[table.c[name].is_distinct_from(stmt.excluded[name]) for name in columns])
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={name: stmt.excluded[name] for name in columns},
+        where=changed,
+    ).returning(table.c.id, literal_column("(xmax = 0)").label("inserted"))
+
+async def upsert_activities(session: AsyncSession, rows: list) -> dict:
+    """
+    Upsert parsed activity rows in batches of BATCH_SIZE.
+
+    Args:
+        session (AsyncSession): Database session (not committed here).
+        rows (list): Row dicts as returned by parse_activity.
+
+    Returns:
+        dict: Counts of inserted, updated and unchanged rows.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    # A single statement cannot touch the same id twice, keep the last version
+    unique_rows = list({row["id"]: row for row in rows}.values())
+
+    for i in range(0, len(unique_rows), BATCH_SIZE):
+        batch = unique_rows[i:i + BATCH_SIZE]
+        result = await session.execute(build_upsert(batch))
+        written = result.all()
+        inserted = sum(1 for row in written if row.inserted)
+        counts["inserted"] += inserted
+        counts["updated"] += len(written) - inserted
+        counts["unchanged"] += len(batch) - len(written)
+    return counts
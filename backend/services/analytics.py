@@ -0,0 +1,120 @@
+import os
+from typing import Optional
+
+import numpy as np
+from services.columnar_export import ANALYTICS_DIR, MANIFEST, year_path
+
+# Metric -> (column, scale); "count" counts activities
+METRICS = {
+    "count": (None, 1.0),
+    "distance": ("distance", 1 / 1000),             # km
+    "moving_time": ("moving_time", 1 / 3600),       # hours
+    "elevation": ("total_elevation_gain", 1.0),     # meters
+}
+PERIODS = {"month": 12, "week": 53, "day": 366}
+
+_tables = {}  # path -> (mtime, pyarrow.Table)
+
+def export_version() -> float:
+    """
+    Modification time of the export manifest, rewritten whenever a year file changes.
+    """
+    path = os.path.join(ANALYTICS_DIR, MANIFEST)
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+def available_years() -> list:
+    if not os.path.isdir(ANALYTICS_DIR):
+        return []
+    names = [name for name in os.listdir(ANALYTICS_DIR) if name.startswith("activities_") and name.endswith(".parquet")]
+    return sorted(int(name[len("activities_"):-len(".parquet")]) for name in names)
+
+def parse_years(years: Optional[str]) -> list:
+    """
+    "2022,2023", "2020-2024" or "all" (the default) into exported years.
+    """
+    exported = available_years()
+    if not years or years == "all":
+        return exported
+    if "-" in years:
+        first, last = (int(part) for part in years.split("-", 1))
+        return [year for year in exported if first <= year <= last]
+    return [year for year in exported if str(year) in years.split(",")]
+
+def read_year(year: int):
+    """
+    The exported pyarrow table of a year, kept in memory until its file is rewritten.
+    """
+    # Like the export, pyarrow is only loaded once analytics are used
+    import pyarrow.parquet as pq
+
+    path = year_path(year)
+    mtime = os.path.getmtime(path)
+    cached = _tables.get(path)
+    if not cached or cached[0] != mtime:
+        cached = _tables[path] = (mtime, pq.read_table(path))
+    return cached[1]
+
+def load_columns(years: list, columns: list, sport_type: Optional[str] = None, athlete_id: Optional[int] = None) -> dict:
+    """
+    Columns of the given years, optionally of one athlete, as NumPy arrays, plus "year", "month" and "day"
+    (0-based month and day of year) of the local start date.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    tables = [read_year(year) for year in years]
+    table = pa.concat_tables(tables, promote_options="default") if tables else None
+    if table is None or table.num_rows == 0:
+        return {name: np.zeros(0, dtype=np.int64) for name in [*columns, "year", "month", "day"]}
+    if athlete_id is not None:
+        table = table.filter(pc.equal(table["athlete_id"], athlete_id))
+    if sport_type:
+        table = table.filter(pc.equal(table["sport_type"].cast(pa.string()), sport_type))
+    local = table["start_date_local"].to_numpy()
+    year_start = local.astype("datetime64[Y]")
+    data = {name: np.nan_to_num(table[name].to_numpy(zero_copy_only=False).astype(np.float64)) for name in columns}
+    data["year"] = year_start.astype(np.int64) + 1970
+    data["month"] = (local.astype("datetime64[M]") - year_start.astype("datetime64[M]")).astype(np.int64)
+    data["day"] = (local.astype("datetime64[D]") - year_start).astype(np.int64)
+    return data
+
+def metric_values(data: dict, metric: str) -> np.ndarray:
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    column, scale = METRICS[metric]
+    return np.ones(len(data["year"])) if column is None else data[column] * scale
+
+def summary(years: list, sport_type: Optional[str] = None, athlete_id: Optional[int] = None) -> dict:
+    """
+    Totals per year, aggregated with bincount over the year index.
+    """
+    data = load_columns(years, ["distance", "moving_time", "total_elevation_gain"], sport_type, athlete_id)
+    index = np.searchsorted(years, data["year"])
+    totals = {metric: np.bincount(index, metric_values(data, metric), minlength=len(years)) for metric in METRICS}
+    return {
+        year: {metric: round(float(values[i]), 2) for metric, values in totals.items()}
+        for i, year in enumerate(years)
+    }
+
+def compare_years(years: list, metric: str = "distance", by: str = "month", cumulative: bool = False,
+                  sport_type: Optional[str] = None, athlete_id: Optional[int] = None) -> dict:
+    """
+    One series per year of `metric` per month, week or day of year, aligned for side-by-side comparison.
+    """
+    if by not in PERIODS:
+        raise ValueError(f"by must be one of {', '.join(PERIODS)}")
+    column = METRICS.get(metric, (None,))[0]
+    data = load_columns(years, [column] if column else [], sport_type, athlete_id)
+    values = metric_values(data, metric)
+    if by == "month":
+        period = data["month"]
+    elif by == "week":
+        period = np.minimum(data["day"] // 7, PERIODS["week"] - 1)
+    else:
+        period = data["day"]
+    size = PERIODS[by]
+    index = np.searchsorted(years, data["year"]) * size + period
+    grid = np.bincount(index, values, minlength=len(years) * size).reshape(len(years), size)
+    if cumulative:
+        grid = np.cumsum(grid, axis=1)
+    return {"by": by, "metric": metric, "series": {year: np.round(grid[i], 2).tolist() for i, year in enumerate(years)}}
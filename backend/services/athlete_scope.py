@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_session
+from models import Athlete
+
+async def resolve_athlete(session: AsyncSession, athlete_id: Optional[int]) -> int:
+    """
+    The athlete a read endpoint is about: `athlete_id` when given, otherwise
+    the only connected athlete.
+
+    Raises:
+        LookupError: The athlete is not connected, or nobody is.
+        ValueError: No athlete given while several are connected.
+    """
+    if athlete_id is not None:
+        if not await session.get(Athlete, athlete_id):
+            raise LookupError(f"Unknown athlete: {athlete_id}")
+        return athlete_id
+    ids = (await session.exec(select(Athlete.id).limit(2))).all()
+    if not ids:
+        raise LookupError("No athlete connected")
+    if len(ids) > 1:
+        raise ValueError("Several athletes are connected, pass athlete_id")
+    return ids[0]
+
+async def get_athlete_id(athlete_id: Optional[int] = None, session: AsyncSession = Depends(get_session)) -> int:
+    """
+    FastAPI dependency resolving the `athlete_id` query parameter.
+    """
+    try:
+        return await resolve_athlete(session, athlete_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
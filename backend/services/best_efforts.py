@@ -0,0 +1,92 @@
+import numpy as np
+from services.route_grid import EARTH_RADIUS
+from services.geometry import SCALE
+
+# Best efforts, like Strava's: fastest elapsed time over these distances (meters)
+EFFORT_DISTANCES = {
+    "400m": 400.0, "1k": 1000.0, "1 mile": 1609.344, "5k": 5000.0,
+    "10k": 10000.0, "half marathon": 21097.5, "marathon": 42195.0,
+}
+# Mean-max curves: highest average over these durations (seconds)
+CURVE_DURATIONS = [5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200]
+CURVE_STREAMS = {"speed": "velocity_smooth", "heartrate": "heartrate"}
+# A longer gap between samples is a pause, it counts as zero in the curves
+PAUSE_GAP = 10
+
+def track_distance(latlng: np.ndarray) -> np.ndarray:
+    """
+    Cumulative distance in meters along an (n, 2) track in 1e-5 degrees, vectorized haversine.
+    """
+    lat, lng = np.radians(latlng[:, 0] / SCALE), np.radians(latlng[:, 1] / SCALE)
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    steps = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    # Steps from or to a missing point (NaN) are not counted
+    return np.concatenate([[0.0], np.cumsum(np.nan_to_num(steps))])
+
+def best_distance_time(time: np.ndarray, distance: np.ndarray, target: float):
+    """
+    Fastest elapsed time covering `target` meters, as (seconds, start second), or None.
+
+    For every start sample the first sample at least `target` further is found
+    with one searchsorted over the cumulative distance: a vectorized two-pointer
+    scan, O(n log n) instead of trying every pair.
+    """
+    if len(distance) < 2 or distance[-1] - distance[0] < target:
+        return None
+    ends = np.searchsorted(distance, distance + target, side="left")
+    valid = ends < len(distance)
+    starts = np.flatnonzero(valid)
+    elapsed = time[ends[valid]] - time[starts]
+    best = int(np.argmin(elapsed))
+    return float(elapsed[best]), int(time[starts[best]])
+
+def best_average(time: np.ndarray, values: np.ndarray, duration: float):
+    """
+    Highest average of a stream over any `duration` seconds window, as (value, start second), or None.
+
+    Values are integrated over time with a cumulative sum, so each window
+    average is the difference of two prefix sums.
+    """
+    if len(time) < 2 or time[-1] - time[0] < duration:
+        return None
+    dt = np.diff(time).astype(np.float64)
+    # Missing samples (NaN) count as zero, like pauses
+    weights = np.where(dt > PAUSE_GAP, 0.0, np.nan_to_num(values[:-1]) * dt)
+    integral = np.concatenate([[0.0], np.cumsum(weights)])
+    ends = np.searchsorted(time, time + duration, side="left")
+    valid = ends < len(time)
+    starts = np.flatnonzero(valid)
+    averages = (integral[ends[valid]] - integral[starts]) / (time[ends[valid]] - time[starts])
+    best = int(np.argmax(averages))
+    return float(averages[best]), int(time[starts[best]])
+
+def compute_efforts(streams: dict) -> list:
+    """
+    All best efforts and curve points of one activity's streams (see load_streams).
+
+    Returns:
+        list: (kind, target, value, start second) tuples. `kind` is "distance"
+        (value in seconds, lower is better) or a CURVE_STREAMS key (higher is better).
+    """
+    time = streams.get("time")
+    if time is None or len(time) < 2:
+        return []
+    distance = streams.get("distance")
+    if distance is None and streams.get("latlng") is not None:
+        distance = track_distance(streams["latlng"])
+    efforts = []
+    if distance is not None:
+        # Missing samples (NaN) keep the distance reached before them
+        distance = np.maximum.accumulate(np.nan_to_num(distance))
+        for name, target in EFFORT_DISTANCES.items():
+            best = best_distance_time(time, distance, target)
+            if best:
+                efforts.append(("distance", target, *best))
+    for kind, stream in CURVE_STREAMS.items():
+        if streams.get(stream) is None:
+            continue
+        for duration in CURVE_DURATIONS:
+            best = best_average(time, streams[stream].astype(np.float64), duration)
+            if best:
+                efforts.append((kind, float(duration), *best))
+    return efforts
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+
+from sqlalchemy import Text, cast, func, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity
+
+# One Parquet file per local year (start_date_local, like every year filter),
+# plus a manifest of the fingerprints they were written at
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "analytics"))
+MANIFEST = "manifest.json"
+
+# Exported columns and their Arrow type names; polylines stay in Postgres
+COLUMNS = {
+    "id": "int64",
+    "athlete_id": "int64",
+    "sport_type": "string",
+    "start_date": "timestamp[s]",
+    "start_date_local": "timestamp[s]",
+    "distance": "double",
+    "moving_time": "int64",
+    "elapsed_time": "int64",
+    "total_elevation_gain": "double",
+    "average_speed": "double",
+    "average_heartrate": "double",
+    "max_heartrate": "double",
+}
+
+activity_year = func.extract("year", Activity.start_date_local)
+
+def year_path(year: int) -> str:
+    return os.path.join(ANALYTICS_DIR, f"activities_{year}.parquet")
+
+def read_manifest() -> dict:
+    try:
+        with open(os.path.join(ANALYTICS_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def write_atomic(path: str, write):
+    # Readers never see a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def write_manifest(fingerprints: dict):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(fingerprints, f)
+    write_atomic(os.path.join(ANALYTICS_DIR, MANIFEST), write)
+
+def write_year(year: int, rows: list):
+    # pyarrow is imported on first export only, it is slow to load and not needed to start serving
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = list(zip(*rows)) if rows else [[] for _ in COLUMNS]
+    arrays = {name: pa.array(values, type=pa.type_for_alias(kind)) for (name, kind), values in zip(COLUMNS.items(), columns)}
+    # A handful of distinct sport types, stored once per file
+    arrays["sport_type"] = arrays["sport_type"].dictionary_encode()
+    table = pa.table(arrays)
+    write_atomic(year_path(year), lambda tmp: pq.write_table(table, tmp, compression="zstd"))
+
+async def year_fingerprints(session: AsyncSession) -> dict:
+    """
+    md5 of the exported columns of every activity, per year, computed in SQL.
+    """
+    row_text = func.concat_ws("|", *[cast(getattr(Activity, name), Text) for name in COLUMNS])
+    fingerprint = func.md5(func.string_agg(row_text, aggregate_order_by(literal_column("','"), Activity.id)))
+    query = select(activity_year, fingerprint).group_by(activity_year)
+    return {str(int(year)): value for year, value in (await session.exec(query)).all()}
+
+async def export_changed_years(session: AsyncSession) -> list:
+    """
+    Rewrite the Parquet file of every year whose activities changed since the
+    last export, and drop the files of years that no longer have any.
+
+    Returns:
+        list: Years written.
+    """
+    os.makedirs(ANALYTICS_DIR, exist_ok=True)
+    manifest = read_manifest()
+    fingerprints = await year_fingerprints(session)
+    changed = [year for year, value in fingerprints.items() if manifest.get(year) != value]
+    for year in changed:
+        query = select(*[getattr(Activity, name) for name in COLUMNS]).where(activity_year == int(year))
+        rows = (await session.exec(query.order_by(Activity.start_date))).all()
+        await asyncio.to_thread(write_year, int(year), rows)
+    for year in set(manifest) - set(fingerprints):
+        if os.path.exists(year_path(int(year))):
+            os.remove(year_path(int(year)))
+    if changed or set(manifest) != set(fingerprints):
+        write_manifest(fingerprints)
+    return [int(year) for year in changed]
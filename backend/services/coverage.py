@@ -0,0 +1,178 @@
+import os
+from collections import Counter, deque
+from typing import Optional
+
+import numpy as np
+from services.coverage_grid import CELL_SIZE, MAX_RADIUS, METERS_PER_DEGREE, cell_centers, pack_keys, row_geometry
+
+class CoverageIndex:
+    """
+    Grid coverage of all routes: the ~CELL_SIZE cells each activity passes
+    through and how many activities passed through each cell.
+
+    Activities are kept with a signature of their stored track so a sync only
+    has to process new, changed or deleted routes.
+    """
+
+    def __init__(self, cell_size: float = CELL_SIZE):
+        self.cell_size = cell_size
+        self.activities = {}  # activity_id -> (signature, cell keys)
+        self.counts = Counter()  # cell key -> activities through it
+        self._visited = None
+
+    def signature(self, activity_id: int):
+        return self.activities.get(activity_id, (None,))[0]
+
+    def add(self, activity_id: int, signature: tuple, cells: np.ndarray):
+        self.remove(activity_id)
+        self.activities[activity_id] = (signature, cells)
+        self.counts.update(cells.tolist())
+        self._visited = None
+
+    def remove(self, activity_id: int):
+        if activity_id in self.activities:
+            _, cells = self.activities.pop(activity_id)
+            self.counts.subtract(cells.tolist())
+            for key in cells.tolist():
+                if self.counts[key] <= 0:
+                    del self.counts[key]
+            self._visited = None
+
+    def visited(self) -> tuple:
+        """
+        Sorted keys of visited cells with their activity counts.
+        """
+        if self._visited is None:
+            keys = np.fromiter(self.counts.keys(), dtype=np.int64, count=len(self.counts))
+            counts = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+            order = np.argsort(keys)
+            self._visited = keys[order], counts[order]
+        return self._visited
+
+    def cells_in(self, bounds: tuple, limit: int) -> list:
+        """
+        Visited cells inside (min_lat, min_lng, max_lat, max_lng) as [lat, lng, activities], most visited first.
+        """
+        keys, counts = self.visited()
+        lat, lng = cell_centers(keys, self.cell_size)
+        inside = (lat >= bounds[0]) & (lng >= bounds[1]) & (lat <= bounds[2]) & (lng <= bounds[3])
+        order = np.argsort(-counts[inside], kind="stable")[:limit]
+        return np.stack([lat[inside][order], lng[inside][order], counts[inside][order]], axis=1).round(6).tolist()
+
+    def unvisited(self, lat: float, lng: float, radius: float, limit: int) -> dict:
+        """
+        Cells whose centre lies within `radius` meters of a point and that no
+        route ever crossed, nearest first, plus the share already covered.
+        """
+        if not 0 < radius <= MAX_RADIUS:
+            raise ValueError(f"radius must be between 0 and {MAX_RADIUS:.0f} meters")
+        size = self.cell_size
+        span = radius / METERS_PER_DEGREE
+        rows = np.arange(np.floor((lat - span) * METERS_PER_DEGREE / size), np.floor((lat + span) * METERS_PER_DEGREE / size) + 1).astype(np.int64)
+        row_lat, width = row_geometry(rows, size)
+        half = span / np.maximum(np.cos(np.radians(row_lat)), 1e-6)
+        first, last = np.floor((lng - half) / width), np.floor((lng + half) / width)
+        per_row = (last - first + 1).astype(np.int64)
+        cols = np.repeat(first, per_row) + np.arange(per_row.sum()) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+        keys = pack_keys(np.repeat(rows, per_row), cols)
+        cell_lat, cell_lng = cell_centers(keys, size)
+        distance = np.hypot(cell_lat - lat, (cell_lng - lng) * np.cos(np.radians(lat))) * METERS_PER_DEGREE
+        keys, cell_lat, cell_lng, distance = (a[distance <= radius] for a in (keys, cell_lat, cell_lng, distance))
+
+        visited_keys, _ = self.visited()
+        position = np.minimum(np.searchsorted(visited_keys, keys), max(len(visited_keys) - 1, 0))
+        seen = visited_keys[position] == keys if len(visited_keys) else np.zeros(len(keys), dtype=bool)
+        free = distance[~seen]
+        nearest = np.argpartition(free, limit)[:limit] if len(free) > limit else np.arange(len(free))
+        order = nearest[np.argsort(free[nearest], kind="stable")]
+        return {
+            "cell_size": size,
+            "cells": int(len(keys)),
+            "visited": int(seen.sum()),
+            "coverage": round(float(seen.mean()), 4) if len(keys) else 0.0,
+            "unvisited": np.stack([cell_lat[~seen][order], cell_lng[~seen][order], distance[~seen][order]], axis=1).round(6).tolist(),
+        }
+
+    def hotspots(self, min_visits: int, limit: int) -> list:
+        """
+        Frequently traversed areas: cells crossed by at least `min_visits`
+        activities, merged with their 8 neighbours into connected clusters,
+        ranked by the number of distinct activities passing through.
+        """
+        keys, counts = self.visited()
+        hot = counts >= min_visits
+        hot_keys, hot_counts = keys[hot], counts[hot]
+        # Breadth-first search over plain lists, numpy scalar access dominates otherwise
+        key_list = hot_keys.tolist()
+        lookup = {key: i for i, key in enumerate(key_list)}
+        labels = [-1] * len(key_list)
+        steps = [dr * 2 ** 32 + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+        for start in range(len(key_list)):
+            if labels[start] >= 0:
+                continue
+            labels[start] = start
+            queue = deque([start])
+            while queue:
+                key = key_list[queue.popleft()]
+                for step in steps:
+                    neighbour = lookup.get(key + step)
+                    if neighbour is not None and labels[neighbour] < 0:
+                        labels[neighbour] = start
+                        queue.append(neighbour)
+        labels = np.array(labels, dtype=np.int64)
+
+        # Distinct (cluster, activity) pairs over every activity's cells at once
+        tracks = [cells for _, cells in self.activities.values()]
+        cells = np.concatenate(tracks) if tracks else np.zeros(0, dtype=np.int64)
+        owners = np.repeat(np.arange(len(tracks)), [len(track) for track in tracks])
+        position = np.minimum(np.searchsorted(hot_keys, cells), max(len(hot_keys) - 1, 0))
+        found = hot_keys[position] == cells if len(hot_keys) else np.zeros(len(cells), dtype=bool)
+        pairs = np.unique(labels[position[found]] * max(len(tracks), 1) + owners[found])
+        activities = Counter(dict(zip(*(a.tolist() for a in np.unique(pairs // max(len(tracks), 1), return_counts=True)))))
+
+        lat, lng = cell_centers(hot_keys, self.cell_size)
+        result = []
+        for label, count in activities.most_common(limit):
+            members = labels == label
+            weights = hot_counts[members]
+            result.append({
+                "lat": round(float(np.average(lat[members], weights=weights)), 6),
+                "lng": round(float(np.average(lng[members], weights=weights)), 6),
+                "bounds": [round(float(v), 6) for v in (lat[members].min(), lng[members].min(), lat[members].max(), lng[members].max())],
+                "cells": int(members.sum()),
+                "activities": count,
+                "max_visits": int(weights.max()),
+            })
+        return result
+
+    def save(self, path: str):
+        """
+        Write the index as .npz, atomically so a reader never sees a partial file.
+        """
+        ids = list(self.activities)
+        cells = [self.activities[i][1] for i in ids]
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp, cell_size=self.cell_size, ids=np.array(ids, dtype=np.int64),
+            signatures=np.array([self.activities[i][0] for i in ids], dtype=np.int64).reshape(-1, 5),
+            offsets=np.concatenate([[0], np.cumsum([len(c) for c in cells])]).astype(np.int64),
+            cells=np.concatenate(cells) if cells else np.zeros(0, dtype=np.int64),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CoverageIndex"]:
+        """
+        The index saved at `path`, or None when missing or built with another cell size.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if float(data["cell_size"]) != CELL_SIZE:
+                return None
+            index = cls(CELL_SIZE)
+            offsets, cells = data["offsets"], data["cells"]
+            for i, (activity_id, signature) in enumerate(zip(data["ids"].tolist(), data["signatures"].tolist())):
+                index.activities[activity_id] = (tuple(signature), cells[offsets[i]:offsets[i + 1]])
+            index.counts.update(cells.tolist())
+        return index
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+
+METERS_PER_DEGREE = 111_320.0
+CELL_SIZE = float(os.getenv("COVERAGE_CELL_SIZE", "200"))
+# Cell keys are row << 32 | (col + OFFSET): signed rows in the high half, so keys sort by row then column
+OFFSET = 2 ** 31
+MAX_RADIUS = 50_000.0
+MAX_SAMPLES = 10_000
+
+def pack_keys(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return (rows.astype(np.int64) << 32) | (cols.astype(np.int64) + OFFSET)
+
+def unpack_keys(keys: np.ndarray) -> tuple:
+    return keys >> 32, (keys & 0xFFFFFFFF) - OFFSET
+
+def row_geometry(rows: np.ndarray, size: float) -> tuple:
+    """
+    Centre latitude and column width in degrees of grid rows; columns are `size`
+    meters wide at the row's latitude, like RouteGrid.
+    """
+    lat = (rows + 0.5) * size / METERS_PER_DEGREE
+    return lat, size / (METERS_PER_DEGREE * np.maximum(np.cos(np.radians(lat)), 1e-6))
+
+def cell_keys(lat: np.ndarray, lng: np.ndarray, size: float) -> np.ndarray:
+    rows = np.floor(lat * METERS_PER_DEGREE / size).astype(np.int64)
+    return pack_keys(rows, np.floor(lng / row_geometry(rows, size)[1]))
+
+def cell_centers(keys: np.ndarray, size: float) -> tuple:
+    rows, cols = unpack_keys(keys)
+    lat, width = row_geometry(rows, size)
+    return lat, (cols + 0.5) * width
+
+def track_cells(points: np.ndarray, size: float = CELL_SIZE) -> np.ndarray:
+    """
+    Sorted keys of the cells a track passes through. Every segment is sampled
+    at least twice per cell, all segments in one vectorized pass.
+
+    Args:
+        points (np.ndarray): (n, 2) lat/lng in degrees.
+    """
+    if len(points) < 2:
+        return cell_keys(points[:, 0], points[:, 1], size) if len(points) else np.zeros(0, dtype=np.int64)
+    starts, deltas = points[:-1], np.diff(points, axis=0)
+    meters = np.hypot(deltas[:, 0], deltas[:, 1] * np.cos(np.radians(starts[:, 0]))) * METERS_PER_DEGREE
+    samples = np.minimum(np.ceil(meters / (size / 2)), MAX_SAMPLES).astype(np.int64) + 1
+    segment = np.repeat(np.arange(len(starts)), samples)
+    first = np.repeat(np.cumsum(samples) - samples, samples)
+    t = (np.arange(len(segment)) - first) / np.maximum(samples[segment] - 1, 1)
+    sampled = starts[segment] + deltas[segment] * t[:, None]
+    return np.unique(cell_keys(sampled[:, 0], sampled[:, 1], size))
@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, ActivityGeometry, GeometryLevel
+from services.coverage import CoverageIndex
+from services.coverage_grid import CELL_SIZE, track_cells
+from services.geometry import SCALE, unpack_deltas
+from services.response_cache import get_data_version
+from services.simplify import level_for_tolerance
+
+# One index file per athlete
+COVERAGE_DIR = os.getenv(
+    "COVERAGE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "coverage")
+)
+BATCH_SIZE = 500
+# Simplification well below the cell size does not change which cells a track crosses
+LEVEL = level_for_tolerance(CELL_SIZE / 4)
+
+_coverage = {}  # athlete_id -> {"version", "index"}
+_lock = asyncio.Lock()
+
+def coverage_path(athlete_id: int) -> str:
+    return os.path.join(COVERAGE_DIR, f"coverage_{athlete_id}.npz")
+
+async def load_signatures(session: AsyncSession, athlete_id: int) -> dict:
+    """
+    Point count and bounding box of every stored track of an athlete, enough to tell which routes changed.
+    """
+    rows = (await session.exec(select(
+        ActivityGeometry.activity_id, ActivityGeometry.point_count, ActivityGeometry.min_lat,
+        ActivityGeometry.min_lng, ActivityGeometry.max_lat, ActivityGeometry.max_lng,
+    ).join(Activity, Activity.id == ActivityGeometry.activity_id).where(Activity.athlete_id == athlete_id))).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+async def load_tracks(session: AsyncSession, ids: list) -> list:
+    """
+    (activity_id, deltas) of tracks at the coverage level, full resolution when a track has no tiers.
+    """
+    query = select(ActivityGeometry.activity_id, func.coalesce(GeometryLevel.deltas, ActivityGeometry.deltas)).outerjoin(
+        GeometryLevel, (GeometryLevel.activity_id == ActivityGeometry.activity_id) & (GeometryLevel.level == LEVEL)
+    )
+    return (await session.exec(query.where(ActivityGeometry.activity_id.in_(ids)))).all()
+
+def tracks_to_cells(rows: list) -> list:
+    return [(activity_id, track_cells(unpack_deltas(deltas) / SCALE)) for activity_id, deltas in rows]
+
+async def update_index(session: AsyncSession, athlete_id: int, index: CoverageIndex) -> int:
+    """
+    Bring an athlete's index in line with their stored tracks, processing
+    only new, changed or deleted routes.
+
+    Returns:
+        int: Number of routes added, replaced or removed.
+    """
+    signatures = await load_signatures(session, athlete_id)
+    removed = [activity_id for activity_id in index.activities if activity_id not in signatures]
+    changed = [activity_id for activity_id, signature in signatures.items() if index.signature(activity_id) != signature]
+    for activity_id in removed:
+        index.remove(activity_id)
+    for i in range(0, len(changed), BATCH_SIZE):
+        rows = await load_tracks(session, changed[i:i + BATCH_SIZE])
+        # Sampling runs off the event loop; the index itself is only touched here
+        for activity_id, cells in await asyncio.to_thread(tracks_to_cells, rows):
+            index.add(activity_id, signatures[activity_id], cells)
+    return len(removed) + len(changed)
+
+async def get_coverage(session: AsyncSession, athlete_id: int) -> CoverageIndex:
+    """
+    The coverage index of an athlete's routes, loaded from disk on first use
+    and updated incrementally, then saved, whenever the data version changes.
+    """
+    version = await get_data_version(session, athlete_id)
+    async with _lock:
+        cached = _coverage.get(athlete_id, {})
+        if cached.get("version") != version:
+            path = coverage_path(athlete_id)
+            index = cached.get("index") or await asyncio.to_thread(CoverageIndex.load, path) or CoverageIndex()
+            if await update_index(session, athlete_id, index):
+                os.makedirs(COVERAGE_DIR, exist_ok=True)
+                await asyncio.to_thread(index.save, path)
+            _coverage[athlete_id] = cached = {"version": version, "index": index}
+        return cached["index"]
+
+async def refresh_coverage(session: AsyncSession, athlete_ids: list):
+    """
+    Fold the routes of a finished sync into these athletes' coverage indexes;
+    the sync itself already succeeded.
+    """
+    try:
+        for athlete_id in athlete_ids:
+            await get_coverage(session, athlete_id)
+    except Exception as e:
+        print(f"Coverage update failed: {e}")
+
+def drop_coverage(athlete_id: int):
+    """
+    Forget the coverage index of an athlete who disconnected, in memory and on disk.
+    """
+    _coverage.pop(athlete_id, None)
+    if os.path.exists(coverage_path(athlete_id)):
+        os.remove(coverage_path(athlete_id))
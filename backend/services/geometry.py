@@ -0,0 +1,107 @@
+import struct
+import zlib
+
+import numpy as np
+
+# Coordinates are kept as int32 in 1e-5 degrees, the precision of Google encoded polylines
+SCALE = 1e5
+COMPRESSION_LEVEL = 6
+
+# Payload layout (little-endian, every section 4-byte aligned so it maps onto JS typed arrays):
+#   header   b"STRG", uint32 version, uint32 track_count, uint32 point_count
+#   ids      float64[track_count]      activity ids (exact below 2**53)
+#   offsets  uint32[track_count + 1]   first point of each track, prefix sums of point counts
+#   bboxes   int32[track_count * 4]    min_lat, min_lng, max_lat, max_lng
+#   points   int32[point_count * 2]    lat/lng deltas, the first point of each track is absolute
+PAYLOAD_MAGIC = b"STRG"
+PAYLOAD_VERSION = 1
+
+def decode_polyline(encoded: str) -> np.ndarray:
+    """
+    Decode a Google encoded polyline into an (n, 2) int32 array of lat/lng in 1e-5 degrees.
+    """
+    values = []
+    current = shift = 0
+    for char in encoded:
+        byte = ord(char) - 63
+        current |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(current >> 1) if current & 1 else current >> 1)
+            current = shift = 0
+    deltas = np.array(values[: len(values) // 2 * 2], dtype=np.int32).reshape(-1, 2)
+    return np.cumsum(deltas, axis=0, dtype=np.int32)
+
+def encode_polyline(points: np.ndarray) -> str:
+    """
+    Google encoded polyline of an (n, 2) int array of lat/lng in 1e-5 degrees,
+    the inverse of decode_polyline, vectorized over all values.
+    """
+    deltas = np.diff(points, axis=0, prepend=np.zeros((1, 2), dtype=points.dtype)).ravel().astype(np.int64)
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    bits = np.floor(np.log2(np.maximum(values, 1))).astype(np.int64) + 1
+    lengths = np.maximum((bits + 4) // 5, 1)
+    slots = np.arange(7)
+    groups = (values[:, None] >> (slots * 5)) & 0x1F
+    groups |= np.where(slots < (lengths - 1)[:, None], 0x20, 0)
+    return (groups[slots < lengths[:, None]] + 63).astype(np.uint8).tobytes().decode()
+
+def pack_deltas(points: np.ndarray) -> bytes:
+    """
+    Store a track as int32 deltas from the previous point, the first one absolute.
+
+    The bytes are split into four planes (every low byte, then every second
+    byte...) before zlib: neighbouring points are a few meters apart, so the
+    upper planes are almost all 0x00 or 0xFF and compress to next to nothing.
+    """
+    deltas = np.diff(points, axis=0, prepend=np.zeros((1, 2), dtype=np.int32)).astype("<i4")
+    planes = deltas.view(np.uint8).reshape(-1, 4).T
+    return zlib.compress(planes.tobytes(), COMPRESSION_LEVEL)
+
+def delta_bytes(blob: bytes) -> bytes:
+    """
+    The little-endian int32 deltas of a stored track, as laid out in the payload.
+    """
+    planes = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(4, -1)
+    return planes.T.tobytes()
+
+def unpack_deltas(blob: bytes) -> np.ndarray:
+    """
+    Inverse of pack_deltas: return absolute (n, 2) int32 points.
+    """
+    return np.cumsum(np.frombuffer(delta_bytes(blob), dtype="<i4").reshape(-1, 2), axis=0, dtype=np.int32)
+
+def build_geometry(activity_id: int, points: np.ndarray) -> dict:
+    """
+    Derive the stored geometry row of a decoded, non-empty track.
+    """
+    lat_min, lng_min = points.min(axis=0)
+    lat_max, lng_max = points.max(axis=0)
+    centroid = points.mean(axis=0) / SCALE
+    return {
+        "activity_id": activity_id,
+        "point_count": len(points),
+        "min_lat": int(lat_min), "min_lng": int(lng_min),
+        "max_lat": int(lat_max), "max_lng": int(lng_max),
+        "centroid_lat": float(centroid[0]), "centroid_lng": float(centroid[1]),
+        "deltas": pack_deltas(points),
+    }
+
+def pack_payload(rows: list) -> bytes:
+    """
+    Pack stored geometries into the binary payload described above, with the
+    points decompressed so the client can map them without copying.
+
+    Args:
+        rows (list): Rows with activity_id, point_count, bbox fields and deltas.
+    """
+    counts = np.array([row.point_count for row in rows], dtype=np.uint32)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype("<u4")
+    header = struct.pack("<4sIII", PAYLOAD_MAGIC, PAYLOAD_VERSION, len(rows), int(offsets[-1]))
+    ids = np.array([row.activity_id for row in rows], dtype="<f8")
+    bboxes = np.array(
+        [(row.min_lat, row.min_lng, row.max_lat, row.max_lng) for row in rows], dtype="<i4"
+    ).reshape(-1, 4)
+    return b"".join([
+        header, ids.tobytes(), offsets.tobytes(), bboxes.tobytes(), *(delta_bytes(row.deltas) for row in rows)
+    ])
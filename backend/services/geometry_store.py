@@ -0,0 +1,140 @@
+from typing import Optional
+
+from sqlalchemy import delete, func, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, ActivityGeometry, GeometryLevel
+from services.geometry import SCALE, build_geometry, decode_polyline, pack_deltas, pack_payload, unpack_deltas
+from services.simplify import simplify_tiers
+from services.query_filters import filter_by_athlete, filter_by_year
+
+def track_polyline(row: dict) -> Optional[str]:
+    # The summary polyline is what the year map draws; fall back to the full one
+    return row.get("map_summary_polyline") or row.get("map_polyline")
+
+def without_track(row: dict) -> dict:
+    """
+    The activity row to store once its track goes to ActivityGeometry: the
+    summary polyline text would only duplicate it. The full-resolution
+    polyline is kept, it is not what the track is decoded from when a
+    summary exists.
+    """
+    if not row.get("map_summary_polyline"):
+        return row
+    return {**row, "map_summary_polyline": None}
+
+async def upsert_tracks(session: AsyncSession, model, keys: list, rows: list) -> int:
+    """
+    INSERT ... ON CONFLICT for track rows, only rewriting rows whose deltas changed.
+
+    Returns:
+        int: Number of rows inserted or rewritten.
+    """
+    table = model.__table__
+    stmt = pg_insert(table).values(rows)
+    result = await session.execute(stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in keys},
+        where=table.c.deltas.is_distinct_from(stmt.excluded.deltas),
+    ).returning(table.c.activity_id))
+    return len(result.all())
+
+async def upsert_geometries(session: AsyncSession, rows: list) -> int:
+    """
+    Decode the tracks of parsed activity rows once and store them with their
+    simplified level-of-detail tiers, skipping unchanged ones.
+
+    Returns:
+        int: Number of activities whose track was stored or removed.
+    """
+    tracks = {row["id"]: decode_polyline(track_polyline(row) or "") for row in rows}
+    empty_ids = [activity_id for activity_id, points in tracks.items() if len(points) == 0]
+    tracks = {activity_id: points for activity_id, points in tracks.items() if len(points)}
+
+    removed = 0
+    if empty_ids:
+        result = await session.execute(delete(ActivityGeometry).where(ActivityGeometry.activity_id.in_(empty_ids)))
+        await session.execute(delete(GeometryLevel).where(GeometryLevel.activity_id.in_(empty_ids)))
+        removed = result.rowcount
+    if not tracks:
+        return removed
+
+    geometries = [build_geometry(activity_id, points) for activity_id, points in tracks.items()]
+    levels = [
+        {"activity_id": activity_id, "level": level, "point_count": len(simplified), "deltas": pack_deltas(simplified)}
+        for activity_id, points in tracks.items()
+        for level, simplified in simplify_tiers(points).items()
+    ]
+    stored = await upsert_tracks(session, ActivityGeometry, ["activity_id"], geometries)
+    await upsert_tracks(session, GeometryLevel, ["activity_id", "level"], levels)
+    return removed + stored
+
+async def rebuild_geometries(session: AsyncSession, batch_size: int = 500) -> int:
+    """
+    Decode and store the track of every activity that still has polyline text,
+    for backfilling existing data, then clear the summary text it duplicated.
+
+    Returns:
+        int: Number of activities processed.
+    """
+    columns = select(Activity.id, Activity.map_polyline, Activity.map_summary_polyline).where(
+        or_(Activity.map_polyline.is_not(None), Activity.map_summary_polyline.is_not(None))
+    )
+    last_id, total = None, 0
+    while True:
+        query = columns if last_id is None else columns.where(Activity.id > last_id)
+        result = await session.exec(query.order_by(Activity.id).limit(batch_size))
+        rows = [dict(row._mapping) for row in result.all()]
+        if not rows:
+            return total
+        await upsert_geometries(session, rows)
+        moved = [row["id"] for row in rows if row["map_summary_polyline"]]
+        await session.execute(update(Activity).where(Activity.id.in_(moved)).values(map_summary_polyline=None))
+        last_id, total = rows[-1]["id"], total + len(rows)
+
+def track_query(athlete_id: int, year: Optional[str], level: int = 0):
+    """
+    Stored tracks of an athlete for a year with their bounding boxes, at full resolution
+    (level 0) or one of the simplified tiers, oldest first.
+    """
+    if level == 0:
+        track = ActivityGeometry
+        query = select(ActivityGeometry)
+    else:
+        track = GeometryLevel
+        query = select(
+            ActivityGeometry.activity_id, GeometryLevel.point_count,
+            ActivityGeometry.min_lat, ActivityGeometry.min_lng, ActivityGeometry.max_lat, ActivityGeometry.max_lng,
+            GeometryLevel.deltas,
+        ).join(GeometryLevel, (GeometryLevel.activity_id == ActivityGeometry.activity_id) & (GeometryLevel.level == level))
+    query = query.join(Activity, Activity.id == track.activity_id).order_by(Activity.start_date)
+    return filter_by_year(filter_by_athlete(query, athlete_id), year)
+
+async def load_geometry_payload(session: AsyncSession, athlete_id: int, year: Optional[str], level: int = 0) -> bytes:
+    """
+    Binary payload (see services/geometry.py) of all stored tracks of an athlete for a year.
+    """
+    result = await session.exec(track_query(athlete_id, year, level))
+    return pack_payload(result.all())
+
+async def load_tracks(session: AsyncSession, athlete_id: int, year: Optional[str], level: int = 0) -> list:
+    """
+    Decoded (n, 2) int32 tracks of an athlete for a year.
+    """
+    result = await session.exec(track_query(athlete_id, year, level))
+    return [unpack_deltas(row.deltas) for row in result.all()]
+
+async def load_bounds(session: AsyncSession, athlete_id: int, year: Optional[str]):
+    """
+    Bounding box of all tracks of an athlete for a year as (min_lat, min_lng, max_lat, max_lng)
+    in degrees, from the stored per-track boxes; None without tracks.
+    """
+    query = select(
+        func.min(ActivityGeometry.min_lat), func.min(ActivityGeometry.min_lng),
+        func.max(ActivityGeometry.max_lat), func.max(ActivityGeometry.max_lng),
+    ).join(Activity, Activity.id == ActivityGeometry.activity_id)
+    bounds = (await session.exec(filter_by_year(filter_by_athlete(query, athlete_id), year))).one()
+    if bounds[0] is None:
+        return None
+    return tuple(value / SCALE for value in bounds)
@@ -0,0 +1,77 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+from services.metrics import http_db_queries, http_db_seconds, http_latency, request_db
+
+# ?profile=1 is only honoured when enabled, a profile reveals code paths and slows the server down
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_LINES = 60
+
+def route_template(request: Request) -> str:
+    # The matched path template keeps label cardinality bounded, e.g. /strava/sync/{job_id}
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+async def profile_request(request: Request, call_next):
+    """
+    Run the request under cProfile and answer with the report instead of the response.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        response = await call_next(request)
+        # Streamed bodies are produced lazily, drain it so their work is profiled too
+        async for _ in response.body_iterator:
+            pass
+    finally:
+        profiler.disable()
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return PlainTextResponse(f"{request.method} {request.url.path} -> {response.status_code}\n\n{report.getvalue()}")
+
+def record_request(request: Request, start: float, db: dict, status: int):
+    route = route_template(request)
+    http_latency.observe(time.perf_counter() - start, method=request.method, route=route, status=status)
+    http_db_queries.observe(db["queries"], route=route)
+    http_db_seconds.observe(db["seconds"], route=route)
+
+async def observe_body(body_iterator, on_done):
+    # Streamed bodies keep querying and encoding after the handler returns
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        on_done()
+
+async def instrument_request(request: Request, call_next):
+    """
+    HTTP middleware: latency and DB work per route, and the opt-in profiler.
+
+    The metrics are recorded once the body has been sent, so a streamed
+    response counts the time and queries spent producing it.
+    """
+    db = {"queries": 0, "seconds": 0.0}
+    token = request_db.set(db)
+    start = time.perf_counter()
+    try:
+        if PROFILING_ENABLED and request.query_params.get("profile") == "1":
+            response = await profile_request(request, call_next)
+        else:
+            response = await call_next(request)
+    except Exception:
+        record_request(request, start, db, 500)
+        raise
+    finally:
+        request_db.reset(token)
+    if not hasattr(response, "body_iterator"):
+        record_request(request, start, db, response.status_code)
+        return response
+    response.body_iterator = observe_body(
+        response.body_iterator, lambda: record_request(request, start, db, response.status_code)
+    )
+    return response
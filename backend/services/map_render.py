@@ -0,0 +1,125 @@
+import asyncio
+import math
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+from sqlmodel.ext.asyncio.session import AsyncSession
+from services.geometry import SCALE
+from services.geometry_store import load_bounds, load_tracks
+from services.simplify import METERS_PER_DEGREE, level_for_tolerance
+
+STYLES = {
+    "dark": {"background": (14, 14, 18), "line": (252, 76, 2)},
+    "light": {"background": (250, 250, 250), "line": (252, 76, 2)},
+    "heat": {"background": (0, 0, 0), "line": None},
+}
+# Heat style colour ramp, from rarely to most travelled
+HEAT_STOPS = np.array([0.0, 0.35, 0.7, 1.0])
+HEAT_COLORS = np.array([(90, 0, 20), (220, 40, 10), (255, 160, 0), (255, 255, 210)])
+PADDING = 0.05
+
+def mercator(points: np.ndarray) -> np.ndarray:
+    """
+    Project (n, 2) int32 lat/lng in 1e-5 degrees to web-mercator world coordinates in [0, 1].
+    """
+    lat = np.radians(np.clip(points[:, 0] / SCALE, -85.0, 85.0))
+    x = (points[:, 1] / SCALE + 180) / 360
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / math.pi) / 2
+    return np.stack([x, y], axis=1)
+
+def fit_transform(bounds, width: int, height: int):
+    """
+    Scale and offset mapping world coordinates so the bounds fill the image, aspect kept.
+    """
+    min_lat, min_lng, max_lat, max_lng = bounds
+    corners = mercator(np.array([[max_lat, min_lng], [min_lat, max_lng]]) * SCALE)
+    span = np.maximum(corners[1] - corners[0], 1e-9)
+    scale = min(width / span[0], height / span[1]) * (1 - 2 * PADDING)
+    offset = np.array([width, height]) / 2 - (corners[0] + corners[1]) / 2 * scale
+    return scale, offset
+
+def rasterize(tracks: list, scale: float, offset: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Draw every segment of every track into a per-pixel pass count, all segments at once.
+
+    Each segment is sampled at one point per pixel of its longest axis; samples
+    of all segments are generated in one vectorized pass and counted with bincount.
+    """
+    segments = [mercator(points) * scale + offset for points in tracks if len(points) >= 2]
+    if not segments:
+        return np.zeros((height, width), dtype=np.float32)
+    starts = np.concatenate([s[:-1] for s in segments])
+    deltas = np.concatenate([np.diff(s, axis=0) for s in segments])
+
+    samples = np.minimum(np.ceil(np.abs(deltas).max(axis=1)), 2 * max(width, height)).astype(np.int64) + 1
+    segment = np.repeat(np.arange(len(starts)), samples)
+    first = np.repeat(np.cumsum(samples) - samples, samples)
+    t = (np.arange(len(segment)) - first) / np.maximum(samples[segment] - 1, 1)
+    xy = np.rint(starts[segment] + deltas[segment] * t[:, None]).astype(np.int64)
+
+    inside = (xy[:, 0] >= 0) & (xy[:, 0] < width) & (xy[:, 1] >= 0) & (xy[:, 1] < height)
+    flat = xy[inside, 1] * width + xy[inside, 0]
+    return np.bincount(flat, minlength=width * height).reshape(height, width).astype(np.float32)
+
+def thicken(density: np.ndarray) -> np.ndarray:
+    """
+    Widen lines by one pixel in each direction for large images.
+    """
+    out = density.copy()
+    out[1:, :] = np.maximum(out[1:, :], density[:-1, :])
+    out[:-1, :] = np.maximum(out[:-1, :], density[1:, :])
+    out[:, 1:] = np.maximum(out[:, 1:], density[:, :-1])
+    out[:, :-1] = np.maximum(out[:, :-1], density[:, 1:])
+    return out
+
+def colorize(density: np.ndarray, style: str) -> np.ndarray:
+    """
+    Map pass counts to an RGB image, log-scaled so repeated routes glow brighter.
+    """
+    colors = STYLES[style]
+    level = np.log1p(density) / max(np.log1p(density.max()), 1e-9)
+    background = np.array(colors["background"], dtype=np.float32)
+    if colors["line"] is None:
+        line = np.stack([np.interp(level, HEAT_STOPS, HEAT_COLORS[:, c]) for c in range(3)], axis=-1)
+    else:
+        line = np.array(colors["line"], dtype=np.float32)
+    alpha = np.where(density > 0, np.clip(0.45 + level, 0, 1), 0)[..., None]
+    return (background * (1 - alpha) + line * alpha).astype(np.uint8)
+
+def encode_png(rgb: np.ndarray) -> bytes:
+    """
+    Encode an (h, w, 3) uint8 image as an 8-bit RGB PNG.
+    """
+    height, width, _ = rgb.shape
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgb.reshape(height, width * 3)], axis=1)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b"")
+
+def draw_map(tracks: list, bounds, width: int, height: int, style: str) -> bytes:
+    density = np.zeros((height, width), dtype=np.float32)
+    if bounds:
+        scale, offset = fit_transform(bounds, width, height)
+        density = rasterize(tracks, scale, offset, width, height)
+        if max(width, height) >= 1024:
+            density = thicken(density)
+    return encode_png(colorize(density, style))
+
+async def render_year_map(session: AsyncSession, athlete_id: int, year: Optional[str], width: int, height: int, style: str) -> bytes:
+    """
+    PNG of all routes of an athlete for a year. Tracks are read at the coarsest tier finer than
+    one pixel, and drawing runs in a worker thread to keep the event loop free.
+    """
+    bounds = await load_bounds(session, athlete_id, year)
+    level = 0
+    if bounds:
+        lat_meters = (bounds[2] - bounds[0]) * METERS_PER_DEGREE
+        lng_meters = (bounds[3] - bounds[1]) * METERS_PER_DEGREE * math.cos(math.radians((bounds[0] + bounds[2]) / 2))
+        level = level_for_tolerance(max(lat_meters / height, lng_meters / width))
+    tracks = await load_tracks(session, athlete_id, year, level)
+    return await asyncio.to_thread(draw_map, tracks, bounds, width, height, style)
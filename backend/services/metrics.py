@@ -0,0 +1,117 @@
+import bisect
+import math
+from contextvars import ContextVar
+
+# Prometheus text exposition, kept dependency-free like the MVT and PNG encoders
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# DB work of the request being handled: {"queries": int, "seconds": float}, see query_metrics
+request_db = ContextVar("request_db", default=None)
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name + format_labels(self.labels, key), value
+
+class Gauge(Counter):
+    """
+    A settable value, or one read from `callback` at scrape time as {label tuple: value}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), callback=None):
+        super().__init__(name, help, labels)
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        self.values[tuple(labels.get(name, "") for name in self.labels)] = value
+
+    def samples(self):
+        values = self.callback() if self.callback else self.values
+        for key, value in values.items():
+            yield self.name + format_labels(self.labels, key), value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self.values = {}  # label tuple -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        entry = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            entry[index] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def samples(self):
+        for key, entry in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                yield self.name + "_bucket" + format_labels(self.labels, key, f'le="{bound}"'), cumulative
+            yield self.name + "_bucket" + format_labels(self.labels, key, 'le="+Inf"'), entry[-1]
+            yield self.name + "_sum" + format_labels(self.labels, key), entry[-2]
+            yield self.name + "_count" + format_labels(self.labels, key), entry[-1]
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample, value in metric.samples():
+                lines.append(f"{sample} {value if math.isfinite(value) else 0}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "API request latency by route template.", ("method", "route", "status")))
+http_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per API request.", ("route",), COUNT_BUCKETS))
+http_db_seconds = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL per API request.", ("route",)))
+db_queries = registry.register(Counter("db_queries_total", "SQL statements executed."))
+db_seconds = registry.register(Counter("db_query_seconds_total", "Time spent executing SQL."))
+strava_requests = registry.register(Counter(
+    "strava_api_requests_total", "Strava API calls by endpoint and status code.", ("endpoint", "status")))
+strava_latency = registry.register(Histogram(
+    "strava_api_request_duration_seconds", "Strava API call latency.", ("endpoint",)))
+synced_activities = registry.register(Counter("sync_activities_total", "Activities fetched by syncs."))
+synced_pages = registry.register(Counter("sync_pages_total", "Activity pages fetched by syncs."))
+sync_duration = registry.register(Histogram(
+    "sync_duration_seconds", "Duration of activity syncs.", buckets=(1, 5, 15, 60, 300, 900, 3600, 14400)))
+sync_rate = registry.register(Gauge(
+    "sync_last_throughput", "Throughput of the last finished sync per second.", ("unit",)))
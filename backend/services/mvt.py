@@ -0,0 +1,69 @@
+import numpy as np
+
+# Minimal Mapbox Vector Tile (v2) protobuf writer, enough for one layer of line features
+EXTENT = 4096
+LINESTRING = 2
+
+def varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def field(number: int, payload: bytes) -> bytes:
+    """Length-delimited field (wire type 2)."""
+    return varint(number << 3 | 2) + varint(len(payload)) + payload
+
+def varint_field(number: int, value: int) -> bytes:
+    return varint(number << 3) + varint(value)
+
+def packed(number: int, values) -> bytes:
+    return field(number, b"".join(varint(int(v)) for v in values))
+
+def zigzag(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.int64)
+    return (values << 1) ^ (values >> 63)
+
+def line_commands(parts: list) -> list:
+    """
+    Geometry command stream for a (multi)linestring given as (n, 2) int tile-coordinate arrays.
+    """
+    commands = []
+    cursor = np.zeros(2, dtype=np.int64)
+    for part in parts:
+        deltas = np.diff(part, axis=0, prepend=cursor[None, :])
+        cursor = part[-1].astype(np.int64)
+        encoded = zigzag(deltas).ravel().tolist()
+        commands += [1 | 1 << 3, *encoded[:2], 2 | (len(part) - 1) << 3, *encoded[2:]]
+    return commands
+
+def encode_layer(name: str, features: list) -> bytes:
+    """
+    Encode a tile with a single layer.
+
+    Args:
+        name (str): Layer name.
+        features (list): (feature_id, {key: str value}, parts) tuples, parts as for line_commands.
+
+    Returns:
+        bytes: The protobuf-encoded tile.
+    """
+    keys, values, body = {}, {}, []
+    for feature_id, properties, parts in features:
+        tags = []
+        for key, value in properties.items():
+            tags += [keys.setdefault(key, len(keys)), values.setdefault(str(value), len(values))]
+        body.append(field(2, varint_field(1, feature_id) + packed(2, tags)
+                          + varint_field(3, LINESTRING) + packed(4, line_commands(parts))))
+
+    layer = varint_field(15, 2) + field(1, name.encode())
+    layer += b"".join(body)
+    layer += b"".join(field(3, key.encode()) for key in keys)
+    layer += b"".join(field(4, field(1, value.encode())) for value in values)
+    layer += varint_field(5, EXTENT)
+    return field(3, layer)
@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Optional
+
+from models import Activity
+
+def resolve_year(year):
+    """
+    The concrete year a `year` parameter stands for: "last_year" becomes e.g. "2025",
+    anything else is returned unchanged. Cache keys hold this, so they move on at New Year.
+    """
+    return str(datetime.now().year - 1) if year == "last_year" else year
+
+def get_year_range(year: Optional[str]):
+    """
+    Resolve the `year` query parameter into a (start, end) datetime range.
+
+    Args:
+        year (str, optional): A year like "2024", or "last_year".
+
+    Returns:
+        tuple: (start_date, end_date), or None when no year filter applies.
+    """
+    if not year:
+        return None
+    try:
+        target_year = int(resolve_year(year))
+    except ValueError:
+        return None
+    return datetime(target_year, 1, 1), datetime(target_year, 12, 31, 23, 59, 59)
+
+def filter_by_year(query, year: Optional[str]):
+    """
+    Restrict a query on Activity to the given year, if any. Years are local
+    (start_date_local) like the rollup days, so every endpoint agrees on them.
+    """
+    year_range = get_year_range(year)
+    if not year_range:
+        return query
+    start_date, end_date = year_range
+    return query.where(Activity.start_date_local >= start_date, Activity.start_date_local <= end_date)
+
+def filter_days_by_year(query, column, year: Optional[str]):
+    """
+    Restrict a query on a date column (e.g. a rollup day) to the given year, if any.
+    """
+    year_range = get_year_range(year)
+    if not year_range:
+        return query
+    start_date, end_date = year_range
+    return query.where(column >= start_date.date(), column <= end_date.date())
+
+def filter_by_athlete(query, athlete_id: int, column=Activity.athlete_id):
+    """
+    Restrict a query to one athlete's rows; `column` is the athlete_id of the table queried.
+    """
+    return query.where(column == athlete_id)
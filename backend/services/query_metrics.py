@@ -0,0 +1,69 @@
+import time
+
+from services.metrics import db_queries, db_seconds, request_db
+
+# Distinct statements tracked; past this, new ones are counted under OTHER
+MAX_STATEMENTS = 200
+OTHER = "(other statements)"
+
+class QueryMetrics:
+    """
+    Per-statement execution counts and timings, collected from SQLAlchemy
+    cursor events instead of logging every statement with `echo`.
+    """
+
+    def __init__(self, max_statements: int = MAX_STATEMENTS, clock=time.perf_counter):
+        self.max_statements = max_statements
+        self.clock = clock
+        self.statements = {}  # SQL text -> [count, total seconds, max seconds]
+
+    def install(self, sync_engine):
+        """
+        Listen to the cursor events of an engine (`async_engine.sync_engine` for asyncio).
+        """
+        from sqlalchemy import event
+
+        event.listen(sync_engine, "before_cursor_execute", self.before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self.after_execute)
+
+    def before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(self.clock())
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = self.clock() - conn.info["query_start"].pop()
+        self.record(statement, elapsed)
+        db_queries.inc()
+        db_seconds.inc(elapsed)
+        request = request_db.get()
+        if request is not None:
+            request["queries"] += 1
+            request["seconds"] += elapsed
+
+    def record(self, statement: str, elapsed: float):
+        key = " ".join(statement.split())
+        if key not in self.statements and len(self.statements) >= self.max_statements:
+            key = OTHER
+        entry = self.statements.setdefault(key, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+    def stats(self, limit: int = 20) -> dict:
+        """
+        Totals and the `limit` statements with the most cumulative time.
+        """
+        ranked = sorted(self.statements.items(), key=lambda item: -item[1][1])[:limit]
+        return {
+            "statements": sum(entry[0] for entry in self.statements.values()),
+            "total_seconds": round(sum(entry[1] for entry in self.statements.values()), 6),
+            "slowest": [
+                {"sql": sql[:500], "count": count, "total_seconds": round(total, 6),
+                 "mean_ms": round(total / count * 1000, 3), "max_ms": round(worst * 1000, 3)}
+                for sql, (count, total, worst) in ranked
+            ],
+        }
+
+    def reset(self):
+        self.statements.clear()
+
+query_metrics = QueryMetrics()
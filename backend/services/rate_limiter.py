@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+# Strava quotas reset on fixed boundaries: every quarter hour and at midnight UTC
+WINDOWS = {"short": 15 * 60, "daily": 24 * 60 * 60}
+
+class RateLimiter:
+    """
+    Token buckets mirroring Strava's 15-minute and daily request quotas.
+
+    Every request takes one token from both buckets. Buckets refill at the
+    window boundaries and are re-synced from the X-RateLimit-* headers of each
+    response. When a bucket is empty, acquire() waits for the next reset
+    instead of letting the request fail with a 429.
+    """
+
+    def __init__(self, short_limit: int = 200, daily_limit: int = 2000, clock=time.time, sleep=asyncio.sleep):
+        self.limits = {"short": short_limit, "daily": daily_limit}
+        self.usage = {"short": 0, "daily": 0}
+        self.window_ids = {}
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = asyncio.Lock()
+
+    def _roll_windows(self):
+        now = self.clock()
+        for name, length in WINDOWS.items():
+            window_id = int(now // length)
+            if self.window_ids.get(name) != window_id:
+                self.window_ids[name] = window_id
+                self.usage[name] = 0
+
+    def _wait_time(self) -> float:
+        now = self.clock()
+        waits = [
+            length - now % length
+            for name, length in WINDOWS.items()
+            if self.usage[name] >= self.limits[name]
+        ]
+        return max(waits, default=0)
+
+    async def acquire(self):
+        """
+        Take a token from both buckets, waiting for a window reset if either is empty.
+        """
+        async with self.lock:
+            self._roll_windows()
+            while (delay := self._wait_time()) > 0:
+                print(f"Strava rate limit reached, waiting {delay:.0f}s for the quota to reset")
+                await self.sleep(delay)
+                self._roll_windows()
+            for name in self.usage:
+                self.usage[name] += 1
+
+    def update(self, headers):
+        """
+        Sync limits and usage from Strava's "short,daily" rate-limit headers.
+        """
+        limit = headers.get("X-RateLimit-Limit")
+        usage = headers.get("X-RateLimit-Usage")
+        if not limit or not usage:
+            return
+        self._roll_windows()
+        try:
+            short_limit, daily_limit = (int(v) for v in limit.split(","))
+            short_usage, daily_usage = (int(v) for v in usage.split(","))
+        except ValueError:
+            return
+        self.limits = {"short": short_limit, "daily": daily_limit}
+        self.usage = {"short": short_usage, "daily": daily_usage}
+
+    def exhaust(self):
+        """
+        Mark the 15-minute bucket empty, used after an unexpected 429.
+        """
+        self._roll_windows()
+        self.usage["short"] = max(self.usage["short"], self.limits["short"])
+
+    def budget(self) -> dict:
+        """
+        Current limit, usage, remaining requests and seconds to reset for each window.
+        """
+        self._roll_windows()
+        now = self.clock()
+        return {
+            name: {
+                "limit": self.limits[name],
+                "usage": self.usage[name],
+                "remaining": max(0, self.limits[name] - self.usage[name]),
+                "resets_in": round(length - now % length),
+            }
+            for name, length in WINDOWS.items()
+        }
@@ -0,0 +1,154 @@
+from typing import Optional
+
+from sqlalchemy import Integer, and_, case, cast, delete, func, insert, literal, or_, union_all
+from sqlalchemy.dialects.postgresql import distinct_on, insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, ActivityStream, BestEffort, PersonalRecord
+from services.best_efforts import EFFORT_DISTANCES, compute_efforts
+from services.query_filters import get_year_range
+from services.streams import unpack_stream
+
+EFFORT_STREAMS = ["time", "distance", "latlng", "velocity_smooth", "heartrate"]
+EFFORT_NAMES = {target: name for name, target in EFFORT_DISTANCES.items()}
+REBUILD_BATCH = 50
+
+def is_better(kind: str, value: float, current: float) -> bool:
+    # Distance efforts are times, everything else is a mean to maximize
+    return value < current if kind == "distance" else value > current
+
+async def load_effort_inputs(session: AsyncSession, activity_ids: list) -> list:
+    """
+    (activity_id, athlete_id, sport_type, start_date, local year, streams) of activities with stored streams.
+    """
+    query = select(
+        ActivityStream.activity_id, Activity.athlete_id, Activity.sport_type, Activity.start_date, Activity.start_date_local,
+        *[getattr(ActivityStream, name) for name in EFFORT_STREAMS],
+    ).join(Activity, Activity.id == ActivityStream.activity_id).where(ActivityStream.activity_id.in_(activity_ids))
+    return [
+        (row[0], row[1], row[2], row[3], row[4].year,
+         {name: unpack_stream(name, blob) for name, blob in zip(EFFORT_STREAMS, row[5:]) if blob is not None})
+        for row in (await session.exec(query)).all()
+    ]
+
+async def merge_records(session: AsyncSession, candidates: list):
+    """
+    Keep the better of each candidate and the stored record for its slot.
+    """
+    keys = {(c["athlete_id"], c["sport_type"], c["year"]) for c in candidates}
+    query = select(PersonalRecord).where(or_(*[
+        and_(PersonalRecord.athlete_id == athlete_id, PersonalRecord.sport_type == sport_type, PersonalRecord.year == year)
+        for athlete_id, sport_type, year in keys
+    ]))
+    best = {(r.athlete_id, r.sport_type, r.year, r.kind, r.target): r.value for r in (await session.exec(query)).all()}
+    changed = {}
+    for c in candidates:
+        key = (c["athlete_id"], c["sport_type"], c["year"], c["kind"], c["target"])
+        if key not in best or is_better(c["kind"], c["value"], best[key]):
+            best[key] = c["value"]
+            changed[key] = c
+    if changed:
+        stmt = pg_insert(PersonalRecord.__table__).values(list(changed.values()))
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["athlete_id", "sport_type", "year", "kind", "target"],
+            set_={name: stmt.excluded[name] for name in ["activity_id", "value", "start_offset", "start_date"]},
+        ))
+
+async def update_best_efforts(session: AsyncSession, activity_ids: list) -> int:
+    """
+    Compute and store the best efforts of these activities from their streams,
+    and fold them into the all-time and yearly records.
+
+    Records an activity already holds are recomputed the way the delete path
+    does, since a re-ingested activity may have become slower, or changed
+    sport type or year.
+
+    Returns:
+        int: Number of efforts stored.
+    """
+    if not activity_ids:
+        return 0
+    efforts, candidates = [], []
+    for activity_id, athlete_id, sport_type, start_date, local_year, streams in await load_effort_inputs(session, activity_ids):
+        for kind, target, value, start_offset in compute_efforts(streams):
+            effort = {"activity_id": activity_id, "kind": kind, "target": target, "value": value, "start_offset": start_offset}
+            efforts.append(effort)
+            for year in (0, local_year):
+                candidates.append({**effort, "athlete_id": athlete_id, "sport_type": sport_type, "year": year, "start_date": start_date})
+
+    released = await session.execute(
+        delete(PersonalRecord).where(PersonalRecord.activity_id.in_(activity_ids)).returning(PersonalRecord.athlete_id)
+    )
+    athlete_ids = list(set(released.scalars().all()))
+    await session.execute(delete(BestEffort).where(BestEffort.activity_id.in_(activity_ids)))
+    if efforts:
+        await session.execute(insert(BestEffort).values(efforts))
+    if athlete_ids:
+        await restore_records(session, athlete_ids)
+    if efforts:
+        await merge_records(session, candidates)
+    return len(efforts)
+
+def effort_candidates(year, athlete_ids: list):
+    return select(
+        Activity.athlete_id, Activity.sport_type, year.label("year"), BestEffort.kind, BestEffort.target,
+        BestEffort.activity_id, BestEffort.value, BestEffort.start_offset, Activity.start_date,
+    ).join(Activity, Activity.id == BestEffort.activity_id).where(Activity.athlete_id.in_(athlete_ids))
+
+async def restore_records(session: AsyncSession, athlete_ids: list):
+    """
+    Refill the record slots of these athletes emptied when the activity holding
+    them was deleted (the row cascades away) with the best remaining stored
+    effort, all time and per local year. Slots still held are left alone, they
+    cannot have improved.
+    """
+    candidates = union_all(
+        effort_candidates(literal(0, Integer), athlete_ids),
+        effort_candidates(cast(func.extract("year", Activity.start_date_local), Integer), athlete_ids),
+    ).subquery()
+    slot = [candidates.c.athlete_id, candidates.c.sport_type, candidates.c.year, candidates.c.kind, candidates.c.target]
+    held = select(PersonalRecord.year).where(
+        PersonalRecord.athlete_id == slot[0], PersonalRecord.sport_type == slot[1],
+        PersonalRecord.year == slot[2], PersonalRecord.kind == slot[3], PersonalRecord.target == slot[4],
+    ).exists()
+    # Distance efforts are times to minimize, the curves means to maximize
+    rank = case((candidates.c.kind == "distance", candidates.c.value), else_=-candidates.c.value)
+    best = select(*candidates.c).ext(distinct_on(*slot)).where(~held).order_by(*slot, rank)
+    await session.execute(insert(PersonalRecord).from_select([column.name for column in candidates.c], best))
+
+async def rebuild_records(session: AsyncSession) -> int:
+    """
+    Recompute the best efforts of every activity with streams and the records from scratch.
+
+    Returns:
+        int: Number of activities processed.
+    """
+    await session.execute(delete(PersonalRecord))
+    ids = (await session.exec(select(ActivityStream.activity_id).order_by(ActivityStream.activity_id))).all()
+    for start in range(0, len(ids), REBUILD_BATCH):
+        await update_best_efforts(session, ids[start:start + REBUILD_BATCH])
+    return len(ids)
+
+async def get_records(session: AsyncSession, athlete_id: int, year: Optional[str], sport_type: Optional[str] = None) -> dict:
+    """
+    Records of an athlete for a year, or all time when `year` resolves to no
+    range, grouped by sport type and kind.
+    """
+    year_range = get_year_range(year)
+    query = select(PersonalRecord).where(
+        PersonalRecord.athlete_id == athlete_id, PersonalRecord.year == (year_range[0].year if year_range else 0),
+    )
+    if sport_type:
+        query = query.where(PersonalRecord.sport_type == sport_type)
+    query = query.order_by(PersonalRecord.sport_type, PersonalRecord.kind, PersonalRecord.target)
+
+    records = {}
+    for r in (await session.exec(query)).all():
+        record = {
+            "target": r.target, "value": r.value, "activity_id": r.activity_id,
+            "start_offset": r.start_offset, "start_date": r.start_date,
+        }
+        if r.kind == "distance":
+            record["name"] = EFFORT_NAMES.get(r.target)
+        records.setdefault(r.sport_type, {}).setdefault(r.kind, []).append(record)
+    return records
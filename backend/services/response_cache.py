@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import timezone
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import SyncState
+from services.metrics import Gauge, registry
+from services.query_filters import resolve_year
+from services.response_store import ResponseCache
+
+# How long the data version read from the database is trusted before re-checking.
+# A sync in this process expires it immediately; syncs from the CLI script are seen after the TTL.
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "5"))
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "128")),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+registry.register(Gauge(
+    "response_cache_events", "Response cache hits, misses, 304s, evictions, entries and bytes.", ("event",),
+    callback=lambda: {(name,): value for name, value in response_cache.stats().items()},
+))
+
+# Data version per athlete id, None holding the version across all athletes.
+_data_versions = {}
+
+async def get_data_version(session: AsyncSession, athlete_id: Optional[int] = None):
+    """
+    Return the time an athlete's data last changed (any athlete's when
+    `athlete_id` is None), re-reading SyncState at most every DATA_VERSION_TTL seconds.
+    """
+    now = time.monotonic()
+    cached = _data_versions.get(athlete_id)
+    if cached is None or now - cached["checked_at"] > DATA_VERSION_TTL:
+        query = select(func.max(SyncState.data_updated_at))
+        if athlete_id is not None:
+            query = query.where(SyncState.athlete_id == athlete_id)
+        cached = {"value": (await session.exec(query)).one(), "checked_at": now}
+        _data_versions[athlete_id] = cached
+    return cached["value"]
+
+def expire_data_version():
+    """
+    Force the next request to re-read the data version, called after a sync commits.
+    """
+    _data_versions.clear()
+
+def is_not_modified(request: Request, etag: str, version) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(",")]
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and version:
+        try:
+            last_modified = version.replace(tzinfo=timezone.utc, microsecond=0)
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def cache_key(key: tuple, version) -> tuple:
+    # "last_year" names another year after New Year, even when the data did not change
+    return (*(resolve_year(part) if isinstance(part, str) else part for part in key), version)
+
+def validator_headers(key: tuple, version) -> dict:
+    etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if version:
+        headers["Last-Modified"] = format_datetime(version.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+async def cached_response(
+    request: Request, session: AsyncSession, key: tuple, build, media_type: str, compress: bool = False,
+    athlete_id: Optional[int] = None,
+):
+    """
+    Serve a payload with ETag/Last-Modified, from the cache when possible.
+
+    With `compress` the body is gzipped once when built and cached that way;
+    it is sent with Content-Encoding: gzip, or inflated for the rare client
+    that does not accept it. The two encodings get distinct ETags and
+    Vary: Accept-Encoding so shared caches do not mix them up.
+
+    Args:
+        request (Request): Incoming request, checked for conditional headers.
+        session (AsyncSession): Only used to read the data version when it has expired.
+        key (tuple): Endpoint name and query parameters identifying the payload.
+        build: Coroutine function producing the encoded body on a cache miss.
+        media_type (str): Content type of the body.
+        compress (bool): Store and send the body gzipped.
+        athlete_id (Optional[int]): Athlete the payload is about; its own data
+            version is used so other athletes' syncs keep it cached.
+
+    Returns:
+        Response: 304 Not Modified, or the encoded body.
+    """
+    version = await get_data_version(session, athlete_id)
+    key = cache_key(key, version)
+    headers = validator_headers(key, version)
+    gzipped = compress and accepts_gzip(request)
+    if compress:
+        headers["Vary"] = "Accept-Encoding"
+    if gzipped:
+        headers["ETag"] = headers["ETag"][:-1] + '-gzip"'
+    if is_not_modified(request, headers["ETag"], version):
+        response_cache.counters["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key)
+    if body is None:
+        body = await build()
+        if compress:
+            body = gzip.compress(body, compresslevel=6)
+        response_cache.put(key, body)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    elif compress:
+        body = gzip.decompress(body)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+async def cached_json_response(
+    request: Request, session: AsyncSession, key: tuple, build, athlete_id: Optional[int] = None,
+):
+    """
+    cached_response for a JSON payload; `build` returns the unencoded data.
+    """
+    async def build_json():
+        return json.dumps(jsonable_encoder(await build())).encode()
+    return await cached_response(request, session, key, build_json, "application/json", athlete_id=athlete_id)
+
+async def cached_stream_response(
+    request: Request, session: AsyncSession, key: tuple, stream, media_type: str, athlete_id: Optional[int] = None,
+):
+    """
+    cached_response for a body encoded chunk by chunk: on a cache miss `stream()`
+    is an async generator whose chunks are sent as they come, and the body is
+    cached once complete if it fits.
+    """
+    version = await get_data_version(session, athlete_id)
+    key = cache_key(key, version)
+    headers = validator_headers(key, version)
+    if is_not_modified(request, headers["ETag"], version):
+        response_cache.counters["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def send():
+        chunks, size = [], 0
+        async for chunk in stream():
+            yield chunk
+            size += len(chunk)
+            if chunks is not None:
+                chunks.append(chunk)
+            if size > response_cache.max_bytes:
+                chunks = None
+        if chunks is not None:
+            response_cache.put(key, b"".join(chunks))
+
+    return StreamingResponse(send(), media_type=media_type, headers=headers)
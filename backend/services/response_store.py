@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+class ResponseCache:
+    """
+    In-process LRU cache of encoded response bodies, bounded by entry count and total bytes.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.counters = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is None:
+            self.counters["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return body
+
+    def put(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = body
+        self.size += len(body)
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.counters["evictions"] += 1
+
+    def discard(self, key):
+        body = self.entries.pop(key, None)
+        if body is not None:
+            self.size -= len(body)
+            self.counters["evictions"] += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        return {**self.counters, "entries": len(self.entries), "bytes": self.size}
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from sqlalchemy import Date, Integer, cast, delete, func, insert, literal_column
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, DailyRollup, WeeklyRollup
+
+TOTAL_COLUMNS = ["count", "distance", "moving_time", "elevation", "heartrate_sum", "heartrate_count"]
+
+activity_day = cast(Activity.start_date_local, Date)
+# Monday of the ISO week, kept free of bound params so it can appear in GROUP BY
+rollup_week = DailyRollup.day - (cast(func.extract("isodow", DailyRollup.day), Integer) - literal_column("1"))
+
+def daily_totals_query():
+    return select(
+        Activity.athlete_id, activity_day, Activity.sport_type,
+        func.count(), func.sum(Activity.distance), func.sum(Activity.moving_time),
+        func.coalesce(func.sum(Activity.total_elevation_gain), 0),
+        func.coalesce(func.sum(Activity.average_heartrate), 0), func.count(Activity.average_heartrate),
+    ).where(Activity.athlete_id.isnot(None)).group_by(Activity.athlete_id, activity_day, Activity.sport_type)
+
+def weekly_totals_query():
+    return select(
+        DailyRollup.athlete_id, rollup_week, DailyRollup.sport_type,
+        *[func.sum(getattr(DailyRollup, name)) for name in TOTAL_COLUMNS],
+    ).group_by(DailyRollup.athlete_id, rollup_week, DailyRollup.sport_type)
+
+async def get_touched_days(session: AsyncSession, rows: list) -> set:
+    """
+    (athlete_id, local date) pairs affected by upserting these rows: their new
+    dates plus the dates currently stored for them, in case an activity moved
+    to another day.
+    """
+    days = {(row["athlete_id"], row["start_date_local"].date()) for row in rows if row["athlete_id"] is not None}
+    query = select(Activity.athlete_id, activity_day).where(Activity.id.in_([row["id"] for row in rows]))
+    days.update((await session.exec(query)).all())
+    return days
+
+async def refresh_athlete_rollups(session: AsyncSession, athlete_id: int, days: set):
+    weeks = {day - timedelta(days=day.weekday()) for day in days}
+    await session.execute(delete(DailyRollup).where(DailyRollup.athlete_id == athlete_id, DailyRollup.day.in_(days)))
+    await session.execute(insert(DailyRollup).from_select(
+        ["athlete_id", "day", "sport_type", *TOTAL_COLUMNS],
+        daily_totals_query().where(Activity.athlete_id == athlete_id, activity_day.in_(days)),
+    ))
+    await session.execute(delete(WeeklyRollup).where(WeeklyRollup.athlete_id == athlete_id, WeeklyRollup.week_start.in_(weeks)))
+    await session.execute(insert(WeeklyRollup).from_select(
+        ["athlete_id", "week_start", "sport_type", *TOTAL_COLUMNS],
+        weekly_totals_query().where(DailyRollup.athlete_id == athlete_id, rollup_week.in_(weeks)),
+    ))
+
+async def refresh_rollups(session: AsyncSession, days: set):
+    """
+    Recompute daily rollups for the given (athlete_id, local date) pairs and
+    weekly rollups for their weeks, athlete by athlete.
+    """
+    by_athlete = {}
+    for athlete_id, day in days:
+        by_athlete.setdefault(athlete_id, set()).add(day)
+    for athlete_id, athlete_days in by_athlete.items():
+        await refresh_athlete_rollups(session, athlete_id, athlete_days)
+
+async def rebuild_rollups(session: AsyncSession):
+    """
+    Regenerate both rollup tables from scratch out of the Activity table.
+    """
+    await session.execute(delete(DailyRollup))
+    await session.execute(insert(DailyRollup).from_select(["athlete_id", "day", "sport_type", *TOTAL_COLUMNS], daily_totals_query()))
+    await session.execute(delete(WeeklyRollup))
+    await session.execute(insert(WeeklyRollup).from_select(["athlete_id", "week_start", "sport_type", *TOTAL_COLUMNS], weekly_totals_query()))
@@ -0,0 +1,129 @@
+from typing import Optional
+
+from sqlalchemy import Integer, cast, delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, ActivityGeometry, RouteArea, RouteVisit
+from services.geometry import SCALE, unpack_deltas
+from services.query_filters import filter_by_athlete, filter_by_year
+from services.route_grid import RouteGrid
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+INSERT_BATCH = 1000
+
+def route_center(deltas: Optional[bytes]):
+    """
+    Middle point of a stored track as (lat, lng), like getRouteCenter in the frontend.
+    """
+    if not deltas:
+        return None
+    points = unpack_deltas(deltas)
+    lat, lng = points[len(points) // 2] / SCALE
+    return float(lat), float(lng)
+
+async def load_grid(session: AsyncSession, athlete_id: int) -> RouteGrid:
+    grid = RouteGrid()
+    query = select(RouteArea).where(RouteArea.athlete_id == athlete_id).order_by(RouteArea.id)
+    for area in (await session.exec(query)).all():
+        grid.add_area(area.lat, area.lng, area.visit_count)
+    return grid
+
+async def load_pending(session: AsyncSession, athlete_id: int, rebuild: bool):
+    query = (
+        select(Activity.id, Activity.start_date, ActivityGeometry.deltas)
+        .outerjoin(ActivityGeometry, ActivityGeometry.activity_id == Activity.id)
+        .where(Activity.athlete_id == athlete_id)
+        .order_by(Activity.start_date, Activity.id)
+    )
+    if not rebuild:
+        query = query.outerjoin(RouteVisit, RouteVisit.activity_id == Activity.id).where(RouteVisit.activity_id.is_(None))
+    return (await session.exec(query)).all()
+
+async def update_route_frequency(session: AsyncSession, athlete_id: int, rebuild: bool = False) -> int:
+    """
+    Assign an athlete's activities not analysed yet to their visited areas, in start order.
+
+    Only new activities are processed and the areas are updated in place. An
+    activity older than the last analysed one changes history, so in that
+    case (or when `rebuild` is set) everything is recomputed.
+
+    Returns:
+        int: Number of activities analysed.
+    """
+    pending = await load_pending(session, athlete_id, rebuild)
+    latest = (await session.exec(select(func.max(RouteVisit.start_date)).where(RouteVisit.athlete_id == athlete_id))).one()
+    if not rebuild and pending and latest and pending[0].start_date < latest:
+        return await update_route_frequency(session, athlete_id, rebuild=True)
+    if rebuild:
+        await session.execute(delete(RouteVisit).where(RouteVisit.athlete_id == athlete_id))
+        await session.execute(delete(RouteArea).where(RouteArea.athlete_id == athlete_id))
+    if not pending:
+        return 0
+
+    grid = RouteGrid() if rebuild else await load_grid(session, athlete_id)
+    visits, touched, first_visitors = [], set(), {}
+    for activity_id, start_date, deltas in pending:
+        center = route_center(deltas)
+        if center is None:
+            visits.append({"activity_id": activity_id, "athlete_id": athlete_id, "area_id": None,
+                           "is_new": True, "visit_number": 1, "start_date": start_date})
+            continue
+        index, is_new, count = grid.visit(*center)
+        touched.add(index)
+        if is_new:
+            first_visitors[index] = activity_id
+        visits.append({"activity_id": activity_id, "athlete_id": athlete_id, "area_id": index + 1,
+                       "is_new": is_new, "visit_number": count, "start_date": start_date})
+
+    areas = [
+        {"athlete_id": athlete_id, "id": i + 1, "lat": grid.areas[i][0], "lng": grid.areas[i][1], "visit_count": grid.areas[i][2],
+         "first_activity_id": first_visitors.get(i, 0)}
+        for i in sorted(touched)
+    ]
+    for start in range(0, len(areas), INSERT_BATCH):
+        stmt = pg_insert(RouteArea.__table__).values(areas[start:start + INSERT_BATCH])
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["athlete_id", "id"], set_={"visit_count": stmt.excluded.visit_count}
+        ))
+    for start in range(0, len(visits), INSERT_BATCH):
+        await session.execute(insert(RouteVisit).values(visits[start:start + INSERT_BATCH]))
+    return len(pending)
+
+async def get_route_frequency(session: AsyncSession, athlete_id: int, year: Optional[str], limit: int = 10) -> dict:
+    """
+    Route frequency results of an athlete for a year: per-activity flags, new vs repeated by month
+    and the most visited areas.
+    """
+    query = select(RouteVisit.activity_id, RouteVisit.is_new, RouteVisit.visit_number).join(
+        Activity, Activity.id == RouteVisit.activity_id
+    )
+    rows = (await session.exec(filter_by_year(filter_by_athlete(query, athlete_id), year))).all()
+
+    month = func.extract("month", Activity.start_date_local)
+    query = select(
+        month, func.sum(cast(RouteVisit.is_new, Integer)), func.count()
+    ).join(Activity, Activity.id == RouteVisit.activity_id).group_by(month)
+    query = filter_by_athlete(query, athlete_id)
+    by_month = [{"month": name, "new": 0, "repeated": 0} for name in MONTHS]
+    for month_number, new, total in (await session.exec(filter_by_year(query, year))).all():
+        by_month[int(month_number) - 1].update(new=int(new), repeated=int(total - new))
+
+    visits = func.count().label("visits")
+    query = (
+        select(RouteArea.id, RouteArea.lat, RouteArea.lng, visits)
+        .join(RouteVisit, (RouteVisit.athlete_id == RouteArea.athlete_id) & (RouteVisit.area_id == RouteArea.id))
+        .join(Activity, Activity.id == RouteVisit.activity_id)
+        .where(RouteArea.athlete_id == athlete_id)
+        .group_by(RouteArea.id).order_by(visits.desc(), RouteArea.id).limit(limit)
+    )
+    most_visited = [
+        {"area_id": area_id, "lat": lat, "lng": lng, "visits": count}
+        for area_id, lat, lng, count in (await session.exec(filter_by_year(query, year))).all()
+    ]
+
+    return {
+        "activities": {activity_id: {"isNew": is_new, "visitCount": number} for activity_id, is_new, number in rows},
+        "newVsRepeatedByMonth": by_month,
+        "mostVisited": most_visited,
+    }
@@ -0,0 +1,82 @@
+import math
+from collections import defaultdict
+
+EARTH_RADIUS = 6371e3
+METERS_PER_DEGREE = 111_320.0
+
+def haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Distance in meters between two lat/lng points.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+class RouteGrid:
+    """
+    Visited areas bucketed into ~`radius`-sized grid cells.
+
+    Mirrors analyzeRouteFrequency in the frontend: a route whose centre lies
+    within `radius` meters of a known area is a repeat of the oldest such area,
+    otherwise it opens a new area. Cells are at least `radius` wide, so only
+    the 3x3 block around a point has to be checked instead of every area.
+    """
+
+    def __init__(self, radius: float = 100.0):
+        self.radius = radius
+        self.areas = []  # [lat, lng, visit_count], in creation order
+        self.cells = defaultdict(list)
+
+    def row(self, lat: float) -> int:
+        return math.floor(lat * METERS_PER_DEGREE / self.radius)
+
+    def col(self, row: int, lng: float) -> int:
+        # Column width is `radius` meters at the row's latitude
+        lat = (row + 0.5) * self.radius / METERS_PER_DEGREE
+        width = self.radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        return math.floor(lng / width)
+
+    def cell(self, lat: float, lng: float) -> tuple:
+        row = self.row(lat)
+        return row, self.col(row, lng)
+
+    def add_area(self, lat: float, lng: float, count: int = 1) -> int:
+        self.areas.append([lat, lng, count])
+        self.cells[self.cell(lat, lng)].append(len(self.areas) - 1)
+        return len(self.areas) - 1
+
+    def find(self, lat: float, lng: float):
+        """
+        Index of the oldest area within `radius` of the point, or None.
+        """
+        row = self.row(lat)
+        best = None
+        for r in (row - 1, row, row + 1):
+            col = self.col(r, lng)
+            for c in (col - 1, col, col + 1):
+                for index in self.cells.get((r, c), ()):
+                    if (best is None or index < best) and haversine(lat, lng, *self.areas[index][:2]) < self.radius:
+                        best = index
+        return best
+
+    def visit(self, lat: float, lng: float) -> tuple:
+        """
+        Record a route centre.
+
+        Returns:
+            tuple: (area index, is_new, visit count of the area including this one).
+        """
+        index = self.find(lat, lng)
+        if index is None:
+            return self.add_area(lat, lng), True, 1
+        self.areas[index][2] += 1
+        return index, False, self.areas[index][2]
+
+    def most_visited(self, limit: int = 10) -> list:
+        """
+        Areas with the most visits as (index, lat, lng, visit_count), most visited first.
+        """
+        ranked = sorted(range(len(self.areas)), key=lambda i: (-self.areas[i][2], i))[:limit]
+        return [(i, *self.areas[i]) for i in ranked]
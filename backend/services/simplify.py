@@ -0,0 +1,70 @@
+import numpy as np
+
+from services.geometry import SCALE
+
+# Level-of-detail tiers: Douglas-Peucker tolerance in meters, level 0 is the full track
+TIER_TOLERANCES = {1: 5.0, 2: 20.0, 3: 80.0}
+METERS_PER_DEGREE = 111_320.0
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification of an (n, 2) int32 lat/lng track.
+
+    Uses an explicit stack instead of recursion; the distances of all points of a
+    segment to its chord are computed in one NumPy expression.
+
+    Args:
+        points (np.ndarray): Track in 1e-5 degrees.
+        tolerance (float): Maximum deviation in meters.
+
+    Returns:
+        np.ndarray: The kept points, first and last always included.
+    """
+    n = len(points)
+    if n < 3 or tolerance <= 0:
+        return points
+    # Project to a local metric plane so the tolerance means the same in both axes
+    xy = points.astype(np.float64) * (METERS_PER_DEGREE / SCALE)
+    xy[:, 1] *= np.cos(np.radians(points[:, 0].mean() / SCALE))
+
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, chord = xy[start], xy[end] - xy[start]
+        rel = xy[start + 1:end] - a
+        length = np.hypot(chord[0], chord[1])
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(chord[0] * rel[:, 1] - chord[1] * rel[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.extend([(start, split), (split, end)])
+    return points[keep]
+
+def simplify_tiers(points: np.ndarray) -> dict:
+    """
+    Simplified versions of a track for every tier, {level: points}.
+    """
+    return {level: simplify(points, tolerance) for level, tolerance in TIER_TOLERANCES.items()}
+
+def level_for_zoom(zoom: int) -> int:
+    """
+    Coarsest tier whose tolerance stays under one pixel at this web-map zoom (at 45° latitude).
+    """
+    meters_per_pixel = 156_543.0 * np.cos(np.radians(45)) / 2 ** zoom
+    levels = [level for level, tolerance in TIER_TOLERANCES.items() if tolerance <= meters_per_pixel]
+    return max(levels, default=0)
+
+def level_for_tolerance(tolerance: float) -> int:
+    """
+    Coarsest tier whose tolerance does not exceed the requested one, in meters.
+    """
+    levels = [level for level, value in TIER_TOLERANCES.items() if value <= tolerance]
+    return max(levels, default=0)
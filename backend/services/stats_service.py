@@ -0,0 +1,119 @@
+from typing import Optional
+
+from sqlalchemy import case, func, literal_column
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, DailyRollup, WeeklyRollup
+from services.query_filters import filter_by_athlete, filter_by_year, filter_days_by_year
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+TIME_OF_DAY = [
+    ("morning", "Morning (5am-12pm)"),
+    ("afternoon", "Afternoon (12pm-5pm)"),
+    ("evening", "Evening (5pm-9pm)"),
+    ("night", "Night (9pm-5am)"),
+]
+
+async def get_type_breakdown(session: AsyncSession, athlete_id: int, year: Optional[str]):
+    """
+    Number of activities per type.
+    """
+    query = select(Activity.type, func.count()).group_by(Activity.type)
+    result = await session.exec(filter_by_year(filter_by_athlete(query, athlete_id), year))
+    return [{"name": activity_type, "value": count} for activity_type, count in result.all()]
+
+async def get_weekly_volume(session: AsyncSession, athlete_id: int, year: Optional[str]):
+    """
+    Distance in km per ISO week of the year, always 53 buckets like the weekly bar chart expects.
+
+    Reads the weekly rollups; a week belongs to the year its Thursday falls in.
+    """
+    query = select(WeeklyRollup.week_start, func.sum(WeeklyRollup.distance)).group_by(WeeklyRollup.week_start)
+    query = filter_by_athlete(query, athlete_id, WeeklyRollup.athlete_id)
+    # Shift by 3 days so the filter selects weeks by their Thursday (ISO year)
+    query = filter_days_by_year(query, WeeklyRollup.week_start + literal_column("3"), year)
+    result = await session.exec(query)
+
+    weekly = [{"name": f"W{i + 1}", "fullDate": "", "distance": 0.0} for i in range(53)]
+    for week_start, distance in result.all():
+        weekly[week_start.isocalendar()[1] - 1].update(
+            fullDate=week_start.isoformat(), distance=round(distance / 1000, 1)
+        )
+    return weekly
+
+async def get_cumulative(session: AsyncSession, athlete_id: int, year: Optional[str]):
+    """
+    Running totals of distance (km) and elevation (m), one point per active day.
+    """
+    daily = filter_days_by_year(
+        filter_by_athlete(
+            select(DailyRollup.day, func.sum(DailyRollup.distance).label("distance"),
+                   func.sum(DailyRollup.elevation).label("elevation")).group_by(DailyRollup.day),
+            athlete_id, DailyRollup.athlete_id,
+        ),
+        DailyRollup.day, year,
+    ).subquery()
+    query = select(
+        daily.c.day,
+        func.sum(daily.c.distance).over(order_by=daily.c.day),
+        func.sum(daily.c.elevation).over(order_by=daily.c.day),
+    ).order_by(daily.c.day)
+    result = await session.exec(query)
+    return [
+        {"date": day.isoformat(), "distance": round(distance / 1000, 1), "elevation": round(elevation)}
+        for day, distance, elevation in result.all()
+    ]
+
+async def get_heatmap(session: AsyncSession, athlete_id: int, year: Optional[str]):
+    """
+    Activity count per local date, as a {"YYYY-MM-DD": count} mapping.
+    """
+    query = select(DailyRollup.day, func.sum(DailyRollup.count)).group_by(DailyRollup.day)
+    query = filter_by_athlete(query, athlete_id, DailyRollup.athlete_id)
+    result = await session.exec(filter_days_by_year(query, DailyRollup.day, year))
+    return {day.isoformat(): int(count) for day, count in result.all()}
+
+async def get_time_of_day(session: AsyncSession, athlete_id: int, year: Optional[str]):
+    """
+    Activity count per time-of-day bucket, empty buckets omitted.
+    """
+    hour = func.extract("hour", Activity.start_date_local)
+    # Grouped by label: a repeated CASE with bound params would not match the SELECT
+    bucket = case(
+        (hour.between(5, 11), "morning"),
+        (hour.between(12, 16), "afternoon"),
+        (hour.between(17, 20), "evening"),
+        else_="night",
+    ).label("bucket")
+    query = select(bucket, func.count()).group_by("bucket")
+    result = await session.exec(filter_by_year(filter_by_athlete(query, athlete_id), year))
+    counts = dict(result.all())
+    return [{"name": label, "value": counts[key]} for key, label in TIME_OF_DAY if counts.get(key)]
+
+async def get_summary(session: AsyncSession, athlete_id: int, year: Optional[str]):
+    """
+    Headline totals for the personalized summary card.
+    """
+    query = select(
+        func.count(), func.sum(Activity.distance), func.max(Activity.distance),
+        func.sum(Activity.total_elevation_gain),
+    )
+    result = await session.exec(filter_by_year(filter_by_athlete(query, athlete_id), year))
+    count, distance, longest, elevation = result.one()
+
+    month = func.extract("month", Activity.start_date_local)
+    query = select(month).group_by(month).order_by(func.count().desc(), month).limit(1)
+    result = await session.exec(filter_by_year(filter_by_athlete(query, athlete_id), year))
+    favorite_month = result.first()
+
+    return {
+        "totalDistance": round((distance or 0) / 1000),
+        "totalActivities": count,
+        "longestRun": round((longest or 0) / 1000, 1),
+        "favoriteMonth": MONTHS[int(favorite_month) - 1] if favorite_month else None,
+        "totalElevation": round(elevation or 0),
+    }
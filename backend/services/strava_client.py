@@ -0,0 +1,41 @@
+import os
+import httpx
+
+from services.metrics import Gauge, registry
+from services.rate_limiter import RateLimiter
+
+DEFAULT_STRAVA_API_URL = "https://www.strava.com/api/v3"
+
+# Shared across the whole process: Strava quotas are per application, not per request
+rate_limiter = RateLimiter()
+
+registry.register(Gauge(
+    "strava_rate_limit_remaining", "Strava API requests left in each quota window.", ("window",),
+    callback=lambda: {(name,): window["remaining"] for name, window in rate_limiter.budget().items()},
+))
+
+_client = None
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared connection-pooled client, creating it on first use.
+
+    STRAVA_API_URL can point the client at a local mock Strava server.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=os.getenv("STRAVA_API_URL", DEFAULT_STRAVA_API_URL),
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        )
+    return _client
+
+async def close_client():
+    """
+    Close the shared client and its pooled connections.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
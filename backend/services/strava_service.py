@@ -1,19 +1,57 @@
-import httpx
-import os
-from dotenv import load_dotenv
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, Optional
 
-from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from models import Activity
-from datetime import datetime
+from services.activity_upsert import parse_activity, upsert_activities
+from services.columnar_export import export_changed_years
+from services.coverage_store import refresh_coverage
+from services.geometry_store import upsert_geometries, without_track
+from services.metrics import strava_latency, strava_requests, sync_duration, sync_rate, synced_activities, synced_pages
+from services.response_cache import expire_data_version
+from services.route_frequency import update_route_frequency
+from services.rollups import get_touched_days, refresh_rollups
+from services.strava_client import get_client, rate_limiter
+from services.sync_state import get_sync_state, get_start_point, mark_page_committed, finish_sync
 
-load_dotenv()
+PER_PAGE = 200
+# Pages buffered between the fetcher and the DB writer, bounds memory during a sync
+QUEUE_SIZE = 2
+MAX_RETRIES = 3
+# Syncs and webhook batches take turns writing: a webhook can touch the days or records of an athlete being synced
+write_lock = asyncio.Lock()
 
-STRAVA_API_URL = "https://www.strava.com/api/v3"
+def record_call(endpoint: str, status: int, elapsed: float):
+    # Ids are folded out of the label, /activities/123/streams -> /activities/{id}/streams
+    endpoint = re.sub(r"/\d+", "/{id}", endpoint)
+    strava_requests.inc(endpoint=endpoint, status=status)
+    strava_latency.observe(elapsed, endpoint=endpoint)
+
+def record_sync(athlete_id: int, counts: dict, pages: int, elapsed: float):
+    sync_duration.observe(elapsed)
+    sync_rate.set(counts["fetched"] / elapsed, unit="activities")
+    sync_rate.set(pages / elapsed, unit="pages")
+    print(f"Synced athlete {athlete_id}: {counts['fetched']} activities, {pages} pages in {elapsed:.1f}s "
+          f"({counts['fetched'] / elapsed:.1f} activities/s, {counts['inserted']} new, {counts['updated']} updated)")
+
+async def export_analytics(session: AsyncSession):
+    """
+    Refresh the Parquet export of changed years; the sync itself already succeeded.
+    """
+    try:
+        years = await export_changed_years(session)
+        if years:
+            print(f"Exported analytics for {', '.join(map(str, years))}")
+    except Exception as e:
+        print(f"Analytics export failed: {e}")
 
 async def get_strava_data(access_token: str, endpoint: str = "/athlete/activities", params: dict = None):
     """
     Retrieve data from Strava API.
+
+    Requests go through the shared pooled client and wait on the rate limiter;
+    a 429 is retried after the quota window resets instead of failing.
     
     Args:
         access_token (str): Strava access token.
@@ -24,81 +62,118 @@ async def get_strava_data(access_token: str, endpoint: str = "/athlete/activitie
         dict: JSON response from Strava API.
     """
     headers = {"Authorization": f"Bearer {access_token}"}
-    url = f"{STRAVA_API_URL}{endpoint}"
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
 
-async def sync_activities(session: AsyncSession, access_token: str):
+    for attempt in range(MAX_RETRIES + 1):
+        await rate_limiter.acquire()
+        start = time.perf_counter()
+        response = await get_client().get(endpoint, headers=headers, params=params)
+        record_call(endpoint, response.status_code, time.perf_counter() - start)
+        rate_limiter.update(response.headers)
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            break
+        # Quota exhausted despite our accounting: back off until the next window
+        rate_limiter.exhaust()
+
+    response.raise_for_status()
+    return response.json()
+
+async def fetch_pages(access_token: str, params: dict, first_page: int, queue: asyncio.Queue):
     """
-    Fetch all activities from Strava and upsert them into the database.
+    Producer: fetch activity pages from Strava and put (page, data) on the queue.
+
+    A None item marks the end of the history; an exception is forwarded to the
+    consumer instead of being lost in the background task.
     """
-    # Fetch all activities (loop with pagination)
-    all_activities_data = []
-    page = 1
-    per_page = 200
-    params = {"per_page": per_page}
-
-    while True:
-        params["page"] = page
-        data = await get_strava_data(access_token, params=params)
-        if not data:
-            break
-        all_activities_data.extend(data)
-        if len(data) < per_page:
-            break
-        page += 1
-    
-    # Process and upsert
-    for activity_data in all_activities_data:
-        # Check if exists
-        activity_id = activity_data.get("id")
-        statement = select(Activity).where(Activity.id == activity_id)
-        result = await session.exec(statement)
-        existing_activity = result.first()
-        
-        # Prepare data dict (filter keys that match our model)
-        # Note: We need to handle map separately because it's a nested object in Strava response
-        map_data = activity_data.get("map", {})
-        
-        # Parse dates
-        start_date = datetime.strptime(activity_data.get("start_date"), "%Y-%m-%dT%H:%M:%SZ")
-        start_date_local = datetime.strptime(activity_data.get("start_date_local"), "%Y-%m-%dT%H:%M:%SZ")
-
-        activity_obj = Activity(
-            id=activity_id,
-            name=activity_data.get("name"),
-            distance=activity_data.get("distance"),
-            moving_time=activity_data.get("moving_time"),
-            elapsed_time=activity_data.get("elapsed_time"),
-            total_elevation_gain=activity_data.get("total_elevation_gain"),
-            type=activity_data.get("type"),
-            sport_type=activity_data.get("sport_type"),
-            start_date=start_date,
-            start_date_local=start_date_local,
-            timezone=activity_data.get("timezone"),
-            utc_offset=activity_data.get("utc_offset"),
-            map_polyline=map_data.get("polyline"),
-            map_summary_polyline=map_data.get("summary_polyline"),
-            average_speed=activity_data.get("average_speed"),
-            max_speed=activity_data.get("max_speed"),
-            average_heartrate=activity_data.get("average_heartrate"),
-            max_heartrate=activity_data.get("max_heartrate"),
-            elev_high=activity_data.get("elev_high"),
-            elev_low=activity_data.get("elev_low")
-        )
-
-        if existing_activity:
-            # Update existing
-            for key, value in activity_obj.dict(exclude_unset=True).items():
-                setattr(existing_activity, key, value)
-            session.add(existing_activity)
-        else:
-            # Create new
-            session.add(activity_obj)
-    
-    await session.commit()
-    return len(all_activities_data)
+    page = first_page
+    try:
+        while True:
+            data = await get_strava_data(access_token, params={**params, "page": page})
+            if not data:
+                break
+            await queue.put((page, data))
+            if len(data) < params["per_page"]:
+                break
+            page += 1
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(None)
+
+async def write_page(session: AsyncSession, data: list) -> dict:
+    """
+    Upsert one page of Strava activities, refresh the rollups for the days it
+    touched and store the decoded route geometries.
+
+    The summary polyline text is not stored with the activity once its track
+    is, so a route that changed on its own is only seen by the geometry
+    upsert; it is counted under "routes".
+    """
+    rows = [parse_activity(activity_data) for activity_data in data]
+    touched_days = await get_touched_days(session, rows)
+    counts = await upsert_activities(session, [without_track(row) for row in rows])
+    if counts["inserted"] or counts["updated"]:
+        await refresh_rollups(session, touched_days)
+    counts["routes"] = await upsert_geometries(session, rows)
+    return counts
+
+async def sync_activities(
+    session: AsyncSession, access_token: str, full: bool = False,
+    progress: Optional[Callable[[int, dict], Awaitable]] = None,
+):
+    """
+    Fetch activities from Strava and upsert them into the database.
+
+    Pages are fetched in the background while the previous page is written,
+    and each page is committed as it arrives. Only activities newer than the
+    stored high-water mark are fetched unless `full` is set, and a run that
+    failed part way resumes from its last committed page. Writes hold
+    `write_lock` so several athletes can sync concurrently. `progress`, if
+    given, is awaited with the page number and running counts after each commit.
+
+    Returns:
+        dict: Counts of fetched, inserted, updated and unchanged activities,
+        and of routes stored or removed.
+    """
+    athlete = await get_strava_data(access_token, endpoint="/athlete")
+    state = await get_sync_state(session, athlete.get("id"))
+    after, first_page = get_start_point(state, full)
+
+    params = {"per_page": PER_PAGE}
+    if after is not None:
+        params["after"] = after
+
+    counts = {"fetched": 0, "inserted": 0, "updated": 0, "unchanged": 0, "routes": 0}
+    pages, start = 0, time.perf_counter()
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    producer = asyncio.create_task(fetch_pages(access_token, params, first_page, queue))
+    try:
+        while (item := await queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            page, data = item
+            async with write_lock:
+                page_counts = await write_page(session, data)
+                changed = any(page_counts[key] for key in ("inserted", "updated", "routes"))
+                mark_page_committed(state, after, page, changed=changed)
+                session.add(state)
+                await session.commit()
+            expire_data_version()
+            for key, value in page_counts.items():
+                counts[key] += value
+            counts["fetched"] += len(data)
+            pages += 1
+            synced_pages.inc()
+            synced_activities.inc(len(data))
+            if progress:
+                await progress(page, counts)
+    finally:
+        producer.cancel()
 
+    async with write_lock:
+        await finish_sync(session, state)
+        await update_route_frequency(session, state.athlete_id)
+        await session.commit()
+    record_sync(state.athlete_id, counts, pages, time.perf_counter() - start)
+    await export_analytics(session)
+    await refresh_coverage(session, [state.athlete_id])
+    return counts
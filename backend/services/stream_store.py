@@ -0,0 +1,87 @@
+import asyncio
+from typing import Optional
+
+import httpx
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, ActivityStream
+from services.records import update_best_efforts
+from services.response_cache import expire_data_version
+from services.strava_service import get_strava_data, write_lock
+from services.streams import STREAM_TYPES, build_stream_row, unpack_stream
+from services.sync_state import mark_data_changed
+
+# Stream requests in flight at once; each one still waits on the shared rate limiter
+STREAM_CONCURRENCY = 4
+# Activities fetched and committed together
+STREAM_BATCH = 20
+
+async def fetch_streams(access_token: str, activity_id: int) -> dict:
+    """
+    Fetch the per-second streams of one activity and pack them into a stored row.
+    """
+    params = {"keys": ",".join(STREAM_TYPES), "key_by_type": "true"}
+    try:
+        streams = await get_strava_data(access_token, endpoint=f"/activities/{activity_id}/streams", params=params)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 404:
+            raise
+        streams = None
+    return build_stream_row(activity_id, streams if isinstance(streams, dict) else None)
+
+async def upsert_streams(session: AsyncSession, rows: list):
+    table = ActivityStream.__table__
+    stmt = pg_insert(table).values(rows)
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["activity_id"],
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name != "activity_id"},
+    ))
+
+async def sync_streams(session: AsyncSession, access_token: str, athlete_id: int, limit: Optional[int] = None) -> int:
+    """
+    Fetch streams for the athlete's activities that have none stored yet, most recent first.
+
+    Requests run with bounded concurrency and each batch is committed as it
+    completes, with its best efforts, so an interrupted run picks up where it stopped.
+
+    Returns:
+        int: Number of activities whose streams were stored.
+    """
+    query = (
+        select(Activity.id)
+        .outerjoin(ActivityStream, ActivityStream.activity_id == Activity.id)
+        .where(ActivityStream.activity_id.is_(None), Activity.athlete_id == athlete_id)
+        .order_by(Activity.start_date.desc())
+        .limit(limit)
+    )
+    pending = (await session.exec(query)).all()
+    semaphore = asyncio.Semaphore(STREAM_CONCURRENCY)
+
+    async def fetch(activity_id: int) -> dict:
+        async with semaphore:
+            return await fetch_streams(access_token, activity_id)
+
+    for start in range(0, len(pending), STREAM_BATCH):
+        rows = await asyncio.gather(*(fetch(activity_id) for activity_id in pending[start:start + STREAM_BATCH]))
+        async with write_lock:
+            await upsert_streams(session, list(rows))
+            await update_best_efforts(session, [row["activity_id"] for row in rows])
+            await mark_data_changed(session, [athlete_id])
+            await session.commit()
+        expire_data_version()
+    return len(pending)
+
+async def load_streams(session: AsyncSession, activity_id: int, names: Optional[list] = None) -> Optional[dict]:
+    """
+    Stored streams of an activity as NumPy arrays keyed by stream name, see unpack_stream.
+
+    Only the requested columns are read. Returns None when the streams were never fetched.
+    """
+    names = [name for name in (names or STREAM_TYPES) if name in STREAM_TYPES]
+    columns = [getattr(ActivityStream, name) for name in names]
+    query = select(ActivityStream.sample_count, *columns).where(ActivityStream.activity_id == activity_id)
+    row = (await session.exec(query)).first()
+    if row is None:
+        return None
+    return {name: unpack_stream(name, blob) for name, blob in zip(names, row[1:]) if blob is not None}
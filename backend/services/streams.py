@@ -0,0 +1,73 @@
+import zlib
+from typing import Optional
+
+import numpy as np
+from services.geometry import SCALE
+
+# Stored streams: packed dtype of the deltas, scale to integers, whether the loader returns floats.
+# Samples are quantized (latlng to 1e-5 degrees like the route geometry, distance and altitude to decimeters,
+# speed to cm/s) so consecutive deltas are small and compress well.
+STREAM_TYPES = {
+    "time": ("<i4", 1, False),
+    "latlng": ("<i4", SCALE, False),
+    "distance": ("<i4", 10, True),
+    "altitude": ("<i4", 10, True),
+    "heartrate": ("<i2", 1, False),
+    "velocity_smooth": ("<i2", 100, True),
+    "cadence": ("<i2", 1, False),
+}
+COMPRESSION_LEVEL = 6
+
+def pack_stream(name: str, values: list) -> bytes:
+    """
+    Quantize one Strava stream and store it as compressed deltas from the previous sample.
+
+    Missing samples (null in the Strava payload) are stored as the smallest
+    value of the dtype, a delta no real sample gets, and leave the running
+    value unchanged; unpack_stream turns them back into NaN.
+    """
+    dtype, scale, _ = STREAM_TYPES[name]
+    gap = [np.nan, np.nan] if name == "latlng" else np.nan
+    samples = np.array([gap if value is None else value for value in values], dtype=np.float64)
+    missing = np.isnan(samples).any(axis=1) if samples.ndim == 2 else np.isnan(samples)
+    quantized = np.rint(np.nan_to_num(samples) * scale).astype(np.int64)
+    # Gaps repeat the last real sample, so they add no delta of their own
+    quantized = quantized[np.maximum.accumulate(np.where(missing, 0, np.arange(len(samples))))]
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros_like(quantized[:1]))
+    deltas = np.maximum(deltas, np.iinfo(dtype).min + 1)
+    deltas[missing] = np.iinfo(dtype).min
+    return zlib.compress(deltas.astype(dtype).tobytes(), COMPRESSION_LEVEL)
+
+def unpack_stream(name: str, blob: bytes) -> np.ndarray:
+    """
+    Inverse of pack_stream: int32 samples, or float64 in meters and m/s for altitude and speed.
+
+    latlng comes back as an (n, 2) array in 1e-5 degrees, like unpack_deltas.
+    A stream with missing samples comes back as float64 with NaN in their place.
+    """
+    dtype, scale, as_float = STREAM_TYPES[name]
+    deltas = np.frombuffer(zlib.decompress(blob), dtype=dtype)
+    if name == "latlng":
+        deltas = deltas.reshape(-1, 2)
+    missing = deltas == np.iinfo(dtype).min
+    values = np.cumsum(np.where(missing, 0, deltas), axis=0, dtype=np.int32)
+    if not missing.any():
+        return values / scale if as_float else values
+    values = values / scale if as_float else values.astype(np.float64)
+    values[missing] = np.nan
+    return values
+
+def build_stream_row(activity_id: int, streams: Optional[dict]) -> dict:
+    """
+    Stored ActivityStream row from a `key_by_type` streams response.
+
+    Activities without streams (manual entries) still get a row with no samples,
+    so they are not fetched again on the next sync.
+    """
+    row = {"activity_id": activity_id, "sample_count": 0, **{name: None for name in STREAM_TYPES}}
+    for name, stream in (streams or {}).items():
+        data = stream.get("data") if isinstance(stream, dict) else None
+        if name in STREAM_TYPES and data:
+            row[name] = pack_stream(name, data)
+            row["sample_count"] = max(row["sample_count"], len(data))
+    return row
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from services.sync_jobs import FINISHED, get_job, live_entry
+
+# Idle event streams send a comment this often so proxies keep them open
+KEEPALIVE = 15
+# Jobs running on another replica are followed by re-reading their row
+POLL_INTERVAL = 2
+
+async def poll_job(job_id: int):
+    """
+    Server-sent events of a job this process is not running, from its row
+    every POLL_INTERVAL seconds, whenever its status or page count moved.
+    """
+    seen = None
+    while True:
+        snapshot = await get_job(job_id)
+        progress = snapshot and (snapshot["status"], snapshot["pages"])
+        if progress != seen:
+            yield f"data: {json.dumps(snapshot, default=str)}\n\n"
+            seen = progress
+        if snapshot is None or snapshot["status"] in FINISHED:
+            return
+        await asyncio.sleep(POLL_INTERVAL)
+
+async def job_events(job_id: int):
+    """
+    Server-sent events with the job's state after every committed page, until it finishes.
+    """
+    entry = live_entry(job_id)
+    if entry is None:
+        async for event in poll_job(job_id):
+            yield event
+        return
+    while True:
+        changed = entry["changed"]
+        snapshot = entry["job"]
+        yield f"data: {json.dumps(snapshot, default=str)}\n\n"
+        if snapshot["status"] in FINISHED:
+            return
+        while not changed.is_set():
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
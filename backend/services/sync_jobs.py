@@ -0,0 +1,171 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import async_session
+from models import Athlete, SyncJob
+from services.sync_scheduler import sync_athlete
+
+ACTIVE = ("queued", "running")
+FINISHED = ("succeeded", "failed")
+# A running job touches its heartbeat this often; one silent for STALE_AFTER seconds lost its process
+HEARTBEAT_INTERVAL = float(os.getenv("SYNC_JOB_HEARTBEAT", "30"))
+STALE_AFTER = float(os.getenv("SYNC_JOB_STALE_AFTER", "120"))
+# Recorded on the jobs this process runs
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+# Jobs of this process that are not finished yet
+_live = {}  # job_id -> {"job": snapshot dict, "changed": asyncio.Event set on every update}
+_tasks = set()
+
+def job_snapshot(job: SyncJob) -> dict:
+    snapshot = job.dict()
+    end = job.finished_at or datetime.utcnow()
+    snapshot["duration"] = (end - job.started_at).total_seconds() if job.started_at else None
+    return snapshot
+
+async def save_job(session: AsyncSession, job: SyncJob):
+    """
+    Commit a job row with a fresh heartbeat and wake everyone following its progress.
+    """
+    job.heartbeat_at = datetime.utcnow()
+    session.add(job)
+    await session.commit()
+    entry = _live.get(job.id)
+    if entry:
+        entry["job"] = job_snapshot(job)
+        changed, entry["changed"] = entry["changed"], asyncio.Event()
+        changed.set()
+
+async def beat(job_id: int):
+    """
+    Touch a job's heartbeat every HEARTBEAT_INTERVAL seconds until cancelled,
+    also while a page waits on the rate limiter.
+    """
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    update(SyncJob).where(SyncJob.id == job_id, SyncJob.owner == OWNER)
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                await session.commit()
+        except Exception as e:
+            print(f"Heartbeat of sync job {job_id} failed: {e}")
+
+async def sync_job(job_id: int):
+    async with async_session() as session:
+        job = await session.get(SyncJob, job_id)
+        job.status, job.started_at = "running", datetime.utcnow()
+        await save_job(session, job)
+
+        async def progress(page: int, counts: dict):
+            job.pages += 1
+            job.fetched, job.inserted = counts["fetched"], counts["inserted"]
+            job.updated, job.unchanged = counts["updated"], counts["unchanged"]
+            await save_job(session, job)
+
+        try:
+            counts = await sync_athlete(job.athlete_id, full=job.full, streams=job.streams, progress=progress)
+            job.streams_stored = counts.get("streams")
+            job.status = "succeeded"
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+        job.finished_at = datetime.utcnow()
+        await save_job(session, job)
+
+async def run_job(job_id: int):
+    heartbeat = asyncio.create_task(beat(job_id))
+    try:
+        await sync_job(job_id)
+    finally:
+        heartbeat.cancel()
+        _live.pop(job_id, None)
+
+async def fail_stale_jobs(session: AsyncSession, athlete_id: Optional[int] = None):
+    """
+    Fail unfinished jobs whose heartbeat stopped, of one athlete or all of
+    them: the process running them is gone. Not committed here.
+    """
+    now = datetime.utcnow()
+    query = update(SyncJob).where(
+        SyncJob.status.in_(ACTIVE),
+        func.coalesce(SyncJob.heartbeat_at, SyncJob.created_at) < now - timedelta(seconds=STALE_AFTER),
+    )
+    if athlete_id is not None:
+        query = query.where(SyncJob.athlete_id == athlete_id)
+    await session.execute(query.values(status="failed", error="Interrupted: its process stopped", finished_at=now))
+
+async def claim_job(session: AsyncSession, athlete_id: int, full: bool, streams: bool) -> Optional[int]:
+    """
+    Insert a queued job owned by this process, or nothing when the athlete
+    already has an unfinished one (the partial unique index on SyncJob).
+
+    Returns:
+        int: The new job id, None when another job is unfinished.
+    """
+    job = SyncJob(athlete_id=athlete_id, full=full, streams=streams, owner=OWNER, heartbeat_at=datetime.utcnow())
+    stmt = pg_insert(SyncJob).values(**job.dict(exclude={"id"})).on_conflict_do_nothing().returning(SyncJob.id)
+    job_id = (await session.execute(stmt)).scalar()
+    await session.commit()
+    return job_id
+
+async def start_job(athlete_id: int, full: bool = False, streams: bool = False) -> dict:
+    """
+    Start syncing an athlete in the background. A request for an athlete
+    with an unfinished job, started by this replica or another, joins that
+    job instead of starting another.
+
+    Raises:
+        LookupError: The athlete is not connected.
+    """
+    async with async_session() as session:
+        if not await session.get(Athlete, athlete_id):
+            raise LookupError(f"Unknown athlete: {athlete_id}")
+        await fail_stale_jobs(session, athlete_id)
+        # The unfinished job may finish between the insert and the lookup, then try again
+        while (job_id := await claim_job(session, athlete_id, full, streams)) is None:
+            query = select(SyncJob).where(SyncJob.athlete_id == athlete_id, SyncJob.status.in_(ACTIVE))
+            running = (await session.exec(query)).first()
+            if running:
+                return _live[running.id]["job"] if running.id in _live else job_snapshot(running)
+        snapshot = job_snapshot(await session.get(SyncJob, job_id))
+    _live[job_id] = {"job": snapshot, "changed": asyncio.Event()}
+    task = asyncio.create_task(run_job(job_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return snapshot
+
+async def start_all_jobs(full: bool = False, streams: bool = False) -> list:
+    async with async_session() as session:
+        athlete_ids = (await session.exec(select(Athlete.id))).all()
+    return [await start_job(athlete_id, full=full, streams=streams) for athlete_id in athlete_ids]
+
+def live_entry(job_id: int) -> Optional[dict]:
+    """
+    The snapshot and change event of a job this process is running, None otherwise.
+    """
+    return _live.get(job_id)
+
+async def get_job(job_id: int) -> Optional[dict]:
+    if job_id in _live:
+        return _live[job_id]["job"]
+    async with async_session() as session:
+        job = await session.get(SyncJob, job_id)
+        return job_snapshot(job) if job else None
+
+async def fail_interrupted_jobs():
+    """
+    At startup, fail the jobs a stopped process left unfinished. Jobs other
+    replicas are running keep beating and are left alone.
+    """
+    async with async_session() as session:
+        await fail_stale_jobs(session)
+        await session.commit()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from sqlalchemy import text
+from sqlmodel import select
+from database import async_session, get_engine
+from models import Athlete
+from services.strava_service import sync_activities
+from services.stream_store import sync_streams
+from services.token_store import get_access_token
+
+# Athletes synced at the same time; all of them share the app-wide Strava rate limiter
+SYNC_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", "4"))
+# Syncs of one athlete at the same time, more would race on its sync state
+PER_ATHLETE_CONCURRENCY = 1
+# Postgres advisory lock namespace of athlete syncs (schema.py uses 72_024 for migrations)
+SYNC_LOCK_KEY = 72_025
+# Seconds between background runs over all athletes, 0 disables the scheduler
+SYNC_INTERVAL = int(os.getenv("SYNC_INTERVAL", "0"))
+
+_global_slots = asyncio.Semaphore(SYNC_CONCURRENCY)
+_athlete_slots = defaultdict(lambda: asyncio.Semaphore(PER_ATHLETE_CONCURRENCY))
+_scheduler = {"task": None}
+
+@asynccontextmanager
+async def athlete_lock(athlete_id: int):
+    """
+    Hold a per-athlete Postgres advisory lock on a connection of its own. The
+    semaphores only order syncs within this process; the lock also makes
+    other replicas and scripts/sync_db.py wait for a sync of the same athlete.
+    """
+    params = {"key": SYNC_LOCK_KEY, "athlete": str(athlete_id)}
+    async with get_engine().connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("SELECT pg_advisory_lock(:key, hashtext(:athlete))"), params)
+        try:
+            yield
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key, hashtext(:athlete))"), params)
+
+async def sync_athlete(athlete_id: int, full: bool = False, streams: bool = False, progress=None) -> dict:
+    """
+    Sync one athlete in its own session, refreshing its token first if needed.
+    `progress` is passed on to sync_activities.
+
+    Raises:
+        LookupError: The athlete is not connected.
+    """
+    async with _athlete_slots[athlete_id], _global_slots, athlete_lock(athlete_id):
+        async with async_session() as session:
+            athlete = await session.get(Athlete, athlete_id)
+            if not athlete:
+                raise LookupError(f"Unknown athlete: {athlete_id}")
+            token = await get_access_token(session, athlete)
+            counts = await sync_activities(session, token, full=full, progress=progress)
+            if streams:
+                counts["streams"] = await sync_streams(session, token, athlete_id)
+            return counts
+
+async def sync_all(full: bool = False, streams: bool = False) -> dict:
+    """
+    Sync every connected athlete concurrently, within the concurrency limits.
+
+    Returns:
+        dict: Counts per athlete id, or {"error": message} for a failed sync.
+    """
+    async with async_session() as session:
+        athlete_ids = (await session.exec(select(Athlete.id))).all()
+    results = await asyncio.gather(
+        *(sync_athlete(athlete_id, full=full, streams=streams) for athlete_id in athlete_ids),
+        return_exceptions=True,
+    )
+    return {
+        athlete_id: {"error": str(result)} if isinstance(result, Exception) else result
+        for athlete_id, result in zip(athlete_ids, results)
+    }
+
+async def run_scheduler(interval: int):
+    while True:
+        for athlete_id, result in (await sync_all(streams=True)).items():
+            if "error" in result:
+                print(f"Scheduled sync of athlete {athlete_id} failed: {result['error']}")
+        await asyncio.sleep(interval)
+
+def start_scheduler(interval: Optional[int] = None):
+    """
+    Start syncing all athletes in the background every `interval` seconds (SYNC_INTERVAL by default).
+    """
+    interval = SYNC_INTERVAL if interval is None else interval
+    if interval > 0 and _scheduler["task"] is None:
+        _scheduler["task"] = asyncio.create_task(run_scheduler(interval))
+
+async def stop_scheduler():
+    task, _scheduler["task"] = _scheduler["task"], None
+    if task:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
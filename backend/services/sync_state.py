@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, SyncState
+
+async def get_sync_state(session: AsyncSession, athlete_id: int) -> SyncState:
+    """
+    Return the sync state row for an athlete, creating it in the session if missing.
+    """
+    state = await session.get(SyncState, athlete_id)
+    if not state:
+        state = SyncState(athlete_id=athlete_id)
+        session.add(state)
+    return state
+
+def get_start_point(state: SyncState, full: bool = False):
+    """
+    Decide where a sync starts.
+
+    An interrupted run is resumed from the page after its last committed one,
+    unless a full sync is requested and the interrupted run was incremental.
+
+    Returns:
+        tuple: (`after` epoch timestamp or None, first page number).
+    """
+    if state.resume_page is not None and (not full or state.resume_after is None):
+        return state.resume_after, state.resume_page + 1
+    if full or not state.last_start_date:
+        return None, 1
+    return int(state.last_start_date.replace(tzinfo=timezone.utc).timestamp()), 1
+
+def mark_page_committed(state: SyncState, after, page: int, changed: bool = True):
+    """
+    Remember the last page written so the run can be resumed after a failure,
+    and bump the data version if the page inserted or updated anything.
+    """
+    state.resume_after = after
+    state.resume_page = page
+    if changed:
+        state.data_updated_at = datetime.utcnow()
+
+async def finish_sync(session: AsyncSession, state: SyncState):
+    """
+    Clear the resume point and move the high-water mark to the athlete's newest stored activity.
+    """
+    result = await session.exec(select(func.max(Activity.start_date)).where(Activity.athlete_id == state.athlete_id))
+    state.last_start_date = result.one()
+    state.last_synced_at = datetime.utcnow()
+    state.resume_after = None
+    state.resume_page = None
+    session.add(state)
+
+async def mark_data_changed(session: AsyncSession, athlete_ids):
+    """
+    Bump the data version of these athletes outside of an activity sync, e.g.
+    after storing their streams; other athletes keep their cached responses.
+    """
+    now = datetime.utcnow()
+    for athlete_id in athlete_ids:
+        state = await get_sync_state(session, athlete_id)
+        state.data_updated_at = now
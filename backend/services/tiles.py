@@ -0,0 +1,175 @@
+import math
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, ActivityGeometry, GeometryLevel
+from services.geometry import SCALE, unpack_deltas
+from services.mvt import EXTENT, encode_layer
+from services.query_filters import get_year_range, resolve_year
+from services.response_cache import get_data_version
+from services.response_store import ResponseCache
+from services.simplify import level_for_zoom
+
+# Tile edges are padded so lines crossing them render without seams
+BUFFER = 64
+
+# Rendered tiles, keyed by (z, x, y, athlete_id, year, sport_type); evicted selectively when routes change
+tile_cache = ResponseCache(max_entries=4096, max_bytes=128 * 1024 * 1024)
+
+_index = {"version": None, "ids": np.zeros(0, dtype=np.int64)}
+
+def tile_bounds(z: int, x: int, y: int, buffer: float = 0):
+    """
+    (min_lat, min_lng, max_lat, max_lng) of a web-mercator tile in degrees, optionally buffered.
+    """
+    n = 2 ** z
+    pad = buffer / EXTENT
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lat(y + 1 + pad), (x - pad) / n * 360 - 180, lat(y - pad), (x + 1 + pad) / n * 360 - 180
+
+def intersects(bboxes: np.ndarray, bounds) -> np.ndarray:
+    min_lat, min_lng, max_lat, max_lng = bounds
+    return (
+        (bboxes[:, 0] <= max_lat) & (bboxes[:, 2] >= min_lat)
+        & (bboxes[:, 1] <= max_lng) & (bboxes[:, 3] >= min_lng)
+    )
+
+async def load_index(session: AsyncSession) -> dict:
+    """
+    Bounding boxes and filter columns of every stored route, sorted by athlete
+    then local start date so a tile only scans the athlete's (and year's) slice.
+    An md5 of the stored deltas, computed by Postgres, tells edited tracks apart.
+    """
+    athlete = func.coalesce(Activity.athlete_id, 0)
+    query = select(
+        ActivityGeometry.activity_id, ActivityGeometry.min_lat, ActivityGeometry.min_lng,
+        ActivityGeometry.max_lat, ActivityGeometry.max_lng, Activity.start_date_local, Activity.sport_type,
+        ActivityGeometry.point_count, athlete, func.md5(ActivityGeometry.deltas),
+    ).join(Activity, Activity.id == ActivityGeometry.activity_id).order_by(athlete, Activity.start_date_local)
+    rows = (await session.exec(query)).all()
+    return {
+        "ids": np.array([row[0] for row in rows], dtype=np.int64),
+        "bboxes": np.array([row[1:5] for row in rows], dtype=np.float64).reshape(-1, 4) / SCALE,
+        "years": np.array([row[5].year for row in rows], dtype=np.int32),
+        "sport_types": np.array([row[6] for row in rows], dtype=object),
+        "point_counts": np.array([row[7] for row in rows], dtype=np.int64),
+        "athletes": np.array([row[8] for row in rows], dtype=np.int64),
+        "fingerprints": np.array([row[9] for row in rows], dtype=object),
+    }
+
+def tile_inputs(index: dict) -> dict:
+    """
+    activity id -> (bbox, point count, year, sport type, athlete, deltas md5),
+    everything a cached tile depends on.
+    """
+    if "bboxes" not in index:
+        return {}
+    names = ("bboxes", "point_counts", "years", "sport_types", "athletes", "fingerprints")
+    columns = [index[name].tolist() for name in names]
+    return {key: (tuple(box), *rest) for key, box, *rest in zip(index["ids"].tolist(), *columns)}
+
+def evict_changed_tiles(old: dict, new: dict):
+    """
+    Drop cached tiles that showed, or now show, a route which was added,
+    removed or changed: its track (deltas, point count and bbox), year, sport type or athlete.
+    Both the old and the new bbox of a changed route are evicted.
+    """
+    old_inputs, new_inputs = tile_inputs(old), tile_inputs(new)
+    changed = [inputs[0] for key, inputs in new_inputs.items() if old_inputs.get(key) != inputs]
+    changed += [inputs[0] for key, inputs in old_inputs.items() if new_inputs.get(key) != inputs]
+    if not changed:
+        return
+    changed = np.array(changed)
+    for key in list(tile_cache.entries):
+        if intersects(changed, tile_bounds(*key[:3], BUFFER)).any():
+            tile_cache.discard(key)
+
+async def get_index(session: AsyncSession) -> dict:
+    """
+    The in-memory bounding-box index of all routes, reloaded when the data version changes.
+    """
+    version = await get_data_version(session)
+    if _index["version"] != version or "bboxes" not in _index:
+        new = await load_index(session)
+        evict_changed_tiles(_index, new)
+        _index.clear()
+        _index.update(new, version=version)
+    return _index
+
+def athlete_rows(index: dict, athlete_id: int, year: Optional[int]) -> slice:
+    """
+    Index positions of an athlete's routes, of one year if given; both are
+    binary searches since the index is sorted by athlete then date.
+    """
+    athletes = index["athletes"]
+    start, end = np.searchsorted(athletes, athlete_id, "left"), np.searchsorted(athletes, athlete_id, "right")
+    if year is not None:
+        years = index["years"][start:end]
+        start, end = start + np.searchsorted(years, year, "left"), start + np.searchsorted(years, year, "right")
+    return slice(int(start), int(end))
+
+def clip_to_tile(points: np.ndarray) -> list:
+    """
+    Split a track in tile coordinates into the runs inside the buffered tile,
+    keeping one point on each side so lines reach past the edge.
+    """
+    inside = ((points >= -BUFFER) & (points <= EXTENT + BUFFER)).all(axis=1)
+    keep = inside.copy()
+    keep[1:] |= inside[:-1]
+    keep[:-1] |= inside[1:]
+    breaks = np.flatnonzero(np.diff(keep.astype(np.int8))) + 1
+    parts = [part for part, flag in zip(np.split(points, breaks), np.split(keep, breaks)) if flag[0]]
+    # Rounding to the tile grid merges nearby points, drop the repeats
+    parts = [part[np.r_[True, (np.diff(part, axis=0) != 0).any(axis=1)]] for part in parts]
+    return [part for part in parts if len(part) >= 2]
+
+def to_tile_coords(points: np.ndarray, z: int, x: int, y: int) -> np.ndarray:
+    lat = np.radians(points[:, 0] / SCALE)
+    lng = points[:, 1] / SCALE
+    n = 2 ** z
+    px = ((lng + 180) / 360 * n - x) * EXTENT
+    py = ((1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / math.pi) / 2 * n - y) * EXTENT
+    return np.round(np.stack([px, py], axis=1)).astype(np.int64)
+
+async def render_tile(
+    session: AsyncSession, z: int, x: int, y: int, athlete_id: int, year: Optional[str], sport_type: Optional[str],
+) -> bytes:
+    """
+    Encode an athlete's routes crossing a tile as an MVT "routes" layer, served from the tile cache when possible.
+    """
+    index = await get_index(session)
+    key = (z, x, y, athlete_id, resolve_year(year), sport_type)
+    body = tile_cache.get(key)
+    if body is not None:
+        return body
+
+    year_range = get_year_range(year)
+    rows = athlete_rows(index, athlete_id, year_range[0].year if year_range else None)
+    mask = intersects(index["bboxes"][rows], tile_bounds(z, x, y, BUFFER))
+    if sport_type:
+        mask &= index["sport_types"][rows] == sport_type
+    ids = index["ids"][rows][mask].tolist()
+
+    features = []
+    if ids:
+        level = level_for_zoom(z)
+        track = ActivityGeometry if level == 0 else GeometryLevel
+        query = select(track.activity_id, track.deltas, Activity.sport_type).join(
+            Activity, Activity.id == track.activity_id
+        ).where(track.activity_id.in_(ids))
+        if level:
+            query = query.where(GeometryLevel.level == level)
+        for activity_id, deltas, activity_sport in (await session.exec(query)).all():
+            parts = clip_to_tile(to_tile_coords(unpack_deltas(deltas), z, x, y))
+            if parts:
+                features.append((activity_id, {"sport_type": activity_sport}, parts))
+
+    body = encode_layer("routes", features)
+    tile_cache.put(key, body)
+    return body
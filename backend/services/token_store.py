@@ -0,0 +1,107 @@
+import asyncio
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Athlete
+from services.strava_client import get_client
+
+DEFAULT_STRAVA_OAUTH_URL = "https://www.strava.com/oauth/token"
+# Access tokens are refreshed this long before Strava expires them
+REFRESH_MARGIN = timedelta(minutes=5)
+
+# One refresh at a time per athlete, a refresh token can only be used once
+_refresh_locks = defaultdict(asyncio.Lock)
+
+def get_cipher():
+    """
+    Fernet cipher for stored tokens, keyed by TOKEN_ENCRYPTION_KEY
+    (generate one with `Fernet.generate_key()`).
+    """
+    # Imported on first use, cryptography is not needed to start serving
+    from cryptography.fernet import Fernet
+
+    key = os.getenv("TOKEN_ENCRYPTION_KEY")
+    if not key:
+        raise RuntimeError("TOKEN_ENCRYPTION_KEY not set")
+    return Fernet(key)
+
+def encrypt_token(token: str) -> str:
+    return get_cipher().encrypt(token.encode()).decode()
+
+def decrypt_token(token: str) -> str:
+    return get_cipher().decrypt(token.encode()).decode()
+
+def apply_tokens(athlete: Athlete, tokens: dict):
+    """
+    Store the tokens of a Strava OAuth response on an athlete, encrypted.
+    """
+    athlete.access_token = encrypt_token(tokens["access_token"])
+    athlete.refresh_token = encrypt_token(tokens["refresh_token"])
+    athlete.expires_at = datetime.utcfromtimestamp(tokens["expires_at"])
+
+async def request_tokens(data: dict) -> dict:
+    """
+    POST to Strava's OAuth token endpoint with the app credentials.
+    """
+    payload = {
+        "client_id": os.getenv("STRAVA_CLIENT_ID"),
+        "client_secret": os.getenv("STRAVA_CLIENT_SECRET"),
+        **data,
+    }
+    response = await get_client().post(os.getenv("STRAVA_OAUTH_URL", DEFAULT_STRAVA_OAUTH_URL), data=payload)
+    response.raise_for_status()
+    return response.json()
+
+async def exchange_code(session: AsyncSession, code: str) -> Athlete:
+    """
+    Finish the OAuth handshake: trade an authorization code for tokens and
+    create or update the athlete they belong to (not committed here).
+    """
+    tokens = await request_tokens({"code": code, "grant_type": "authorization_code"})
+    profile = tokens.get("athlete") or {}
+    athlete = await session.get(Athlete, profile["id"])
+    if not athlete:
+        athlete = Athlete(id=profile["id"])
+    athlete.firstname = profile.get("firstname")
+    athlete.lastname = profile.get("lastname")
+    apply_tokens(athlete, tokens)
+    session.add(athlete)
+    return athlete
+
+async def get_access_token(session: AsyncSession, athlete: Athlete) -> str:
+    """
+    A valid access token for the athlete, refreshed and committed first if it
+    expires within REFRESH_MARGIN.
+    """
+    async with _refresh_locks[athlete.id]:
+        # Another session may have refreshed while we waited
+        await session.refresh(athlete)
+        if athlete.expires_at - REFRESH_MARGIN <= datetime.utcnow():
+            refresh_token = decrypt_token(athlete.refresh_token)
+            apply_tokens(athlete, await request_tokens({"grant_type": "refresh_token", "refresh_token": refresh_token}))
+            session.add(athlete)
+            await session.commit()
+        return decrypt_token(athlete.access_token)
+
+async def is_revoked(session: AsyncSession, athlete: Athlete) -> bool:
+    """
+    Whether the athlete withdrew our access, checked with a forced token
+    refresh: Strava refuses it once the app is deauthorized. A refresh that
+    succeeds is committed, the previous refresh token may no longer work.
+    """
+    async with _refresh_locks[athlete.id]:
+        await session.refresh(athlete)
+        refresh_token = decrypt_token(athlete.refresh_token)
+        try:
+            tokens = await request_tokens({"grant_type": "refresh_token", "refresh_token": refresh_token})
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 401):
+                return True
+            raise
+        apply_tokens(athlete, tokens)
+        session.add(athlete)
+        await session.commit()
+        return False
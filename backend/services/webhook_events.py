@@ -0,0 +1,190 @@
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+import httpx
+from sqlalchemy import delete, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Activity, Athlete, SyncState, WebhookEvent
+from services.coverage_store import drop_coverage, refresh_coverage
+from services.records import restore_records
+from services.response_cache import expire_data_version
+from services.rollups import activity_day, refresh_rollups
+from services.route_frequency import update_route_frequency
+from services.strava_service import export_analytics, get_strava_data, write_lock, write_page
+from services.sync_state import mark_data_changed
+from services.token_store import get_access_token, is_revoked
+
+# Events applied per transaction
+EVENT_BATCH = 100
+# Failed events are retried this many times, then left for inspection
+MAX_ATTEMPTS = 5
+
+def is_our_subscription(payload: dict) -> bool:
+    """
+    Whether a push event names our subscription, STRAVA_WEBHOOK_SUBSCRIPTION_ID
+    (the id printed by scripts/webhook_subscription.py create).
+    """
+    expected = os.getenv("STRAVA_WEBHOOK_SUBSCRIPTION_ID")
+    return bool(expected) and str(payload.get("subscription_id")) == expected
+
+async def enqueue_event(session: AsyncSession, payload: dict) -> WebhookEvent:
+    """
+    Store a Strava push event (not committed here).
+    """
+    event = WebhookEvent(
+        object_type=payload["object_type"],
+        object_id=payload["object_id"],
+        aspect_type=payload["aspect_type"],
+        owner_id=payload["owner_id"],
+        event_time=datetime.utcfromtimestamp(payload.get("event_time", 0)),
+        payload=json.dumps(payload),
+    )
+    session.add(event)
+    return event
+
+async def load_pending(session: AsyncSession, after_id: int = 0) -> list:
+    query = (
+        select(WebhookEvent)
+        .where(WebhookEvent.processed_at.is_(None), WebhookEvent.attempts < MAX_ATTEMPTS, WebhookEvent.id > after_id)
+        .order_by(WebhookEvent.id)
+        .limit(EVENT_BATCH)
+    )
+    return (await session.exec(query)).all()
+
+def group_events(events: list) -> dict:
+    """
+    Events per (object_type, object_id) in arrival order, so a burst of updates
+    to one activity costs a single fetch.
+    """
+    groups = {}
+    for event in events:
+        groups.setdefault((event.object_type, event.object_id), []).append(event)
+    return groups
+
+def is_deauthorization(events: list) -> bool:
+    return any(json.loads(e.payload).get("updates", {}).get("authorized") == "false" for e in events)
+
+async def fetch_activity(session: AsyncSession, owner_id: int, activity_id: int) -> Optional[dict]:
+    """
+    The current Strava version of an activity, fetched with its owner's token,
+    or None when Strava answers 404: it is gone or no longer visible to us.
+
+    Raises:
+        LookupError: The owner is not a connected athlete.
+    """
+    athlete = await session.get(Athlete, owner_id)
+    if not athlete:
+        raise LookupError(f"Unknown athlete: {owner_id}")
+    token = await get_access_token(session, athlete)
+    try:
+        return await get_strava_data(token, endpoint=f"/activities/{activity_id}")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 404:
+            raise
+        return None
+
+async def access_revoked(session: AsyncSession, athlete_id: int) -> bool:
+    """
+    Whether a deauthorization event is real: the athlete is connected and
+    Strava refuses to refresh their token.
+    """
+    athlete = await session.get(Athlete, athlete_id)
+    return athlete is not None and await is_revoked(session, athlete)
+
+async def delete_activities(session: AsyncSession, owner_id: int, activity_ids: list):
+    """
+    Delete activities of one athlete; ids owned by someone else are left alone.
+    """
+    owned = Activity.id.in_(activity_ids) & (Activity.athlete_id == owner_id)
+    days = set((await session.exec(select(Activity.athlete_id, activity_day).where(owned))).all())
+    await session.execute(delete(Activity).where(owned))
+    await refresh_rollups(session, days)
+
+async def apply_events(session: AsyncSession, events: list):
+    """
+    Apply one batch of events: fetch and upsert created or updated activities,
+    delete removed ones, and drop athletes who revoked access.
+
+    Events are not trusted on their own, Strava is asked first: an activity
+    is only deleted when fetching it with its owner's token gives a 404, an
+    athlete only when a token refresh is refused, and a fetched activity is
+    only stored when it belongs to the event's owner. Each activity is
+    fetched once however many events it got. Events whose check failed are
+    counted as an attempt and retried on a later run.
+    """
+    upserts, deletes, revoked, failed = [], {}, [], {}
+    for (object_type, object_id), group in group_events(events).items():
+        owner_id = group[-1].owner_id
+        try:
+            if object_type == "athlete":
+                if is_deauthorization(group) and await access_revoked(session, object_id):
+                    revoked.append(object_id)
+                continue
+            data = await fetch_activity(session, owner_id, object_id)
+        except Exception as e:
+            failed.update({event.id: str(e) for event in group})
+            continue
+        if data is None:
+            deletes.setdefault(owner_id, []).append(object_id)
+        elif (data.get("athlete") or {}).get("id") == owner_id:
+            upserts.append(data)
+
+    owners = ({data["athlete"]["id"] for data in upserts} | set(deletes)) - set(revoked)
+    now = datetime.utcnow()
+    async with write_lock:
+        if upserts:
+            await write_page(session, upserts)
+        for owner_id, activity_ids in deletes.items():
+            await delete_activities(session, owner_id, activity_ids)
+        if revoked:
+            # Strava requires removing the data of athletes who disconnect; their
+            # activities, rollups, records and route areas cascade with them
+            await session.execute(delete(Athlete).where(Athlete.id.in_(revoked)))
+            await session.execute(delete(SyncState).where(SyncState.athlete_id.in_(revoked)))
+        if deletes:
+            await restore_records(session, list(deletes))
+        for owner_id in owners:
+            await update_route_frequency(session, owner_id, rebuild=owner_id in deletes)
+        for event in events:
+            event.attempts += 1
+            event.error = failed.get(event.id)
+            event.processed_at = None if event.id in failed else now
+            session.add(event)
+        await mark_data_changed(session, owners)
+        await session.commit()
+    expire_data_version()
+    for athlete_id in revoked:
+        drop_coverage(athlete_id)
+    if upserts or deletes or revoked:
+        await export_analytics(session)
+        await refresh_coverage(session, owners)
+
+async def record_failure(session: AsyncSession, event_ids: list, error: str):
+    await session.execute(
+        update(WebhookEvent).where(WebhookEvent.id.in_(event_ids))
+        .values(attempts=WebhookEvent.attempts + 1, error=error)
+    )
+    await session.commit()
+
+async def process_pending(session: AsyncSession) -> int:
+    """
+    Apply queued events batch by batch until none are left. Events that fail
+    are left for the next run rather than retried in a loop.
+
+    Returns:
+        int: Number of events handled, including ones that failed.
+    """
+    total, last_id = 0, 0
+    while events := await load_pending(session, last_id):
+        event_ids = [event.id for event in events]
+        try:
+            await apply_events(session, events)
+        except Exception as e:
+            await session.rollback()
+            await record_failure(session, event_ids, str(e))
+        total += len(events)
+        last_id = event_ids[-1]
+    return total
@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+from database import async_session
+from services.webhook_events import process_pending
+
+# Wait after a wake-up so a burst of events for one activity is applied together
+DEBOUNCE = float(os.getenv("WEBHOOK_DEBOUNCE", "2"))
+# Events queued by another process (e.g. a replay) are picked up at least this often
+POLL_INTERVAL = float(os.getenv("WEBHOOK_POLL_INTERVAL", "60"))
+
+_worker = {"task": None, "wake": asyncio.Event()}
+
+def wake_worker():
+    """
+    Signal that new events were committed to the queue.
+    """
+    _worker["wake"].set()
+
+async def run_worker():
+    while True:
+        try:
+            await asyncio.wait_for(_worker["wake"].wait(), timeout=POLL_INTERVAL)
+            await asyncio.sleep(DEBOUNCE)
+        except asyncio.TimeoutError:
+            pass
+        _worker["wake"].clear()
+        try:
+            async with async_session() as session:
+                await process_pending(session)
+        except Exception as e:
+            print(f"Webhook worker failed: {e}")
+
+def start_worker():
+    if _worker["task"] is None:
+        _worker["task"] = asyncio.create_task(run_worker())
+
+async def stop_worker():
+    task, _worker["task"] = _worker["task"], None
+    if task:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -5,6 +5,7 @@ import dynamic from 'next/dynamic';
 import { useSearchParams } from 'next/navigation';
 
 import Layout from '../components/Layout';
+import { GeometryTrack, readGeometryPayload } from '../utils/geometryPayload';
 
 // Dynamically import Map component with no SSR because Leaflet uses window
 const Map = dynamic(() => import('../components/Map'), { ssr: false });
@@ -14,6 +15,7 @@ function HomeContent() {
   const year = searchParams.get('year') || 'last_year';
 
   const [activities, setActivities] = useState([]);
+  const [tracks, setTracks] = useState<GeometryTrack[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
@@ -21,12 +23,19 @@ function HomeContent() {
     setLoading(true);
     try {
       const apiUrl = '/api';
-      const res = await fetch(`${apiUrl}/strava/data?year=${year}`);
-      if (!res.ok) {
-        const errorData = await res.json().catch(() => ({}));
-        throw new Error(errorData.detail || `Error ${res.status}: ${res.statusText}`);
+      // Activity details as JSON, routes as the binary geometry payload
+      const [res, geometryRes] = await Promise.all([
+        fetch(`${apiUrl}/strava/data?year=${year}`),
+        fetch(`${apiUrl}/strava/geometry?year=${year}`)
+      ]);
+      for (const response of [res, geometryRes]) {
+        if (!response.ok) {
+          const errorData = await response.json().catch(() => ({}));
+          throw new Error(errorData.detail || `Error ${response.status}: ${response.statusText}`);
+        }
       }
       const data = await res.json();
+      setTracks(readGeometryPayload(await geometryRes.arrayBuffer()));
       setActivities(data);
     } catch (err: any) {
       setError(err.message);
@@ -48,7 +57,7 @@ function HomeContent() {
         ) : error ? (
           <div className="flex justify-center items-center h-full text-red-500">Error: {error}</div>
         ) : (
-          <Map activities={activities} />
+          <Map activities={activities} tracks={tracks} />
         )}
       </div>
     </div>
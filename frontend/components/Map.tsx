@@ -5,20 +5,16 @@ import { useEffect, useMemo } from 'react';
 import 'leaflet/dist/leaflet.css';
 import 'leaflet-defaulticon-compatibility/dist/leaflet-defaulticon-compatibility.css';
 import "leaflet-defaulticon-compatibility";
-import mapboxPolyline from '@mapbox/polyline';
+import { GeometryTrack, trackCenter, trackPositions, tracksBounds } from '../utils/geometryPayload';
 import {
     analyzeRouteFrequency,
     findLongestRun,
-    calculateMapBounds,
     getRouteColor,
     getRouteWeight,
     getRouteOpacity
 } from '../utils/routeAnalysis';
 
 interface Activity {
-    map: {
-        summary_polyline: string;
-    };
     name: string;
     id: number;
     distance: number;
@@ -56,40 +52,45 @@ function MapBoundsFitter({ bounds }: { bounds: { minLat: number; maxLat: number;
     return null;
 }
 
-export default function Map({ activities }: { activities: Activity[] }) {
+export default function Map({ activities, tracks }: { activities: Activity[]; tracks: GeometryTrack[] }) {
+    // Routes come from the binary /strava/geometry payload, keyed by activity id
+    const tracksById = useMemo(() => {
+        const byId: Record<number, GeometryTrack> = {};
+        tracks.forEach(track => {
+            byId[track.activityId] = track;
+        });
+        return byId;
+    }, [tracks]);
+
     // Analyze routes and find longest run
-    const routeMetadata = useMemo(() => analyzeRouteFrequency(activities), [activities]);
+    const routeMetadata = useMemo(() => analyzeRouteFrequency(activities, activity => {
+        const track = tracksById[activity.id];
+        return track ? trackCenter(track) : null;
+    }), [activities, tracksById]);
     const longestRun = useMemo(() => findLongestRun(activities), [activities]);
-    const bounds = useMemo(() => calculateMapBounds(activities), [activities]);
+    const bounds = useMemo(() => tracksBounds(tracks), [tracks]);
 
-    // Decode polylines and apply styling
+    // Turn the deltas into positions and apply styling
     const decodedRoutes = useMemo(() => {
         const routes: DecodedRoute[] = [];
 
         activities.forEach(activity => {
-            if (!activity.map?.summary_polyline) return;
-
-            try {
-                const positions = mapboxPolyline.decode(activity.map.summary_polyline) as [number, number][];
-                const metadata = routeMetadata.get(activity.id);
-                const isLongest = longestRun?.id === activity.id;
-
-                if (metadata) {
-                    routes.push({
-                        positions,
-                        activityId: activity.id,
-                        color: getRouteColor(metadata, isLongest),
-                        weight: getRouteWeight(metadata, isLongest),
-                        opacity: getRouteOpacity(metadata, isLongest)
-                    });
-                }
-            } catch (e) {
-                console.error("Error decoding polyline for activity", activity.id, e);
-            }
+            const track = tracksById[activity.id];
+            const metadata = routeMetadata.get(activity.id);
+            if (!track || !metadata) return;
+
+            const isLongest = longestRun?.id === activity.id;
+            routes.push({
+                positions: trackPositions(track),
+                activityId: activity.id,
+                color: getRouteColor(metadata, isLongest),
+                weight: getRouteWeight(metadata, isLongest),
+                opacity: getRouteOpacity(metadata, isLongest)
+            });
         });
 
         return routes;
-    }, [activities, routeMetadata, longestRun]);
+    }, [activities, tracksById, routeMetadata, longestRun]);
 
     if (decodedRoutes.length === 0) {
         return <div className="text-center p-4">No map data available.</div>;
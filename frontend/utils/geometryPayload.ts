@@ -0,0 +1,95 @@
+export interface GeometryTrack {
+    activityId: number;
+    // Interleaved lat/lng deltas in 1e-5 degrees, a view into the payload buffer
+    deltas: Int32Array;
+    bounds: { minLat: number; minLng: number; maxLat: number; maxLng: number };
+}
+
+const SCALE = 1e5;
+
+/**
+ * Read the binary payload served by /strava/geometry without copying point data.
+ * Layout: header "STRG" + version + trackCount + pointCount, then ids (float64),
+ * point offsets (uint32), bounding boxes (int32 x4) and int32 lat/lng deltas.
+ */
+export function readGeometryPayload(buffer: ArrayBuffer): GeometryTrack[] {
+    const header = new DataView(buffer, 0, 16);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'STRG') {
+        throw new Error('Not a geometry payload');
+    }
+    const trackCount = header.getUint32(8, true);
+    const pointCount = header.getUint32(12, true);
+
+    let offset = 16;
+    const ids = new Float64Array(buffer, offset, trackCount);
+    offset += trackCount * 8;
+    const pointOffsets = new Uint32Array(buffer, offset, trackCount + 1);
+    offset += (trackCount + 1) * 4;
+    const bboxes = new Int32Array(buffer, offset, trackCount * 4);
+    offset += trackCount * 16;
+    const points = new Int32Array(buffer, offset, pointCount * 2);
+
+    const tracks: GeometryTrack[] = [];
+    for (let i = 0; i < trackCount; i++) {
+        tracks.push({
+            activityId: ids[i],
+            deltas: points.subarray(pointOffsets[i] * 2, pointOffsets[i + 1] * 2),
+            bounds: {
+                minLat: bboxes[i * 4] / SCALE,
+                minLng: bboxes[i * 4 + 1] / SCALE,
+                maxLat: bboxes[i * 4 + 2] / SCALE,
+                maxLng: bboxes[i * 4 + 3] / SCALE
+            }
+        });
+    }
+    return tracks;
+}
+
+/**
+ * Turn a track's deltas into [lat, lng] positions for Leaflet
+ */
+export function trackPositions(track: GeometryTrack): [number, number][] {
+    const positions: [number, number][] = [];
+    let lat = 0;
+    let lng = 0;
+    for (let i = 0; i < track.deltas.length; i += 2) {
+        lat += track.deltas[i];
+        lng += track.deltas[i + 1];
+        positions.push([lat / SCALE, lng / SCALE]);
+    }
+    return positions;
+}
+
+/**
+ * Middle point of a track as [lat, lng], summing the deltas up to it
+ */
+export function trackCenter(track: GeometryTrack): [number, number] | null {
+    const pointCount = track.deltas.length / 2;
+    if (pointCount === 0) return null;
+
+    const midIndex = Math.floor(pointCount / 2);
+    let lat = 0;
+    let lng = 0;
+    for (let i = 0; i <= midIndex * 2; i += 2) {
+        lat += track.deltas[i];
+        lng += track.deltas[i + 1];
+    }
+    return [lat / SCALE, lng / SCALE];
+}
+
+/**
+ * Bounds of all tracks, from their stored bounding boxes
+ */
+export function tracksBounds(tracks: GeometryTrack[]) {
+    if (tracks.length === 0) return null;
+
+    const bounds = { ...tracks[0].bounds };
+    tracks.forEach(track => {
+        bounds.minLat = Math.min(bounds.minLat, track.bounds.minLat);
+        bounds.minLng = Math.min(bounds.minLng, track.bounds.minLng);
+        bounds.maxLat = Math.max(bounds.maxLat, track.bounds.maxLat);
+        bounds.maxLng = Math.max(bounds.maxLng, track.bounds.maxLng);
+    });
+    return bounds;
+}
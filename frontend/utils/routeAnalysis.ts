@@ -51,11 +51,19 @@ function getRouteCenter(polyline: string): [number, number] | null {
     }
 }
 
+function polylineCenter(activity: StravaActivity): [number, number] | null {
+    return activity.map?.summary_polyline ? getRouteCenter(activity.map.summary_polyline) : null;
+}
+
 /**
  * Analyze route frequency to determine new vs repeated routes
  * Routes within ~100m of each other are considered the same area
+ * `routeCenter` defaults to decoding the summary polyline
  */
-export function analyzeRouteFrequency(activities: StravaActivity[]): Map<number, RouteMetadata> {
+export function analyzeRouteFrequency(
+    activities: StravaActivity[],
+    routeCenter: (activity: StravaActivity) => [number, number] | null = polylineCenter
+): Map<number, RouteMetadata> {
     const metadata = new Map<number, RouteMetadata>();
     const PROXIMITY_THRESHOLD = 100; // meters
 
@@ -68,19 +76,7 @@ export function analyzeRouteFrequency(activities: StravaActivity[]): Map<number,
     const visitedAreas: Array<{ lat: number; lng: number; count: number }> = [];
 
     sortedActivities.forEach(activity => {
-        if (!activity.map?.summary_polyline) {
-            metadata.set(activity.id, {
-                id: activity.id,
-                isNew: true,
-                visitCount: 1,
-                color: '#10b981', // emerald-500
-                opacity: 0.8,
-                weight: 3
-            });
-            return;
-        }
-
-        const center = getRouteCenter(activity.map.summary_polyline);
+        const center = routeCenter(activity);
         if (!center) {
             metadata.set(activity.id, {
                 id: activity.id,